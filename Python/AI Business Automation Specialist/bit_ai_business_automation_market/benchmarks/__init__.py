@@ -0,0 +1 @@
+# Benchmarks on synthetic job ads: python -m benchmarks.run
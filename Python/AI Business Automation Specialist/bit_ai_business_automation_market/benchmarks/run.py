@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+run.py
+
+Бенчмарк пайплайна на синтетических вакансиях (10k / 100k / 1M).
+
+1) Для каждого размера генерирует выгрузку data/benchmarks/raw_<size>_s<seed>/
+   (benchmarks.synthetic; повторно используется, если размер и seed совпадают).
+2) Каждый сценарий (benchmarks.scenarios) запускается в отдельном процессе:
+   wall / CPU time замеряемого шага, peak RSS, rows in / out, rows/s.
+3) Результаты — JSON в data/benchmarks/results/<timestamp>.json
+   (+ окружение: git commit, версии Python / numpy / pandas, число CPU).
+4) --baseline: сравнение wall time с прошлым результатом; замедление больше
+   --tolerance помечается как регрессия, код выхода 1.
+
+Использование:
+    python -m benchmarks.run                                  # 10k, все сценарии
+    python -m benchmarks.run --sizes 10k 100k --scenarios near_dedup similarity
+    python -m benchmarks.run --baseline latest                # сравнить с последним прогоном
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.synthetic import load_summary, parse_size, write_raw_tree
+from src.config import BASE_DIR, DATA_DIR
+
+
+BENCH_DIR = DATA_DIR / "benchmarks"
+RESULTS_DIR = BENCH_DIR / "results"
+
+DEFAULT_TOLERANCE = 0.25
+
+
+def raw_dir_for(size: str, seed: int) -> Path:
+    return BENCH_DIR / f"raw_{size}_s{seed}"
+
+
+def ensure_dataset(size: str, seed: int, regenerate: bool = False) -> Dict[str, Any]:
+    """Синтетическая выгрузка нужного размера (генерируется, только если её нет)."""
+    raw_dir = raw_dir_for(size, seed)
+    n = parse_size(size)
+    summary = load_summary(raw_dir)
+    if summary and not regenerate and summary.get("size") == n and summary.get("seed") == seed:
+        print(f"[INFO] Reusing {raw_dir} ({n} ads)")
+        return summary
+
+    print(f"[INFO] Generating {n} synthetic ads → {raw_dir}")
+    if raw_dir.exists():
+        for path in sorted(raw_dir.rglob("*.json"), reverse=True):
+            path.unlink()
+    return write_raw_tree(raw_dir, n, seed=seed)
+
+
+def run_in_subprocess(scenario: str, raw_dir: Path, work_dir: Path, seed: int) -> Dict[str, Any]:
+    # Instrumented src functions must not append benchmark runs to the pipeline run log
+    env = {**os.environ, "INSTRUMENTATION": "off"}
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.scenarios", scenario,
+         "--raw-dir", str(raw_dir), "--work-dir", str(work_dir), "--seed", str(seed)],
+        cwd=str(BASE_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode == 0 and lines:
+        return json.loads(lines[-1])
+    return {
+        "scenario": scenario,
+        "status": "error",
+        "returncode": proc.returncode,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "",
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(BASE_DIR), capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def resolve_baseline(arg: str) -> Optional[Path]:
+    """"latest" -> последний файл в RESULTS_DIR, иначе путь как есть."""
+    if arg != "latest":
+        return Path(arg)
+    files = sorted(RESULTS_DIR.glob("*.json"))
+    return files[-1] if files else None
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> pd.DataFrame:
+    """wall_s текущего прогона против baseline по (size, scenario)."""
+    base = {(r["size"], r["scenario"]): r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    rows = []
+    for r in results:
+        b = base.get((r["size"], r["scenario"]))
+        if r.get("status") != "ok" or b is None:
+            continue
+        ratio = r["wall_s"] / b["wall_s"] if b["wall_s"] else float("nan")
+        rows.append({
+            "size": r["size"],
+            "scenario": r["scenario"],
+            "baseline_s": b["wall_s"],
+            "wall_s": r["wall_s"],
+            "ratio": round(ratio, 3),
+            "regression": bool(ratio > 1.0 + tolerance),
+        })
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline steps on synthetic DACH job ads.")
+    parser.add_argument("--sizes", nargs="+", default=["10k"], help="Dataset sizes: 10k, 100k, 1M (default: 10k).")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+        metavar="SCENARIO",
+        help=f"Scenarios to run (default: all): {', '.join(SCENARIOS)}.",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed (default: 42).")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate datasets even if they exist.")
+    parser.add_argument("--baseline", help="Result JSON to compare against, or 'latest'.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed slowdown vs. baseline before flagging a regression (default: {DEFAULT_TOLERANCE}).",
+    )
+    parser.add_argument("--out", type=Path, help="Result file (default: data/benchmarks/results/<timestamp>.json).")
+    args = parser.parse_args()
+
+    # Resolve before this run writes its own result file
+    baseline_path = resolve_baseline(args.baseline) if args.baseline else None
+
+    started = datetime.now(timezone.utc)
+    datasets: Dict[str, Any] = {}
+    results: List[Dict[str, Any]] = []
+
+    for size in args.sizes:
+        datasets[size] = ensure_dataset(size, args.seed, args.regenerate)
+        raw_dir = raw_dir_for(size, args.seed)
+        work_dir = BENCH_DIR / f"work_{size}_s{args.seed}"
+
+        for scenario in args.scenarios:
+            print(f"[INFO] {size} / {scenario} ...", flush=True)
+            res = run_in_subprocess(scenario, raw_dir, work_dir, args.seed)
+            res["size"] = size
+            results.append(res)
+            if res["status"] != "ok":
+                print(f"[WARN] {size} / {scenario} failed: {res.get('error')}")
+
+    doc = {
+        "created_at": started.isoformat(),
+        "seed": args.seed,
+        "environment": environment(),
+        "datasets": datasets,
+        "results": results,
+    }
+    out = args.out or RESULTS_DIR / f"{started.strftime('%Y%m%dT%H%M%SZ')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    table = pd.DataFrame(results)
+    cols = [c for c in ["size", "scenario", "status", "wall_s", "cpu_s", "peak_rss_mb", "rows_in", "rows_out", "rows_per_s"]
+            if c in table.columns]
+    print(table[cols].to_markdown(index=False))
+    print(f"✅ Results → {out}")
+
+    if baseline_path is None:
+        if args.baseline:
+            print(f"[WARN] No baseline found for '{args.baseline}'")
+        return
+
+    diff = compare(results, json.loads(baseline_path.read_text(encoding="utf-8")), args.tolerance)
+    print(f"\nBaseline: {baseline_path}")
+    if diff.empty:
+        print("[WARN] No common (size, scenario) pairs with the baseline")
+        return
+    print(diff.to_markdown(index=False))
+
+    regressions = diff[diff["regression"]]
+    if not regressions.empty:
+        print(f"[WARN] {len(regressions)} regression(s) above {args.tolerance:.0%} tolerance")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
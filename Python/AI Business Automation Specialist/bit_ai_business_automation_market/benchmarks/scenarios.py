@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+scenarios.py
+
+Сценарии бенчмарка поверх синтетической выгрузки (benchmarks.synthetic).
+
+Каждый сценарий = setup (не замеряется: чтение записей, подготовка входа)
++ замеряемый шаг пайплайна на тех же функциях, что и в src:
+
+    ingestion_cold       iter_raw_jobs без манифеста: парсинг JSON + нормализация + кэш
+    ingestion_warm       iter_raw_jobs с заполненным манифестом (чтение из raw_cache)
+    dedup_index          DedupIndex.touch (SQLite, url_key + fingerprint)
+    near_dedup           near_duplicate_clusters (MinHash/LSH по title + description)
+    skill_extraction     apply_unique(description, extract_skills), как в extract_skills_from_raw
+    entry_classifier     classify_many(title + description) с учётом сработавших правил (analyze_linkedin_jobs)
+    entry_classifier_any те же правила старыми циклами any(kw in text) — эталон для entry_classifier
+    enrichment           JobEnricher (все разметчики: title, skills, entry, language) — один скан на вакансию
+    enrichment_per_labeler  те же разметчики по одному: свой lower + скан на каждый (эталон для enrichment)
+    monthly_aggregation  resolve_dates + entry-классификатор + dedupe + build_monthly
+    similarity           chunked_top_k: профили ролей против эмбеддингов всех вакансий (.npy)
+
+Сценарий запускается в отдельном процессе (benchmarks.run), чтобы peak RSS
+относился только к нему; результат — одна JSON-строка в stdout.
+
+Использование (обычно вызывается из benchmarks.run):
+    python -m benchmarks.scenarios near_dedup --raw-dir data/benchmarks/raw_10k_s42 --work-dir /tmp/bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import load_summary
+from generate_job_folders_with_countries import STRUCTURE
+from src.analyze_monthly_trends import (
+    DATE_KEYS,
+    NESTED_DATE_CONTAINERS,
+    build_monthly,
+    dedupe,
+    job_full_text,
+    normalize_job,
+)
+from src.classification.factorize import apply_unique
+from src.classification.seniority import (
+    ENTRY_INCLUDE,
+    SENIOR_EXCLUDE,
+    SeniorityClassifier,
+    get_entry_mid_classifier,
+)
+from src.classification.similarity import chunked_top_k, iter_npy_chunks
+from src.classification.skill_extractor import extract_skills
+from src.instrumentation import peak_rss_mb
+from src.parsing.dates import resolve_dates
+from src.parsing.dedup_index import DedupIndex
+from src.parsing.enrichment import LABELERS, JobEnricher
+from src.parsing.near_dedup import job_text, near_duplicate_clusters
+from src.parsing.raw_jobs_stream import iter_raw_jobs
+
+
+# Embedding width for the similarity scenario (real embeddings are wider, the cost is linear in it)
+EMBEDDING_DIM = 256
+SIMILARITY_CHUNK_ROWS = 50_000
+SIMILARITY_TOP_K = 10
+
+# setup(ctx) -> state; step(state) -> (rows_in, rows_out)
+Scenario = Tuple[Callable[[Dict[str, Any]], Any], Callable[[Any], Tuple[int, int]]]
+
+
+def _load_records(ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(iter_raw_jobs(ctx["raw_dir"], use_cache=False))
+
+
+def _cache_paths(ctx: Dict[str, Any]) -> Tuple[Path, Path]:
+    return ctx["work_dir"] / "raw_manifest.json", ctx["work_dir"] / "raw_cache"
+
+
+# -----------------------------
+# INGESTION
+# -----------------------------
+def step_ingestion(ctx: Dict[str, Any]) -> Tuple[int, int]:
+    manifest_path, cache_dir = _cache_paths(ctx)
+    n = sum(1 for _ in iter_raw_jobs(ctx["raw_dir"], manifest_path=manifest_path, cache_dir=cache_dir))
+    return n, n
+
+
+def setup_ingestion_cold(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    manifest_path, cache_dir = _cache_paths(ctx)
+    manifest_path.unlink(missing_ok=True)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return ctx
+
+
+def setup_ingestion_warm(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    setup_ingestion_cold(ctx)
+    step_ingestion(ctx)
+    return ctx
+
+
+# -----------------------------
+# DEDUP
+# -----------------------------
+def setup_dedup_index(ctx: Dict[str, Any]) -> Tuple[DedupIndex, List[Dict[str, Any]]]:
+    path = ctx["work_dir"] / "dedup_index.sqlite"
+    path.unlink(missing_ok=True)
+    return DedupIndex(path=path, scope="benchmark"), _load_records(ctx)
+
+
+def step_dedup_index(state: Tuple[DedupIndex, List[Dict[str, Any]]]) -> Tuple[int, int]:
+    index, records = state
+    new = index.touch(records)
+    index.close()
+    return len(records), new
+
+
+def setup_near_dedup(ctx: Dict[str, Any]) -> List[str]:
+    return [job_text(rec["title"], rec["description"]) for rec in _load_records(ctx)]
+
+
+def step_near_dedup(texts: List[str]) -> Tuple[int, int]:
+    clusters = near_duplicate_clusters(texts)
+    return len(texts), int(clusters.max()) + 1 if len(clusters) else 0
+
+
+# -----------------------------
+# SKILLS
+# -----------------------------
+def setup_skill_extraction(ctx: Dict[str, Any]) -> List[str]:
+    return [rec["description"] for rec in _load_records(ctx) if rec["description"] and rec["url"]]
+
+
+def step_skill_extraction(descriptions: List[str]) -> Tuple[int, int]:
+    flags = apply_unique(descriptions, extract_skills)
+    return len(descriptions), sum(1 for f in flags if any(f.values()))
+
+
+# -----------------------------
+# SENIORITY
+# -----------------------------
+def setup_entry_classifier(ctx: Dict[str, Any]) -> List[str]:
+    # Distinct texts only: both variants scan each distinct ad once
+    texts = [f"{rec['title']}\n{rec['description']}" for rec in _load_records(ctx)]
+    return list(dict.fromkeys(texts))
+
+
+def step_entry_classifier(texts: List[str]) -> Tuple[int, int]:
+    entry = SeniorityClassifier(ENTRY_INCLUDE, SENIOR_EXCLUDE, literal=True).classify_many(texts)
+    return len(texts), int(entry["label"].sum())
+
+
+def step_entry_classifier_any(texts: List[str]) -> Tuple[int, int]:
+    # Pre-classifier analyze_linkedin_jobs.is_entry_mid_level: short-circuits, no rule accounting
+    n = 0
+    for text in texts:
+        text = text.lower()
+        if any(kw in text for kw in ENTRY_INCLUDE) and not any(kw in text for kw in SENIOR_EXCLUDE):
+            n += 1
+    return len(texts), n
+
+
+# -----------------------------
+# ENRICHMENT
+# -----------------------------
+def setup_enrichment(ctx: Dict[str, Any]) -> Tuple[pd.Series, pd.Series]:
+    records = _load_records(ctx)
+    return pd.Series([rec["title"] for rec in records]), pd.Series([rec["description"] for rec in records])
+
+
+def step_enrichment(state: Tuple[pd.Series, pd.Series]) -> Tuple[int, int]:
+    titles, descriptions = state
+    labels = JobEnricher().enrich(titles, descriptions)
+    return len(titles), int(labels["is_entry_mid"].sum())
+
+
+def step_enrichment_per_labeler(state: Tuple[pd.Series, pd.Series]) -> Tuple[int, int]:
+    titles, descriptions = state
+    frames = [JobEnricher([name]).enrich(titles, descriptions) for name in LABELERS]
+    return len(titles), int(pd.concat(frames, axis=1)["is_entry_mid"].sum())
+
+
+# -----------------------------
+# MONTHLY
+# -----------------------------
+def setup_monthly_aggregation(ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return _load_records(ctx)
+
+
+def step_monthly_aggregation(records: List[Dict[str, Any]]) -> Tuple[int, int]:
+    # Same steps as analyze_monthly_trends.load_all_jobs, without the raw reader and the dedup index
+    entry = get_entry_mid_classifier().classify_many([job_full_text(rec) for rec in records])
+    posted = resolve_dates(
+        [rec["dates"] for rec in records],
+        DATE_KEYS,
+        NESTED_DATE_CONTAINERS,
+        reference=[rec.get("scraped_at", "") for rec in records],
+    )
+    df = pd.DataFrame([
+        normalize_job(rec, entry_mid, posted_at)
+        for rec, entry_mid, posted_at in zip(records, entry["label"].tolist(), posted)
+    ])
+    df["posted_at"] = pd.to_datetime(df["posted_at"], utc=True, errors="coerce")
+    df = dedupe(df[df["posted_at"].notna()])
+    monthly = build_monthly(df)
+    return len(records), len(monthly)
+
+
+# -----------------------------
+# SIMILARITY
+# -----------------------------
+def setup_similarity(ctx: Dict[str, Any]) -> Tuple[np.ndarray, Path]:
+    n = load_summary(ctx["raw_dir"])["stats"]["records"]
+    rng = np.random.default_rng(ctx["seed"])
+    path = ctx["work_dir"] / "ad_embeddings.npy"
+
+    # Written in chunks: the 1M x EMBEDDING_DIM matrix does not need to fit in memory twice
+    mat = np.lib.format.open_memmap(path, mode="w+", dtype="float32", shape=(n, EMBEDDING_DIM))
+    for start in range(0, n, SIMILARITY_CHUNK_ROWS):
+        stop = min(start + SIMILARITY_CHUNK_ROWS, n)
+        mat[start:stop] = rng.standard_normal((stop - start, EMBEDDING_DIM), dtype="float32")
+    mat.flush()
+    del mat
+
+    queries = rng.standard_normal((len(STRUCTURE), EMBEDDING_DIM), dtype="float32")
+    return queries, path
+
+
+def step_similarity(state: Tuple[np.ndarray, Path]) -> Tuple[int, int]:
+    queries, path = state
+    idx, _ = chunked_top_k(queries, iter_npy_chunks(path, SIMILARITY_CHUNK_ROWS), k=SIMILARITY_TOP_K)
+    n = np.load(path, mmap_mode="r").shape[0]
+    return n, int(idx.size)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "ingestion_cold": (setup_ingestion_cold, step_ingestion),
+    "ingestion_warm": (setup_ingestion_warm, step_ingestion),
+    "dedup_index": (setup_dedup_index, step_dedup_index),
+    "near_dedup": (setup_near_dedup, step_near_dedup),
+    "skill_extraction": (setup_skill_extraction, step_skill_extraction),
+    "entry_classifier": (setup_entry_classifier, step_entry_classifier),
+    "entry_classifier_any": (setup_entry_classifier, step_entry_classifier_any),
+    "enrichment": (setup_enrichment, step_enrichment),
+    "enrichment_per_labeler": (setup_enrichment, step_enrichment_per_labeler),
+    "monthly_aggregation": (setup_monthly_aggregation, step_monthly_aggregation),
+    "similarity": (setup_similarity, step_similarity),
+}
+
+
+def run_scenario(name: str, raw_dir: Path, work_dir: Path, seed: int = 42) -> Dict[str, Any]:
+    """Setup + замер одного сценария в текущем процессе."""
+    setup, step = SCENARIOS[name]
+    work_dir.mkdir(parents=True, exist_ok=True)
+    ctx = {"raw_dir": raw_dir, "work_dir": work_dir, "seed": seed}
+
+    t0 = time.perf_counter()
+    state = setup(ctx)
+    setup_s = time.perf_counter() - t0
+    setup_rss = peak_rss_mb()
+
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    rows_in, rows_out = step(state)
+    wall_s = time.perf_counter() - wall0
+    cpu_s = time.process_time() - cpu0
+
+    return {
+        "scenario": name,
+        "status": "ok",
+        "wall_s": round(wall_s, 4),
+        "cpu_s": round(cpu_s, 4),
+        "setup_s": round(setup_s, 4),
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "rows_per_s": round(rows_in / wall_s, 1) if wall_s > 0 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run one benchmark scenario and print its result as JSON.")
+    parser.add_argument("scenario", choices=list(SCENARIOS))
+    parser.add_argument("--raw-dir", type=Path, required=True, help="Synthetic raw directory (benchmarks.synthetic).")
+    parser.add_argument("--work-dir", type=Path, required=True, help="Scratch directory for caches and indexes.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(run_scenario(args.scenario, args.raw_dir, args.work_dir, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
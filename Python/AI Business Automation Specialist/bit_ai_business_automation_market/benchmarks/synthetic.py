@@ -0,0 +1,446 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+synthetic.py
+
+Генератор синтетических вакансий в формате Apify / LinkedIn для бенчмарков
+(реальные выгрузки маленькие и не публикуются).
+
+Что моделируется:
+- раскладка data/raw/{DE,AT,CH}/{role_id}/NN_query.json из
+  generate_job_folders_with_countries.STRUCTURE; файлы — JSON-массив или JSONL;
+- тайтлы с gender-суффиксами ("(m/w/d)", "(w/m/d)", "(all genders)", ...)
+  и Junior/Senior-префиксами;
+- описания на немецком и английском (скиллы, опыт, entry/senior-формулировки);
+- кластеры дубликатов: та же вакансия под другим запросом (URL с другим ?trackingId)
+  и почти-дубликаты (другой суффикс, написание города, лишнее предложение);
+- смешанные форматы дат: ISO, дата без времени, epoch (мс / с / строка из цифр),
+  "N days ago", вложенный jobPosting.listedAt, отсутствующая дата.
+
+Генерация детерминирована по seed (random.Random), mtime файлов = anchor
+(база для "N days ago"), поэтому один seed даёт одни и те же данные.
+
+Использование:
+    python -m benchmarks.synthetic --size 10k --out data/benchmarks/raw_10k_s42
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from generate_job_folders_with_countries import COUNTRIES, STRUCTURE
+
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+COUNTRY_WEIGHTS = {"DE": 0.6, "AT": 0.2, "CH": 0.2}
+
+# Fixed default "scrape time", so relative dates do not depend on when the data was generated
+DEFAULT_ANCHOR = datetime(2025, 12, 1, 8, 0, tzinfo=timezone.utc)
+
+# Originals kept as candidates for re-posts (bounds memory for 1M ads)
+_RECENT_POOL = 5000
+
+GENDER_SUFFIXES = ["(m/w/d)", "(w/m/d)", "(m/f/d)", "(d/m/w)", "(all genders)", "(m/w/x)", "m/w/d", ""]
+
+ACRONYMS = {"ai", "ki", "rpa", "llm", "it", "mw", "d"}
+
+LOCATIONS = {
+    "DE": [["Berlin"], ["München", "Muenchen", "Munich"], ["Hamburg"], ["Frankfurt am Main", "Frankfurt"],
+           ["Köln", "Koeln", "Cologne"], ["Stuttgart"], ["Düsseldorf", "Duesseldorf"], ["Leipzig"], ["Remote"]],
+    "AT": [["Wien", "Vienna"], ["Graz"], ["Linz"], ["Salzburg"], ["Innsbruck"]],
+    "CH": [["Zürich", "Zurich", "Zuerich"], ["Basel"], ["Bern"], ["Genève", "Geneva"], ["Lausanne"]],
+}
+
+COMPANY_PREFIXES = ["Nord", "Alpen", "Rhein", "Data", "Prozess", "Digital", "Smart", "Helvetia", "Donau",
+                    "Bavaria", "Cloud", "Logi", "Fin", "Medi", "Energie", "Auto", "Handels", "Consult"]
+COMPANY_SUFFIXES = ["werk", "tech", "solutions", "systems", "group", "partners", "labs", "services", "bank", "versicherung"]
+COMPANY_FORMS = {"DE": ["GmbH", "AG", "SE", "GmbH & Co. KG"], "AT": ["GmbH", "AG"], "CH": ["AG", "SA", "GmbH"]}
+
+SENIORITY_LEVELS = ["Entry level", "Associate", "Mid-Senior level", "Not Applicable", "Internship", ""]
+
+TOOLS = ["n8n", "Make.com", "Integromat", "Zapier", "Power Automate", "Microsoft Flow", "UiPath",
+         "Python", "SQL", "REST API", "BPMN", "ChatGPT", "Azure OpenAI", "LLM", "SAP", "Excel",
+         "Salesforce", "Jira", "Camunda", "Celonis"]
+
+TEXT = {
+    "de": {
+        "intro": [
+            "Wir sind ein wachsendes Unternehmen mit Sitz in {city} und digitalisieren die Prozesse unserer Kunden.",
+            "Die {company} ist ein führender Anbieter für Software und Beratung im DACH-Raum.",
+            "Als Teil unseres Teams gestaltest du die digitale Transformation von Geschäftsprozessen.",
+            "Unser Team in {city} entwickelt Automatisierungslösungen für Mittelstand und Konzerne.",
+        ],
+        "task": [
+            "Du analysierst bestehende Geschäftsprozesse und identifizierst Potenziale für Automatisierung.",
+            "Du entwickelst Workflows mit {tool} und {tool2} und bindest Systeme über Schnittstellen an.",
+            "Du arbeitest eng mit den Fachbereichen zusammen und moderierst Workshops.",
+            "Du dokumentierst Prozesse in {tool} und sorgst für saubere Übergaben an den Betrieb.",
+            "Du setzt KI-Anwendungen auf Basis von {tool} in Pilotprojekten um.",
+            "Du betreust bestehende Automatisierungen und optimierst sie kontinuierlich.",
+            "Du unterstützt bei der Einhaltung der DSGVO und interner Richtlinien.",
+        ],
+        "profile": [
+            "Abgeschlossenes Studium der Wirtschaftsinformatik oder eine vergleichbare Ausbildung.",
+            "Erste Erfahrung mit {tool} oder vergleichbaren Tools.",
+            "Sehr gute Kenntnisse in {tool} und Grundkenntnisse in {tool2}.",
+            "Analytisches Denken, Kommunikationsstärke und Teamfähigkeit.",
+            "Sehr gute Deutsch- und gute Englischkenntnisse.",
+        ],
+        "entry": ["Berufseinsteiger sind herzlich willkommen.", "Auch ohne Berufserfahrung bist du bei uns richtig.",
+                  "Du bringst 0-2 Jahre Erfahrung mit.", "Ideal als Trainee oder Junior."],
+        "senior": ["Du bringst mehrjährige Berufserfahrung in der Prozessautomatisierung mit.",
+                   "Mindestens 5+ Jahre Erfahrung, davon einige in leitender Position.",
+                   "Du übernimmst die fachliche Leitung eines kleinen Teams."],
+        "benefits": [
+            "Wir bieten flexible Arbeitszeiten, Homeoffice und 30 Tage Urlaub.",
+            "Es erwarten dich ein modernes Büro, Weiterbildungsbudget und ein unbefristeter Vertrag.",
+            "Freu dich auf ein kollegiales Team und kurze Entscheidungswege.",
+        ],
+    },
+    "en": {
+        "intro": [
+            "We are a fast-growing company based in {city}, helping our clients automate their business processes.",
+            "{company} is a leading provider of software and consulting services across the DACH region.",
+            "Join our team and shape the digital transformation of business processes.",
+            "Our team in {city} builds automation solutions for mid-sized companies and enterprises.",
+        ],
+        "task": [
+            "You analyse existing business processes and identify opportunities for automation.",
+            "You build workflows with {tool} and {tool2} and integrate systems via APIs.",
+            "You work closely with business stakeholders and run workshops.",
+            "You document processes in {tool} and ensure clean handovers to operations.",
+            "You implement AI use cases based on {tool} in pilot projects.",
+            "You maintain existing automations and continuously improve them.",
+            "You support compliance with GDPR and internal policies.",
+        ],
+        "profile": [
+            "A degree in business informatics or a comparable qualification.",
+            "First hands-on experience with {tool} or similar tools.",
+            "Strong knowledge of {tool} and basic knowledge of {tool2}.",
+            "Analytical thinking, strong communication skills and a team player attitude.",
+            "Fluent English; German is a plus.",
+        ],
+        "entry": ["Entry level candidates are welcome.", "No experience required, we will train you.",
+                  "You have 0-2 years of experience.", "This junior role is ideal for graduates."],
+        "senior": ["You have 5+ years of experience in process automation.",
+                   "Several years of experience, ideally in a lead role.",
+                   "You will act as team lead for a small automation team."],
+        "benefits": [
+            "We offer flexible working hours, remote work and 30 days of vacation.",
+            "You can expect a modern office, a training budget and a permanent contract.",
+            "Look forward to a friendly team and short decision paths.",
+        ],
+    },
+}
+
+DATE_FORMATS = ["iso", "iso_date", "epoch_ms", "epoch_s_str", "relative", "nested_ms", "missing"]
+DATE_WEIGHTS = [0.3, 0.15, 0.2, 0.05, 0.1, 0.15, 0.05]
+
+
+@dataclass
+class GeneratorStats:
+    records: int = 0
+    originals: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    files: int = 0
+    languages: Dict[str, int] = field(default_factory=dict)
+    date_formats: Dict[str, int] = field(default_factory=dict)
+
+
+def parse_size(size: str) -> int:
+    """"10k" / "100k" / "1M" / "25000" -> число вакансий."""
+    if size in SIZES:
+        return SIZES[size]
+    s = size.strip().lower().replace("_", "")
+    mult = 1
+    if s.endswith("k"):
+        s, mult = s[:-1], 1_000
+    elif s.endswith("m"):
+        s, mult = s[:-1], 1_000_000
+    return int(float(s) * mult)
+
+
+def title_from_filename(filename: str) -> str:
+    """"08_rpa_developer.json" -> "RPA Developer" (без номера и mw_d)."""
+    words = Path(filename).stem.split("_")[1:]
+    words = [w for w in words if w not in {"mw", "d"}]
+    return " ".join(w.upper() if w in ACRONYMS else w.capitalize() for w in words)
+
+
+class SyntheticJobAds:
+    """
+    Поток синтетических вакансий: (country, role_id, filename, item).
+
+    - duplicate_rate: доля записей, повторяющих ранее сгенерированную вакансию;
+    - near_share: доля почти-дубликатов среди повторов (остальные — точные);
+    - english_share: доля англоязычных описаний;
+    - months: глубина дат публикации относительно anchor.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        duplicate_rate: float = 0.25,
+        near_share: float = 0.5,
+        english_share: float = 0.4,
+        months: int = 12,
+        anchor: datetime = DEFAULT_ANCHOR,
+    ):
+        self.rng = random.Random(seed)
+        self.duplicate_rate = duplicate_rate
+        self.near_share = near_share
+        self.english_share = english_share
+        self.max_age_days = months * 30
+        self.anchor = anchor
+        self.stats = GeneratorStats()
+
+        rng = self.rng
+        self.companies = {
+            c: [f"{rng.choice(COMPANY_PREFIXES)}{rng.choice(COMPANY_SUFFIXES)} {rng.choice(COMPANY_FORMS[c])}"
+                for _ in range(400)]
+            for c in COUNTRIES
+        }
+        self.files: List[Tuple[str, str]] = [(role, f) for role, files in STRUCTURE.items() for f in files]
+        self._countries = list(COUNTRY_WEIGHTS)
+        self._country_weights = list(COUNTRY_WEIGHTS.values())
+        self._recent: List[Dict[str, Any]] = []
+        self._next_id = 3_900_000_000
+
+    # -----------------------------
+    # building blocks
+    # -----------------------------
+    def _title(self, filename: str) -> str:
+        rng = self.rng
+        title = title_from_filename(filename)
+        r = rng.random()
+        if r < 0.12 and not title.startswith("Junior"):
+            title = f"Junior {title}"
+        elif r < 0.22:
+            title = f"Senior {title}"
+        suffix = rng.choice(GENDER_SUFFIXES)
+        return f"{title} {suffix}".strip()
+
+    def _description(self, lang: str, company: str, city: str, seniority: str) -> str:
+        rng = self.rng
+        t = TEXT[lang]
+
+        def fill(s: str) -> str:
+            tool, tool2 = rng.sample(TOOLS, 2)
+            return s.format(city=city, company=company, tool=tool, tool2=tool2)
+
+        parts = [fill(rng.choice(t["intro"]))]
+        parts += [fill(s) for s in rng.sample(t["task"], rng.randint(3, 6))]
+        parts += [fill(s) for s in rng.sample(t["profile"], rng.randint(2, 5))]
+        if seniority == "entry":
+            parts.append(rng.choice(t["entry"]))
+        elif seniority == "senior":
+            parts.append(rng.choice(t["senior"]))
+        parts += rng.sample(t["benefits"], rng.randint(1, 3))
+        return " ".join(parts)
+
+    def _dates(self, item: Dict[str, Any]) -> None:
+        """Дата публикации в одном из форматов Apify (in place)."""
+        rng = self.rng
+        fmt = rng.choices(DATE_FORMATS, DATE_WEIGHTS)[0]
+        age = timedelta(days=rng.randint(0, self.max_age_days), seconds=rng.randint(0, 86_399))
+        posted = self.anchor - age
+
+        if fmt == "relative":
+            days = rng.randint(1, 29)
+            item["postedAt"] = f"{days} days ago" if days > 1 else "1 day ago"
+        elif fmt == "iso":
+            item["postedAt"] = posted.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        elif fmt == "iso_date":
+            item["publishedAt"] = posted.strftime("%Y-%m-%d")
+        elif fmt == "epoch_ms":
+            item["listedAt"] = int(posted.timestamp() * 1000)
+        elif fmt == "epoch_s_str":
+            item["datePosted"] = str(int(posted.timestamp()))
+        elif fmt == "nested_ms":
+            item["jobPosting"] = {"listedAt": int(posted.timestamp() * 1000)}
+
+        self.stats.date_formats[fmt] = self.stats.date_formats.get(fmt, 0) + 1
+
+    def _url(self, job_id: int) -> str:
+        tracking = self.rng.getrandbits(64)
+        return f"https://www.linkedin.com/jobs/view/{job_id}/?refId={tracking:016x}&trackingId={tracking >> 7:x}"
+
+    # -----------------------------
+    # records
+    # -----------------------------
+    def _original(self, country: str, filename: str) -> Dict[str, Any]:
+        rng = self.rng
+        lang = "en" if rng.random() < self.english_share else "de"
+        city_variants = rng.choice(LOCATIONS[country])
+        company = rng.choice(self.companies[country])
+        r = rng.random()
+        seniority = "entry" if r < 0.25 else "senior" if r < 0.45 else "mid"
+
+        self._next_id += rng.randint(1, 50)
+        item = {
+            "title": self._title(filename),
+            "companyName": company,
+            "location": f"{city_variants[0]}, {country}",
+            "description": self._description(lang, company, city_variants[0], seniority),
+            "jobUrl": self._url(self._next_id),
+            "seniorityLevel": rng.choice(SENIORITY_LEVELS),
+        }
+        self._dates(item)
+
+        self.stats.originals += 1
+        self.stats.languages[lang] = self.stats.languages.get(lang, 0) + 1
+        self._remember({"item": item, "job_id": self._next_id, "country": country,
+                        "cities": city_variants, "lang": lang})
+        return item
+
+    def _remember(self, entry: Dict[str, Any]) -> None:
+        if len(self._recent) < _RECENT_POOL:
+            self._recent.append(entry)
+        else:
+            self._recent[self.rng.randrange(_RECENT_POOL)] = entry
+
+    def _repost(self) -> Tuple[str, Dict[str, Any]]:
+        """(country, item): повтор одной из недавних вакансий в той же стране."""
+        rng = self.rng
+        src = rng.choice(self._recent)
+        country = src["country"]
+        item = dict(src["item"])
+
+        if rng.random() >= self.near_share:
+            # Same ad found by another query: only the tracking part of the URL differs
+            item["jobUrl"] = self._url(src["job_id"])
+            self.stats.exact_duplicates += 1
+            return country, item
+
+        # Re-posted ad: new id, small edits
+        self._next_id += rng.randint(1, 50)
+        item["jobUrl"] = self._url(self._next_id)
+        base = item["title"]
+        for suffix in GENDER_SUFFIXES:
+            if suffix and base.endswith(suffix):
+                base = base[: -len(suffix)].strip()
+                break
+        item["title"] = f"{base} {rng.choice(GENDER_SUFFIXES)}".strip()
+        item["location"] = f"{rng.choice(src['cities'])}, {country}"
+        if rng.random() < 0.5:
+            item["description"] += " " + rng.choice(TEXT[src["lang"]]["benefits"])
+        self._dates(item)
+        self.stats.near_duplicates += 1
+        return country, item
+
+    def records(self, n: int) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """n записей: (country, role_id, filename, apify_item)."""
+        rng = self.rng
+        for _ in range(n):
+            role_id, filename = rng.choice(self.files)
+            if self._recent and rng.random() < self.duplicate_rate:
+                country, item = self._repost()
+            else:
+                country = rng.choices(self._countries, self._country_weights)[0]
+                item = self._original(country, filename)
+            self.stats.records += 1
+            yield country, role_id, filename, item
+
+
+class _RawFileWriter:
+    """Один файл выгрузки: чётные номера — JSON-массив, нечётные — JSONL."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.jsonl = int(path.name.split("_", 1)[0]) % 2 == 1
+        self.f = open(path, "w", encoding="utf-8")
+        self.count = 0
+        if not self.jsonl:
+            self.f.write("[")
+
+    def write(self, item: Dict[str, Any]) -> None:
+        line = json.dumps(item, ensure_ascii=False)
+        if self.jsonl:
+            self.f.write(line + "\n")
+        else:
+            self.f.write((",\n" if self.count else "\n") + line)
+        self.count += 1
+
+    def close(self) -> None:
+        if not self.jsonl:
+            self.f.write("\n]\n")
+        self.f.close()
+
+
+def write_raw_tree(
+    raw_dir: Path,
+    n: int,
+    seed: int = 42,
+    anchor: datetime = DEFAULT_ANCHOR,
+    **generator_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Пишет n вакансий в raw_dir/{country}/{role_id}/*.json (потоково)
+    и summary.json рядом. Возвращает summary.
+    """
+    raw_dir = Path(raw_dir)
+    gen = SyntheticJobAds(seed=seed, anchor=anchor, **generator_kwargs)
+    writers: Dict[Path, _RawFileWriter] = {}
+
+    try:
+        for country, role_id, filename, item in gen.records(n):
+            path = raw_dir / country / role_id / filename
+            writer = writers.get(path)
+            if writer is None:
+                writer = writers[path] = _RawFileWriter(path)
+            writer.write(item)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    # mtime = scrape time: the base for "N days ago"
+    ts = anchor.timestamp()
+    for path in writers:
+        os.utime(path, (ts, ts))
+
+    gen.stats.files = len(writers)
+    summary = {
+        "size": n,
+        "seed": seed,
+        "anchor": anchor.isoformat(),
+        **generator_kwargs,
+        "stats": asdict(gen.stats),
+    }
+    (raw_dir / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
+
+
+def load_summary(raw_dir: Path) -> Optional[Dict[str, Any]]:
+    path = Path(raw_dir) / "summary.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic Apify/LinkedIn job ads in the data/raw layout.")
+    parser.add_argument("--size", default="10k", help="Number of ads: 10k, 100k, 1M or a plain number (default: 10k).")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42).")
+    parser.add_argument("--out", type=Path, required=True, help="Target raw directory ({country}/{role_id}/*.json).")
+    parser.add_argument("--duplicate-rate", type=float, default=0.25, help="Share of re-posted ads (default: 0.25).")
+    args = parser.parse_args()
+
+    summary = write_raw_tree(args.out, parse_size(args.size), seed=args.seed, duplicate_rate=args.duplicate_rate)
+    stats = summary["stats"]
+    print(f"✅ {stats['records']} ads in {stats['files']} files → {args.out}")
+    print(f"[INFO] exact duplicates: {stats['exact_duplicates']}, near duplicates: {stats['near_duplicates']}")
+
+
+if __name__ == "__main__":
+    main()
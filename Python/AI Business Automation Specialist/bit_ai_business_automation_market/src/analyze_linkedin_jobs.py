@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-import json
+import argparse
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
 
 import pandas as pd
 
+from src.classification.seniority import (  # noqa: F401  (rule lists re-exported)
+    ENTRY_INCLUDE,
+    SENIOR_EXCLUDE,
+    get_entry_mid_level_classifier,
+)
+from src.parsing.dates import resolve_dates
+from src.parsing.dedup_index import DedupIndex
+from src.parsing.near_dedup import job_text, keep_first_per_cluster, near_duplicate_clusters
+from src.parsing.raw_jobs_stream import iter_raw_jobs
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 RAW_DIR = PROJECT_ROOT / "data" / "raw"
 PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
@@ -27,68 +37,8 @@ ROLE_CONFIG = {
 
 CUTOFF_DATE = datetime.now(timezone.utc) - timedelta(days=183)
 
-ENTRY_INCLUDE = [
-    # EN
-    "entry level", "entry-level", "junior", "associate", "working student",
-    "0-2 years", "0–2 years", "up to 2 years", "no experience required",
-    "0-1 years", "0–1 years", "1-2 years", "1–2 years",
-    # DE
-    "berufseinstieg", "berufseinsteiger", "junior",
-    "trainee", "ohne berufserfahrung", "ohne erfahrung",
-    "bis 1 jahr erfahrung", "bis 2 jahre erfahrung",
-    "0-2 jahre", "0–2 jahre", "0-1 jahr", "1-2 jahre", "1–2 jahre",
-]
-
-SENIOR_EXCLUDE = [
-    # EN
-    "3+ years", "3 years experience", "3-5 years", "5+ years", "7+ years",
-    "several years of experience", "many years of experience",
-    " senior", "senior ", " lead ", "lead-", "principal", "head of",
-    # DE
-    "3+ jahre", "3 jahre berufserfahrung", "3-5 jahre", "5+ jahre",
-    "mehrjährige berufserfahrung", "langjährige berufserfahrung",
-    " senior", "senior ", "leitende position", "teamlead", "team lead", "leitung",
-]
-
-
-def read_json_any(path: Path) -> List[Dict[str, Any]]:
-    """
-    Считывает файл Apify:
-    - JSON-массив
-    - или JSONL (по одной вакансии на строку)
-    Возвращает список dict.
-    """
-    if not path.exists() or path.stat().st_size == 0:
-        return []
-
-    text = path.read_text(encoding="utf-8").strip()
-    if not text:
-        return []
-
-    try:
-        if text.lstrip().startswith("["):
-            data = json.loads(text)
-            return data if isinstance(data, list) else []
-        else:
-            result: List[Dict[str, Any]] = []
-            for line in text.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                result.append(json.loads(line))
-            return result
-    except json.JSONDecodeError:
-        print(f"[WARN] Невозможно распарсить JSON: {path}")
-        return []
-
-
-def get_field(job: Dict[str, Any], keys: List[str], default: str = "") -> str:
-    """Берём первое непустое значение из списка ключей."""
-    for k in keys:
-        val = job.get(k)
-        if isinstance(val, str) and val.strip():
-            return val.strip()
-    return default
+# Priority order of the posted-date fields in Apify/LinkedIn items
+POSTED_AT_KEYS = ["listedAt", "publishedAt", "postedAt", "listedAtDate", "publishedAtDate", "date"]
 
 
 def normalize_text(s: str) -> str:
@@ -98,48 +48,26 @@ def normalize_text(s: str) -> str:
 def parse_date_safe(value: Any) -> datetime | None:
     """
     Пробуем разобрать дату публикации из разных форматов:
-    - timestamp (ms)
+    - timestamp (ms / s)
     - ISO-строки
+    - "N days ago"
     """
-    if value is None:
-        return None
-
-    if isinstance(value, (int, float)):
-        try:
-            return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
-        except Exception:
-            return None
-
-    if isinstance(value, str):
-        v = value.strip()
-        for fmt in ("%Y-%m-%d",
-                    "%Y-%m-%dT%H:%M:%S%z",
-                    "%Y-%m-%dT%H:%M:%S.%fZ",
-                    "%Y-%m-%dT%H:%M:%S"):
-            try:
-                dt = datetime.strptime(v, fmt)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt
-            except ValueError:
-                continue
+    return get_posted_at({"value": value}, keys=["value"])
 
-    return None
 
+def get_posted_at(job: Dict[str, Any], keys: List[str] = POSTED_AT_KEYS) -> datetime | None:
+    """Ищем дату публикации в возможных полях Apify/LinkedIn (одна запись)."""
+    return resolve_posted_at([job], keys=keys)[0]
 
-def get_posted_at(job: Dict[str, Any]) -> datetime | None:
-    """Ищем дату публикации в возможных полях Apify/LinkedIn."""
-    for key in ["listedAt", "publishedAt", "postedAt"]:
-        dt = parse_date_safe(job.get(key))
-        if dt:
-            return dt
 
-    for key in ["listedAtDate", "publishedAtDate", "date"]:
-        dt = parse_date_safe(job.get(key))
-        if dt:
-            return dt
-
-    return None
+def resolve_posted_at(
+    dates: List[Dict[str, Any]],
+    keys: List[str] = POSTED_AT_KEYS,
+    scraped_at: List[str] | None = None,
+) -> List[datetime | None]:
+    """Даты публикации для пачки записей (см. src.parsing.dates)."""
+    resolved = resolve_dates(dates, keys, reference=scraped_at)
+    return [ts.to_pydatetime() if pd.notna(ts) else None for ts in resolved]
 
 
 def is_entry_mid_level(title: str, description: str) -> bool:
@@ -147,16 +75,9 @@ def is_entry_mid_level(title: str, description: str) -> bool:
     Entry/mid-вакансия, если:
     - содержит хотя бы один include-токен,
     - и НЕ содержит senior-/lead-токены.
+    Токены — подстроки (проверка `in`, src.classification.seniority); сработавшие правила считаются.
     """
-    text = f"{title}\n{description}".lower()
-
-    if not any(kw in text for kw in ENTRY_INCLUDE):
-        return False
-
-    if any(kw in text for kw in SENIOR_EXCLUDE):
-        return False
-
-    return True
+    return get_entry_mid_level_classifier().is_entry(f"{title}\n{description}")
 
 
 def load_raw_jobs_for_country_role(country: str, role_id: str) -> List[Dict[str, Any]]:
@@ -164,7 +85,8 @@ def load_raw_jobs_for_country_role(country: str, role_id: str) -> List[Dict[str,
     Загружаем ВСЕ вакансии из JSON для страны и роли:
     - без фильтра по дате,
     - без дедупликации.
-    Сразу приводим поля к единому формату.
+    Записи приходят из общего потока src.parsing.raw_jobs_stream
+    (неизменённые файлы читаются из кэша).
     """
     folder = RAW_DIR / country / role_id
     if not folder.exists():
@@ -173,42 +95,36 @@ def load_raw_jobs_for_country_role(country: str, role_id: str) -> List[Dict[str,
 
     all_jobs: List[Dict[str, Any]] = []
 
-    for path in sorted(folder.glob("*.json")):
-        jobs_raw = read_json_any(path)
-        if not jobs_raw:
-            continue
-
-        for job in jobs_raw:
-            posted_at = get_posted_at(job)
-
-            title = get_field(job, ["title", "position", "jobTitle"])
-            company = get_field(job, ["companyName", "company", "company_name"])
-            location = get_field(job, ["location", "jobLocation", "job_location"])
-            description = get_field(
-                job,
-                ["description", "jobDescription", "descriptionText", "job_description"],
-            )
-            url = get_field(job, ["url", "jobUrl", "job_url", "link"])
-
-            all_jobs.append(
-                {
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "description": description,
-                    "url": url,
-                    "country": country,
-                    "role_id": role_id,
-                    "source_file": path.name,
-                    "posted_at": posted_at,
-                }
-            )
+    records = list(iter_raw_jobs(RAW_DIR, countries=[country], role_ids=[role_id]))
+    posted = resolve_posted_at(
+        [rec["dates"] for rec in records],
+        scraped_at=[rec.get("scraped_at", "") for rec in records],
+    )
+
+    for rec, posted_at in zip(records, posted):
+        all_jobs.append(
+            {
+                "title": rec["title"],
+                "company": rec["company"],
+                "location": rec["location"],
+                "description": rec["description"],
+                "url": rec["url"],
+                "country": country,
+                "role_id": role_id,
+                "source_file": Path(rec["source_file"]).name,
+                "posted_at": posted_at,
+            }
+        )
 
     return all_jobs
 
 
-def dedupe_jobs(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Дедупликация по (title, company, location)."""
+def dedupe_jobs(jobs: List[Dict[str, Any]], near_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Дедупликация по (title, company, location).
+    near_threshold — дополнительно схлопываем почти-дубликаты (MinHash/LSH
+    по title + description, Jaccard >= near_threshold), оставляя первую вакансию кластера.
+    """
     seen = set()
     unique: List[Dict[str, Any]] = []
     for job in jobs:
@@ -221,11 +137,35 @@ def dedupe_jobs(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             continue
         seen.add(key)
         unique.append(job)
+
+    if near_threshold is not None and unique:
+        clusters = near_duplicate_clusters(
+            [job_text(j.get("title"), j.get("description")) for j in unique],
+            threshold=near_threshold,
+        )
+        for job, cluster in zip(unique, clusters):
+            job["near_dup_cluster"] = int(cluster)
+        unique = [j for j, keep in zip(unique, keep_first_per_cluster(clusters)) if keep]
+
     return unique
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="LinkedIn market summary per country / role (6m window).")
+    parser.add_argument(
+        "--near-dedupe",
+        type=float,
+        default=None,
+        metavar="JACCARD",
+        help="Also collapse near-duplicate ads (MinHash/LSH over title + description, e.g. 0.8).",
+    )
+    args = parser.parse_args()
+
     summary_rows = []
+    # first_seen / last_seen of every ad across roles, countries and runs
+    dedup_index = DedupIndex(scope="linkedin_jobs")
+    seniority = get_entry_mid_level_classifier()
+    seniority.reset_stats()
 
     for country in COUNTRIES:
         for role_id, canonical_en in ROLE_CONFIG.items():
@@ -234,6 +174,8 @@ def main() -> None:
             raw_jobs = load_raw_jobs_for_country_role(country, role_id)
             raw_total = len(raw_jobs)
             print(f"Сырые данные (до фильтров): {raw_total}")
+            # Every raw ad is registered (first_seen / last_seen), before the date filter and dedupe
+            print(f"Новые вакансии с прошлого запуска (до фильтров): {dedup_index.touch(raw_jobs)}")
 
             date_filtered_jobs = [
                 j for j in raw_jobs
@@ -256,14 +198,16 @@ def main() -> None:
                 )
                 continue
 
-            jobs_unique = dedupe_jobs(date_filtered_jobs)
+            jobs_unique = dedupe_jobs(date_filtered_jobs, near_threshold=args.near_dedupe)
             total_jobs = len(jobs_unique)
             print(f"После дедупликации: {total_jobs}")
 
-            for job in jobs_unique:
-                job["is_entry_mid"] = is_entry_mid_level(
-                    job.get("title", ""), job.get("description", "")
-                )
+            # One scan per distinct ad text; fired rules are counted for the audit table
+            entry = seniority.classify_many(
+                [f"{job.get('title', '')}\n{job.get('description', '')}" for job in jobs_unique]
+            )
+            for job, flag in zip(jobs_unique, entry["label"].tolist()):
+                job["is_entry_mid"] = flag
 
             entry_mid_jobs = sum(1 for j in jobs_unique if j["is_entry_mid"])
             print(f"Entry/mid (<= 2 года): {entry_mid_jobs}")
@@ -290,6 +234,10 @@ def main() -> None:
     df_summary = pd.DataFrame(summary_rows)
     summary_path = PROCESSED_DIR / "summary_linkedin_market.csv"
     df_summary.to_csv(summary_path, index=False)
+
+    hits_path = PROCESSED_DIR / "seniority_rule_hits_linkedin.csv"
+    seniority.hit_stats().to_csv(hits_path, index=False)
+    print(f"Срабатывания entry/senior-правил (по каждому правилу): {hits_path}")
     print(f"\n=== Готово. Сводная таблица: {summary_path} ===")
     print(df_summary)
 
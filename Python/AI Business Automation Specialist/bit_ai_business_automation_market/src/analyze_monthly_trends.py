@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-import json
-import re
-from dataclasses import dataclass
+import argparse
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from src.classification.seniority import (  # noqa: F401  (rule list re-exported)
+    ENTRY_KEYWORDS,
+    count_rule_hits,
+    get_entry_mid_classifier,
+    rule_hit_stats,
+)
+from src.instrumentation import add_profile_arg, enable_profiling, instrumented
+from src.parsing.dates import resolve_dates
+from src.parsing.dedup_index import DedupIndex
+from src.parsing.jobs_store import JOBS_STORE_DIR, read_jobs, write_jobs
+from src.parsing.near_dedup import job_text, near_duplicate_clusters
+from src.parsing.raw_jobs_stream import iter_raw_jobs
+
 
 # -----------------------------
 # PATHS (FIXED)
@@ -19,30 +30,18 @@ PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
 OUT_MONTHLY_CSV = PROCESSED_DIR / "monthly_total_vs_entry.csv"
+OUT_RULE_HITS_CSV = PROCESSED_DIR / "seniority_rule_hits_monthly.csv"
 OUT_JOBS_CSV = PROCESSED_DIR / "jobs_all_with_dates_deduped_6m.csv"
 
+# Columns build_monthly needs when reading from the Parquet store
+MONTHLY_COLUMNS = ["country", "role_id", "posted_at", "title", "entry_mid"]
+
 
 # -----------------------------
 # CONFIG
 # -----------------------------
 COUNTRIES = {"DE", "AT", "CH"}
 
-ENTRY_KEYWORDS = [
-    r"\bentry\b",
-    r"\bjunior\b",
-    r"\btrainee\b",
-    r"\bintern\b",
-    r"\bpraktik\w*\b",
-    r"\bberufseinsteiger\w*\b",
-    r"\bgraduate\b",
-    r"\b0\W*[-–]?\W*2\s*(years|yrs|jahre)\b",
-    r"\b1\W*[-–]?\W*2\s*(years|yrs|jahre)\b",
-    r"\b(keine|ohne)\s*erfahrung\b",
-    r"\b0\s*jahre\b",
-    r"\b1\s*jahr\b",
-    r"\b2\s*jahre\b",
-]
-
 DATE_KEYS = [
     "postedAt",
     "posted_at",
@@ -57,153 +56,82 @@ DATE_KEYS = [
     "createdAt",
     "created_at",
 ]
+NESTED_DATE_CONTAINERS = ["jobPosting", "job", "posting", "data"]
 
 
 # -----------------------------
 # HELPERS
 # -----------------------------
-def _safe_str(x: Any) -> str:
-    return (x or "").strip() if isinstance(x, str) else str(x or "").strip()
-
-
-def _parse_date_any(val: Any) -> Optional[pd.Timestamp]:
+def extract_posted_date(obj: Dict[str, Any], scraped_at: Optional[str] = None) -> Optional[pd.Timestamp]:
     """
-    Поддержка:
-    - ISO строки
-    - unix timestamp (сек/мс)
-    - относительные "3 days ago" (грубо, но лучше чем ничего)
+    Дата публикации одной записи (`dates` из raw_jobs_stream):
+    ISO-строки, unix timestamp (сек/мс), относительные "3 days ago" от времени скрейпа.
+    Для многих записей — resolve_dates (см. load_all_jobs).
     """
-    if val is None:
-        return None
-
-    # unix timestamp
-    if isinstance(val, (int, float)):
-        v = int(val)
-        if v > 10_000_000_000:
-            return pd.to_datetime(v, unit="ms", utc=True, errors="coerce")
-        return pd.to_datetime(v, unit="s", utc=True, errors="coerce")
-
-    s = _safe_str(val)
-    if not s:
-        return None
-
-    dt = pd.to_datetime(s, utc=True, errors="coerce")
-    if pd.notna(dt):
-        return dt
-
-    # "x days/weeks/months ago"
-    m = re.search(r"(\d+)\s*(day|days|week|weeks|month|months)\s*ago", s.lower())
-    if m:
-        n = int(m.group(1))
-        unit = m.group(2)
-        now = pd.Timestamp.utcnow()
-        if "day" in unit:
-            return now - pd.Timedelta(days=n)
-        if "week" in unit:
-            return now - pd.Timedelta(weeks=n)
-        if "month" in unit:
-            return now - pd.DateOffset(months=n)
-
-    return None
-
-
-def extract_posted_date(obj: Dict[str, Any]) -> Optional[pd.Timestamp]:
-    for k in DATE_KEYS:
-        if k in obj:
-            dt = _parse_date_any(obj.get(k))
-            if dt is not None and pd.notna(dt):
-                return dt
-
-    for k in ["jobPosting", "job", "posting", "data"]:
-        sub = obj.get(k)
-        if isinstance(sub, dict):
-            for kk in DATE_KEYS:
-                if kk in sub:
-                    dt = _parse_date_any(sub.get(kk))
-                    if dt is not None and pd.notna(dt):
-                        return dt
-
-    return None
+    dt = resolve_dates([obj], DATE_KEYS, NESTED_DATE_CONTAINERS, reference=scraped_at).iloc[0]
+    return None if pd.isna(dt) else dt
 
 
 def is_entry_mid(text: str) -> bool:
-    t = (text or "").lower()
-    return any(re.search(pat, t) for pat in ENTRY_KEYWORDS)
-
-
-def iter_json_files(raw_dir: Path) -> Iterable[Path]:
-    if not raw_dir.exists():
-        return []
-    return raw_dir.rglob("*.json")
-
+    return get_entry_mid_classifier().is_entry(text)
 
-def infer_country_from_path(p: Path) -> Optional[str]:
-    parts = {x.upper() for x in p.parts}
-    for c in COUNTRIES:
-        if c in parts:
-            return c
-    return None
 
+def job_full_text(rec: Dict[str, Any]) -> str:
+    return " ".join([rec["title"], rec["description"], rec["seniority"]])
 
-def infer_role_id_from_path(p: Path) -> str:
-    return p.parent.name.strip().lower()
 
+def normalize_job(
+    rec: Dict[str, Any],
+    entry_mid: Optional[bool] = None,
+    posted_at: Optional[pd.Timestamp] = None,
+) -> Dict[str, Any]:
+    """
+    rec — запись из src.parsing.raw_jobs_stream (единый формат для всех анализаторов).
+    entry_mid / posted_at — заранее посчитанные пакетно (см. load_all_jobs); иначе считаются здесь.
+    """
+    title = rec["title"]
+    if posted_at is None:
+        posted_at = extract_posted_date(rec["dates"], rec.get("scraped_at"))
 
-def read_json_any(p: Path):
-    text = p.read_text(encoding="utf-8", errors="ignore").strip()
-    if not text:
-        return []
-
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        return []
-
-    if isinstance(data, list):
-        return data
-    if isinstance(data, dict):
-        return data.get("items") or data.get("results") or data.get("data") or []
-    return []
-
-
-
-def normalize_job(obj: Dict[str, Any], country: str, role_id: str, source_file: str) -> Dict[str, Any]:
-    title = _safe_str(obj.get("title") or obj.get("jobTitle") or obj.get("position") or "")
-    company = _safe_str(obj.get("companyName") or obj.get("company") or obj.get("company_name") or "")
-    location = _safe_str(obj.get("location") or obj.get("jobLocation") or obj.get("city") or "")
-    url = _safe_str(obj.get("url") or obj.get("jobUrl") or obj.get("link") or obj.get("applyUrl") or "")
-    description = _safe_str(obj.get("description") or obj.get("jobDescription") or obj.get("descriptionText") or "")
-
-    posted_dt = extract_posted_date(obj)
-
-    seniority = _safe_str(obj.get("seniorityLevel") or obj.get("seniority") or obj.get("experienceLevel") or "")
-    full_text = " ".join([title, description, seniority])
+    if entry_mid is None:
+        entry_mid = is_entry_mid(job_full_text(rec))
 
     return {
-        "country": country,
-        "role_id": role_id,
+        "country": rec["country"],
+        "role_id": rec["role_id"],
         "title": title,
-        "company": company,
-        "location": location,
-        "url": url,
-        "posted_at": posted_dt.isoformat() if posted_dt is not None and pd.notna(posted_dt) else "",
-        "entry_mid": int(is_entry_mid(full_text)),
-        "source_file": source_file,
+        "company": rec["company"],
+        "location": rec["location"],
+        "url": rec["url"],
+        "posted_at": posted_at,
+        "entry_mid": int(entry_mid),
+        "source_file": rec["source_file"],
     }
 
 
-def load_all_jobs() -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
-
-    for fp in iter_json_files(RAW_DIR):
-        country = infer_country_from_path(fp)
-        if not country:
-            continue
-        role_id = infer_role_id_from_path(fp)
-
-        items = read_json_any(fp)
-        for obj in items:
-            rows.append(normalize_job(obj, country, role_id, source_file=str(fp.relative_to(PROJECT_ROOT))))
+@instrumented()
+def load_all_jobs(near_threshold: Optional[float] = None) -> pd.DataFrame:
+    """
+    near_threshold — добавить колонку near_dup_cluster (MinHash/LSH по title + description),
+    по которой dedupe() схлопывает почти-дубликаты.
+    """
+    records = list(iter_raw_jobs(RAW_DIR))
+    new_ads = DedupIndex(scope="monthly_trends").touch(records)
+    print(f"[INFO] Raw jobs: {len(records)} (new since last run: {new_ads})")
+
+    # The same ad shows up under several Apify queries: classify each text once
+    entry = get_entry_mid_classifier().classify_many([job_full_text(rec) for rec in records])
+    entry_flags = entry["label"].tolist()
+    posted = resolve_dates(
+        [rec["dates"] for rec in records],
+        DATE_KEYS,
+        NESTED_DATE_CONTAINERS,
+        reference=[rec.get("scraped_at", "") for rec in records],
+    )
+    rows: List[Dict[str, Any]] = [
+        normalize_job(rec, entry_mid, posted_at)
+        for rec, entry_mid, posted_at in zip(records, entry_flags, posted)
+    ]
 
     if not rows:
         raise FileNotFoundError(
@@ -211,8 +139,16 @@ def load_all_jobs() -> pd.DataFrame:
         )
 
     df = pd.DataFrame(rows)
+    # Fired ENTRY_KEYWORDS per job (audit only, dropped before saving)
+    df["entry_rules"] = entry["rules"].to_numpy()
+
+    if near_threshold is not None:
+        df["near_dup_cluster"] = near_duplicate_clusters(
+            [job_text(rec["title"], rec["description"]) for rec in records],
+            threshold=near_threshold,
+        )
 
-    # posted_at -> datetime
+    # posted_at -> datetime (already parsed; None -> NaT)
     df["posted_at"] = pd.to_datetime(df["posted_at"], utc=True, errors="coerce")
     return df
 
@@ -224,15 +160,19 @@ def filter_last_6_months(df: pd.DataFrame) -> pd.DataFrame:
     return df2[df2["posted_at"] >= cutoff].copy()
 
 
+@instrumented()
 def dedupe(df: pd.DataFrame) -> pd.DataFrame:
     df2 = df.copy()
     for c in ["title", "company", "location"]:
         df2[c] = df2[c].fillna("").str.strip().str.lower()
 
     df2 = df2.drop_duplicates(subset=["country", "title", "company", "location"])
+    if "near_dup_cluster" in df2.columns:
+        df2 = df2.drop_duplicates(subset=["country", "near_dup_cluster"])
     return df2
 
 
+@instrumented()
 def build_monthly(df: pd.DataFrame) -> pd.DataFrame:
     df2 = df.copy()
     df2["month"] = df2["posted_at"].dt.to_period("M").dt.to_timestamp()
@@ -248,19 +188,68 @@ def build_monthly(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def main() -> None:
-    df_all = load_all_jobs()
+def load_jobs_from_store() -> pd.DataFrame:
+    """
+    Читаем из Parquet-стора только партиции за последние 6 месяцев
+    и только колонки, нужные для build_monthly.
+    """
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.DateOffset(months=6)
+    df = read_jobs(
+        columns=MONTHLY_COLUMNS,
+        since_month=cutoff.strftime("%Y-%m"),
+    )
+    return filter_last_6_months(df)
+
 
-    df_6m = filter_last_6_months(df_all)
-    df_6m_dedup = dedupe(df_6m)
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monthly total vs entry/mid jobs (DACH, 6m window).")
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="Build the monthly summary from data/processed/jobs (Parquet) instead of re-reading data/raw.",
+    )
+    parser.add_argument(
+        "--near-dedupe",
+        type=float,
+        default=None,
+        metavar="JACCARD",
+        help="Also collapse near-duplicate ads (MinHash/LSH over title + description, e.g. 0.8).",
+    )
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
+    if args.from_store:
+        df_6m_dedup = load_jobs_from_store()
+    else:
+        df_all = load_all_jobs(near_threshold=args.near_dedupe)
+
+        df_6m = filter_last_6_months(df_all)
+        df_6m_dedup = dedupe(df_6m)
+
+        # Which ENTRY_KEYWORDS fire on the final 6m sample (rule audit)
+        hits = rule_hit_stats(
+            count_rule_hits(df_6m_dedup["entry_rules"]),
+            len(df_6m_dedup),
+            get_entry_mid_classifier().rule_names,
+        )
+        hits.to_csv(OUT_RULE_HITS_CSV, index=False, encoding="utf-8")
+        print(f"- Entry rule hits:   {OUT_RULE_HITS_CSV}")
+        df_6m_dedup = df_6m_dedup.drop(columns=["entry_rules"])
 
-    df_6m_dedup.to_csv(OUT_JOBS_CSV, index=False, encoding="utf-8")
+        df_6m_dedup.to_csv(OUT_JOBS_CSV, index=False, encoding="utf-8")
+        # Full 6m snapshot: months that left the window are dropped from the store
+        partitions = write_jobs(df_6m_dedup, JOBS_STORE_DIR, prune=True)
+        print(f"- Jobs store:        {JOBS_STORE_DIR} ({len(partitions)} partitions written)")
 
     monthly = build_monthly(df_6m_dedup)
     monthly.to_csv(OUT_MONTHLY_CSV, index=False, encoding="utf-8")
 
     print("\n✅ MONTHLY TRENDS CREATED")
-    print(f"- Jobs (6m, deduped): {OUT_JOBS_CSV}")
+    if not args.from_store:
+        # --from-store leaves OUT_JOBS_CSV as it was
+        print(f"- Jobs (6m, deduped): {OUT_JOBS_CSV}")
     print(f"- Monthly summary:   {OUT_MONTHLY_CSV}")
     print(f"- Rows monthly:      {len(monthly)}")
 
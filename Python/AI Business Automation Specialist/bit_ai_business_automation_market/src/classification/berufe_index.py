@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+berufe_index.py
+
+Локальный векторный индекс по каталогу официальных профессий
+(data/processed/catalog_official_berufe.csv, см. fetch_official_catalogs.py).
+
+- FlatIndex — точный поиск (один matmul по всем строкам страны).
+- IVFIndex  — inverted file: сферический k-means по эмбеддингам,
+              поиск только в n_probe ближайших кластерах (только numpy).
+- BerufeIndex — по одному под-индексу на страну, сохраняется на диск:
+
+    data/processed/index/berufe_index.npz        (векторы, центроиды, списки)
+    data/processed/index/berufe_index_meta.csv   (строки каталога)
+    data/processed/index/berufe_index.json       (модель, параметры, хеш каталога)
+
+BerufeIndex.load сверяет хеш каталога с текущим catalog_official_berufe.csv:
+после обновления каталога (fetch_official_catalogs) старый индекс не грузится,
+нужен повторный build.
+
+Использование:
+    python -m src.classification.berufe_index build
+    python -m src.classification.berufe_index query "RPA Developer" "KI Prozessmanager" --k 5
+    python -m src.classification.berufe_index map --input titles.csv --column title --output mapped.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.classification.role_matcher import get_embedding_backend, get_embeddings
+from src.classification.similarity import _top_k_rows, normalize_rows
+from src.config import PROCESSED_DIR
+from src.fetching.fetch_official_catalogs import OUTPUT_FILE as CATALOG_CSV
+
+
+INDEX_DIR = PROCESSED_DIR / "index"
+INDEX_NAME = "berufe_index"
+
+META_COLUMNS = ["country", "source", "official_title", "kldb_code", "notes"]
+
+# Below this many rows per country IVF brings nothing, a flat index is used
+IVF_MIN_ROWS = 256
+
+
+# -----------------------------
+# INDEXES
+# -----------------------------
+class FlatIndex:
+    """Точный поиск по нормализованной матрице."""
+
+    kind = "flat"
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = normalize_rows(vectors)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return _top_k_rows(normalize_rows(queries) @ self.vectors.T, k)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f"{prefix}vectors": self.vectors}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> "FlatIndex":
+        obj = cls.__new__(cls)
+        obj.vectors = arrays[f"{prefix}vectors"]
+        return obj
+
+
+def spherical_kmeans(x: np.ndarray, n_lists: int, iters: int = 20, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k-means по косинусной метрике. Возвращает (центроиды, назначения строк).
+    """
+    rng = np.random.default_rng(seed)
+    n = x.shape[0]
+    n_lists = max(1, min(n_lists, n))
+    centroids = x[rng.choice(n, size=n_lists, replace=False)].copy()
+    assign = np.zeros(n, dtype=np.int64)
+
+    for _ in range(iters):
+        new_assign = np.argmax(x @ centroids.T, axis=1)
+        if _ > 0 and np.array_equal(new_assign, assign):
+            break
+        assign = new_assign
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = np.flatnonzero(np.abs(sums).sum(axis=1) == 0)
+        if len(empty):
+            sums[empty] = x[rng.choice(n, size=len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+
+    return centroids, assign
+
+
+class IVFIndex:
+    """
+    IVF-индекс: запрос сравнивается с центроидами, затем точно
+    досчитываются только строки из n_probe ближайших кластеров.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, vectors: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 4, seed: int = 0):
+        self.vectors = normalize_rows(vectors)
+        n = self.vectors.shape[0]
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        self.centroids, self.assign = spherical_kmeans(self.vectors, n_lists, seed=seed)
+        self.n_probe = n_probe
+        self.order, self.offsets = self.inverted_lists(self.assign, self.centroids.shape[0])
+
+    @staticmethod
+    def inverted_lists(assign: np.ndarray, n_lists: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (order, offsets): строки кластера c — order[offsets[c]:offsets[c + 1]],
+        по возрастанию номера строки.
+        """
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=offsets[1:])
+        return order, offsets
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        q = normalize_rows(queries)
+        n_probe = min(self.n_probe, self.centroids.shape[0])
+        probe, _ = _top_k_rows(q @ self.centroids.T, n_probe)
+
+        k = min(k, self.vectors.shape[0])
+        out_idx = np.full((q.shape[0], k), -1, dtype=np.int64)
+        out_scores = np.full((q.shape[0], k), -np.inf, dtype="float32")
+
+        order, offsets = self.order, self.offsets
+        for i in range(q.shape[0]):
+            # Slices of the inverted lists; sorted so ties resolve by row as in a full scan
+            cand = np.sort(np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe[i]]))
+            scores = self.vectors[cand] @ q[i]
+            idx, top = _top_k_rows(scores.reshape(1, -1), k)
+            m = idx.shape[1]
+            out_idx[i, :m] = cand[idx[0]]
+            out_scores[i, :m] = top[0]
+
+        return out_idx, out_scores
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}vectors": self.vectors,
+            f"{prefix}centroids": self.centroids,
+            f"{prefix}assign": self.assign,
+            f"{prefix}order": self.order,
+            f"{prefix}offsets": self.offsets,
+            f"{prefix}n_probe": np.array(self.n_probe),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> "IVFIndex":
+        obj = cls.__new__(cls)
+        obj.vectors = arrays[f"{prefix}vectors"]
+        obj.centroids = arrays[f"{prefix}centroids"]
+        obj.assign = arrays[f"{prefix}assign"]
+        obj.n_probe = int(arrays[f"{prefix}n_probe"])
+        if f"{prefix}order" in arrays:
+            obj.order = arrays[f"{prefix}order"]
+            obj.offsets = arrays[f"{prefix}offsets"]
+        else:  # index saved before inverted lists were persisted
+            obj.order, obj.offsets = cls.inverted_lists(obj.assign, obj.centroids.shape[0])
+        return obj
+
+
+# -----------------------------
+# CATALOG INDEX
+# -----------------------------
+def _catalog_texts(df: pd.DataFrame) -> List[str]:
+    """Тот же текст, что и в report_official_berufe_similarity (общий кэш эмбеддингов)."""
+    return (df["official_title"].fillna("") + " " + df["notes"].fillna("")).tolist()
+
+
+def load_catalog(path: Path = CATALOG_CSV) -> pd.DataFrame:
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Catalog not found: {path}. Сначала запусти: python -m src.fetching.fetch_official_catalogs"
+        )
+    df = pd.read_csv(path, sep=";", dtype=str).fillna("")
+    for col in META_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+        df[col] = df[col].astype(str).str.strip().str.replace(r"\s+", " ", regex=True)
+    return df[META_COLUMNS].reset_index(drop=True)
+
+
+def catalog_sha256(meta: pd.DataFrame) -> str:
+    """Хеш строк каталога (колонки META_COLUMNS, как после load_catalog)."""
+    return hashlib.sha256(
+        pd.util.hash_pandas_object(meta[META_COLUMNS].reset_index(drop=True), index=False).values.tobytes()
+    ).hexdigest()
+
+
+class BerufeIndex:
+    """
+    Индекс официальных профессий с под-индексом на каждую страну.
+    """
+
+    def __init__(self, meta: pd.DataFrame, indexes: Dict[str, object], info: Dict[str, object]):
+        self.meta = meta
+        self.indexes = indexes
+        self.info = info
+        # country -> global row positions in meta
+        self.rows = {c: np.flatnonzero(meta["country"].to_numpy() == c) for c in indexes}
+
+    @classmethod
+    def build(
+        cls,
+        catalog: pd.DataFrame,
+        kind: str = "auto",
+        n_probe: int = 4,
+        seed: int = 0,
+    ) -> "BerufeIndex":
+        meta = catalog[META_COLUMNS].reset_index(drop=True)
+        vectors = get_embeddings(_catalog_texts(meta))
+
+        indexes: Dict[str, object] = {}
+        for country in sorted(meta["country"].unique()):
+            rows = np.flatnonzero(meta["country"].to_numpy() == country)
+            sub = vectors[rows]
+            use_ivf = kind == "ivf" or (kind == "auto" and len(rows) >= IVF_MIN_ROWS)
+            indexes[country] = IVFIndex(sub, n_probe=n_probe, seed=seed) if use_ivf else FlatIndex(sub)
+
+        info = {
+            "model": get_embedding_backend().name,
+            "dim": int(vectors.shape[1]),
+            "rows": int(len(meta)),
+            "catalog_sha256": catalog_sha256(meta),
+            "kinds": {c: idx.kind for c, idx in indexes.items()},
+        }
+        return cls(meta, indexes, info)
+
+    def save(self, out_dir: Path = INDEX_DIR) -> Path:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        arrays: Dict[str, np.ndarray] = {}
+        for country, idx in self.indexes.items():
+            arrays.update(idx.to_arrays(f"{country}__"))
+        np.savez(out_dir / f"{INDEX_NAME}.npz", **arrays)
+        self.meta.to_csv(out_dir / f"{INDEX_NAME}_meta.csv", sep=";", index=False)
+        (out_dir / f"{INDEX_NAME}.json").write_text(json.dumps(self.info, indent=2), encoding="utf-8")
+        return out_dir
+
+    @classmethod
+    def load(cls, in_dir: Path = INDEX_DIR, catalog_path: Optional[Path] = CATALOG_CSV) -> "BerufeIndex":
+        """
+        Индекс с диска. Если каталог catalog_path есть и его хеш не совпадает
+        с хешем, с которым строился индекс, — ValueError (индекс устарел).
+        catalog_path=None — без проверки.
+        """
+        info_path = in_dir / f"{INDEX_NAME}.json"
+        if not info_path.exists():
+            raise FileNotFoundError(
+                f"Index not found: {info_path}. Сначала запусти: python -m src.classification.berufe_index build"
+            )
+        info = json.loads(info_path.read_text(encoding="utf-8"))
+        if catalog_path is not None and catalog_path.exists():
+            current = catalog_sha256(load_catalog(catalog_path))
+            if current != info.get("catalog_sha256"):
+                raise ValueError(
+                    f"Index was built from another version of {catalog_path}. "
+                    f"Пересобери: python -m src.classification.berufe_index build"
+                )
+        meta = pd.read_csv(in_dir / f"{INDEX_NAME}_meta.csv", sep=";", dtype=str).fillna("")
+
+        indexes: Dict[str, object] = {}
+        with np.load(in_dir / f"{INDEX_NAME}.npz") as arrays:
+            loaded = {k: arrays[k] for k in arrays.files}
+        for country, kind in info["kinds"].items():
+            idx_cls = IVFIndex if kind == "ivf" else FlatIndex
+            indexes[country] = idx_cls.from_arrays(loaded, f"{country}__")
+
+        return cls(meta, indexes, info)
+
+    def search_vectors(
+        self,
+        queries: np.ndarray,
+        k: int = 5,
+        countries: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """{country: (global row indices, scores)} для матрицы запросов."""
+        out = {}
+        for country in countries or list(self.indexes):
+            if country not in self.indexes:
+                continue
+            idx, scores = self.indexes[country].search(queries, k)
+            rows = self.rows[country]
+            global_idx = np.where(idx >= 0, rows[np.clip(idx, 0, None)], -1)
+            out[country] = (global_idx, scores)
+        return out
+
+    def query(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        countries: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Свободный текст / job title -> ближайшие официальные Berufe по странам.
+        Все запросы эмбеддятся одним батчем.
+        """
+        backend = get_embedding_backend()
+        if backend.name != self.info.get("model"):
+            raise ValueError(
+                f"Index was built with '{self.info.get('model')}', current embedding backend is '{backend.name}'."
+            )
+
+        texts = list(texts)
+        queries = get_embeddings(texts)
+        rows = []
+        for country, (idx, scores) in self.search_vectors(queries, k, countries).items():
+            for qi, text in enumerate(texts):
+                for rank, (pos, score) in enumerate(zip(idx[qi], scores[qi]), start=1):
+                    if pos < 0:
+                        continue
+                    rec = self.meta.iloc[int(pos)]
+                    rows.append(
+                        {
+                            "query": text,
+                            "country": country,
+                            "rank": rank,
+                            "official_title": rec["official_title"],
+                            "source": rec["source"],
+                            "kldb_code": rec["kldb_code"],
+                            "similarity": float(score),
+                        }
+                    )
+        return pd.DataFrame(
+            rows,
+            columns=["query", "country", "rank", "official_title", "source", "kldb_code", "similarity"],
+        )
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vector index over the official Berufe catalog (DE/AT/CH).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="Build the index from catalog_official_berufe.csv and save it.")
+    p_build.add_argument("--kind", choices=["auto", "flat", "ivf"], default="auto")
+    p_build.add_argument("--n-probe", type=int, default=4)
+
+    p_query = sub.add_parser("query", help="Nearest official Berufe for free-text queries.")
+    p_query.add_argument("texts", nargs="+")
+    p_query.add_argument("--k", type=int, default=5)
+    p_query.add_argument("--country", action="append", default=None)
+
+    p_map = sub.add_parser("map", help="Map a column of job titles (CSV) to the nearest official Berufe.")
+    p_map.add_argument("--input", required=True)
+    p_map.add_argument("--column", default="title")
+    p_map.add_argument("--output", required=True)
+    p_map.add_argument("--k", type=int, default=1)
+    p_map.add_argument("--country", action="append", default=None)
+
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        index = BerufeIndex.build(load_catalog(), kind=args.kind, n_probe=args.n_probe)
+        out_dir = index.save()
+        print(f"[INFO] Index saved → {out_dir} ({index.info['rows']} rows, {index.info['kinds']})")
+        return
+
+    index = BerufeIndex.load()
+
+    if args.cmd == "query":
+        res = index.query(args.texts, k=args.k, countries=args.country)
+        print(res.to_string(index=False))
+        return
+
+    titles = pd.read_csv(args.input, dtype=str)[args.column].fillna("")
+    unique = titles.drop_duplicates().tolist()
+    res = index.query(unique, k=args.k, countries=args.country)
+    res.to_csv(args.output, index=False)
+    print(f"[INFO] Mapped {len(unique)} unique titles → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# src/classification/embedding_cache.py
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Нормализация текста для ключа кэша: trim + схлопывание пробелов."""
+    return " ".join((text or "").split())
+
+
+def cache_key(model: str, text: str) -> str:
+    """Content-addressed ключ: sha256(model + нормализованный текст)."""
+    payload = f"{model}\n{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Персистентный кэш эмбеддингов в SQLite.
+
+    Ключ — sha256(model + normalized text), значение — float32-вектор (BLOB).
+    Счётчики hits / misses показывают, сколько запросов к API удалось избежать.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vec BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        row = self.conn.execute(
+            "SELECT vec FROM embeddings WHERE key = ?", (cache_key(model, text),)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return np.frombuffer(row[0], dtype="float32").copy()
+
+    def get_many(self, model: str, texts: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Пакетный lookup. Возвращает {normalized_text: vector} только для найденных.
+        """
+        by_key = {cache_key(model, t): normalize_text(t) for t in texts}
+        found: Dict[str, np.ndarray] = {}
+
+        keys = list(by_key)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[by_key[key]] = np.frombuffer(blob, dtype="float32").copy()
+
+        self.hits += len(found)
+        self.misses += len(by_key) - len(found)
+        return found
+
+    def put(self, model: str, text: str, vec: np.ndarray) -> None:
+        self.put_many(model, {text: vec})
+
+    def put_many(self, model: str, items: Dict[str, np.ndarray]) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for text, vec in items.items():
+            arr = np.asarray(vec, dtype="float32").ravel()
+            rows.append((cache_key(model, text), model, int(arr.shape[0]), arr.tobytes(), now))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vec, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,5 +1,5 @@
 import re
-from skills_dictionary import HARD_SKILLS, TOOLS, SOFT_SKILLS
+from src.classification.skills_dictionary import HARD_SKILLS, TOOLS, SOFT_SKILLS
 
 def extract_skills_from_text(text: str):
     text = text.lower()
@@ -1,138 +1,86 @@
-import json
-from pathlib import Path
+import argparse
 
 import pandas as pd
 
-from src.classification.skill_extractor import extract_skills
-from src.classification.skills_dictionary import HARD_SKILLS, SOFT_SKILLS, TOOLS
-
-
-RAW_DIR = Path("data/raw")
-OUT_FILE = Path("data/processed/job_skills_extracted.csv")
-
-
-def _to_key_label_map(x) -> dict[str, str]:
-    """
-    Normalize skills dictionaries to mapping: skill_key -> label.
-    Supports:
-      - dict: {"skill_sql": "SQL", ...} or {"skill_sql": {"label":"SQL"}, ...}
-      - list[str]: ["skill_sql", ...]  (label = key)
-      - list[dict]: [{"key":"skill_sql","label":"SQL"}, ...]
-      - list[tuple]: [("skill_sql","SQL"), ...]
-    """
-    if x is None:
-        return {}
-
-    if isinstance(x, dict):
-        out = {}
-        for k, v in x.items():
-            if isinstance(v, str):
-                out[k] = v
-            elif isinstance(v, dict):
-                out[k] = v.get("label") or v.get("name") or k
-            else:
-                out[k] = k
-        return out
-
-    if isinstance(x, list):
-        out = {}
-        for item in x:
-            if isinstance(item, str):
-                out[item] = item
-            elif isinstance(item, tuple) and len(item) >= 2:
-                out[str(item[0])] = str(item[1])
-            elif isinstance(item, dict):
-                k = item.get("key") or item.get("id") or item.get("name")
-                if not k:
-                    continue
-                out[str(k)] = str(item.get("label") or item.get("title") or k)
-        return out
-
-    return {}
-
-
-HARD_MAP = _to_key_label_map(HARD_SKILLS)
-SOFT_MAP = _to_key_label_map(SOFT_SKILLS)
-TOOLS_MAP = _to_key_label_map(TOOLS)
-
-ALL_KNOWN_KEYS = set(HARD_MAP) | set(SOFT_MAP) | set(TOOLS_MAP)
-
-
-def _pick_labels(flags: dict, key_label: dict[str, str]) -> list[str]:
-    labels = []
-    for k, label in key_label.items():
-        if flags.get(k, 0):
-            labels.append(label)
-    return labels
-
-
-rows = []
-
-for country_dir in RAW_DIR.iterdir():
-    if not country_dir.is_dir():
-        continue
-
-    country = country_dir.name
-
-    for role_dir in country_dir.iterdir():
-        if not role_dir.is_dir():
-            continue
-
-        role_id = role_dir.name
-
-        for json_file in role_dir.glob("*.json"):
-            try:
-                with open(json_file, "r", encoding="utf-8", errors="ignore") as f:
-                    data = json.load(f)
-            except Exception:
-                continue
-
-            if not isinstance(data, list) or not data:
-                continue
-
-            for job in data:
-                if not isinstance(job, dict):
-                    continue
-
-                desc = job.get("description", "") or ""
-                title = job.get("title", "") or ""
-                url = job.get("jobUrl") or job.get("jobURL") or job.get("url")
-
-                if not desc or not url:
-                    continue
-
-                flags = extract_skills(desc)
-
-                if not isinstance(flags, dict):
-                    continue
-
-                hard = _pick_labels(flags, HARD_MAP)
-                soft = _pick_labels(flags, SOFT_MAP)
-                tools = _pick_labels(flags, TOOLS_MAP)
-
-                unknown_hits = [k for k, v in flags.items() if v and k not in ALL_KNOWN_KEYS]
-
-                rows.append(
-                    {
-                        "country": country,
-                        "role_id": role_id,
-                        "title": title,
-                        "url": url,
-                        "hard_skills": "; ".join(hard),
-                        "soft_skills": "; ".join(soft),
-                        "tools": "; ".join(tools),
-                        "unknown_skill_keys": "; ".join(unknown_hits),
-                        "skill_flags": json.dumps(flags, ensure_ascii=False),
-                        "source_json": str(json_file).replace("\\", "/"),
-                    }
-                )
-
-df = pd.DataFrame(rows)
-
-if df.empty:
-    print("❌ No skills extracted (df is empty). Check raw JSON descriptions and extractor rules.")
-else:
-    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(OUT_FILE, index=False, encoding="utf-8")
-    print(f"✅ Saved {len(df)} rows → {OUT_FILE}")
-    print("Columns:", df.columns.tolist())
+from src.classification.skill_extractor import extract_skills_frame, get_skill_matcher
+from src.classification.skill_store import (
+    SKILLS_PARQUET,
+    SKILLS_REGISTRY,
+    append_skill_table,
+    build_registry,
+    write_skill_table,
+)
+from src.config import RAW_DIR
+from src.instrumentation import add_profile_arg, enable_profiling, measure
+from src.parsing.dedup_index import DedupIndex
+from src.parsing.raw_jobs_stream import iter_raw_jobs
+
+
+OUT_FILE = SKILLS_PARQUET
+
+# Dedup-index scope: ads whose skills are already in OUT_FILE (per country/role)
+DEDUP_SCOPE = "job_skills"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Extract skills from raw Apify jobs → job_skills_extracted.parquet (+ skill registry JSON)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process ads not yet in the dedup index and append them to the existing table.",
+    )
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
+    index = DedupIndex(scope=DEDUP_SCOPE, per_role=True)
+    incremental = args.incremental and OUT_FILE.exists() and SKILLS_REGISTRY.exists()
+
+    jobs = [job for job in iter_raw_jobs(RAW_DIR) if job["description"] and job["url"]]
+    # Both paths drop repeats inside the export (same ad, same country/role); the incremental
+    # one also drops ads already in OUT_FILE. The index is touched only once the rows are stored.
+    jobs = index.filter_new(jobs, touch=False, ignore_stored=not incremental)
+    if incremental:
+        print(f"[INFO] Incremental: {index.new} new ads, {index.known} already extracted")
+    else:
+        print(f"[INFO] Full rebuild: {index.new} ads, {index.known} repeats dropped")
+
+    with measure("extract_skills", rows_in=len(jobs)) as m:
+        meta = pd.DataFrame({
+            "country": [job["country"] for job in jobs],
+            "role_id": [job["role_id"] for job in jobs],
+            "title": [job["title"] for job in jobs],
+            "url": [job["url"] for job in jobs],
+            "source_json": [job["source_file"] for job in jobs],
+        })
+        # One uint8 column per skill; repeated descriptions (same ad under several queries) are scanned once
+        skills = extract_skills_frame([job["description"] for job in jobs])
+        df = pd.concat([meta, skills], axis=1)
+        m.rows_out = len(df)
+
+    registry = build_registry(get_skill_matcher().skill_cols)
+
+    if incremental:
+        if not df.empty:
+            append_skill_table(df, registry)
+            index.touch(jobs)
+        print(f"✅ Appended {len(df)} rows → {OUT_FILE}")
+        return
+
+    if df.empty:
+        print("❌ No skills extracted (df is empty). Check raw JSON descriptions and extractor rules.")
+    else:
+        write_skill_table(df, registry)
+        print(f"✅ Saved {len(df)} rows → {OUT_FILE}")
+        print(f"✅ Skill registry ({len(registry['skills'])} skills) → {SKILLS_REGISTRY}")
+
+        # Full rebuild: the index now describes exactly what is in OUT_FILE
+        index.reset()
+        index.touch(jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Below this many distinct values a process pool costs more than it saves
+PARALLEL_MIN_UNIQUES = 1000
+
+# Several chunks per worker keep the pool busy when values take uneven time
+CHUNKS_PER_WORKER = 4
+
+
+def factorize(values) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Codes (one per input value) and the distinct values in first-seen order,
+    so that `uniques[codes[i]] == values[i]`.
+
+    Series / arrays go through pd.factorize; any other sequence (e.g. tuples
+    of several columns) through a plain dict.
+    """
+    if isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        return codes, list(uniques)
+
+    index: dict = {}
+    codes = np.fromiter(
+        (index.setdefault(v, len(index)) for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return codes, list(index)
+
+
+def _run(func: Callable, uniques: List[Any], workers: int, unpack: bool) -> List[Any]:
+    if workers > 1 and len(uniques) >= PARALLEL_MIN_UNIQUES:
+        chunksize = max(1, len(uniques) // (workers * CHUNKS_PER_WORKER))
+        args = list(zip(*uniques)) if unpack else [uniques]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(func, *args, chunksize=chunksize))
+
+    if unpack:
+        return [func(*u) for u in uniques]
+    return [func(u) for u in uniques]
+
+
+def apply_unique(
+    values,
+    func: Callable,
+    workers: int = 1,
+    unpack: bool = False,
+):
+    """
+    Apply `func` once per distinct value and broadcast the results back.
+
+    - values: Series, array or sequence (with unpack=True, a sequence of tuples
+      whose items are passed as positional arguments);
+    - workers > 1 evaluates the distinct values in a process pool
+      (func must then be picklable, i.e. a module-level function).
+
+    Returns a Series with the input's index for Series input, otherwise a list.
+    """
+    codes, uniques = factorize(values)
+    results = np.empty(len(uniques), dtype=object)
+    for i, res in enumerate(_run(func, uniques, workers, unpack)):
+        results[i] = res
+    out = results[codes]
+
+    if isinstance(values, pd.Series):
+        return pd.Series(out, index=values.index, name=values.name).infer_objects()
+    return out.tolist()
+
+
+def apply_unique_columns(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    func: Callable,
+    workers: int = 1,
+) -> pd.Series:
+    """
+    Row-wise `func(*row[columns])`, evaluated once per distinct combination
+    of the column values. Returns a Series aligned with df.index.
+    """
+    rows = list(zip(*(df[c].tolist() for c in columns)))
+    out = apply_unique(rows, func, workers=workers, unpack=True)
+    return pd.Series(out, index=df.index, dtype=object).infer_objects()
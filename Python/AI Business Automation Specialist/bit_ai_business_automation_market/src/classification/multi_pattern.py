@@ -0,0 +1,381 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+try:  # Python 3.11+
+    import re._parser as _sre_parse
+    import re._constants as _sre_c
+except ImportError:  # pragma: no cover - older Pythons
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_c
+
+
+# Zero-width nodes: they do not consume text, so literals on both sides stay contiguous
+_ZERO_WIDTH = {_sre_c.AT}
+_REPEATS = {_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT}
+if hasattr(_sre_c, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(_sre_c.POSSESSIVE_REPEAT)
+
+
+def _best(candidates: List[List[str]]) -> Optional[List[str]]:
+    # The alternative set whose shortest member is longest is the most selective anchor
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (min(len(a) for a in c), -len(c)))
+
+
+def _sequence_anchors(items) -> Optional[List[str]]:
+    """Literals one of which every match of the parsed sequence contains (None if unknown)."""
+    candidates: List[List[str]] = []
+    run: List[str] = []
+    for op, av in items:
+        if op is _sre_c.LITERAL:
+            run.append(chr(av))
+            continue
+        if op in _ZERO_WIDTH:
+            continue
+        if run:
+            candidates.append(["".join(run)])
+            run = []
+        sub: Optional[List[str]] = None
+        if op is _sre_c.SUBPATTERN:
+            _group, add_flags, _del_flags, p = av
+            if not add_flags & re.IGNORECASE:
+                sub = _sequence_anchors(p)
+        elif op is _sre_c.BRANCH:
+            alts = [_sequence_anchors(b) for b in av[1]]
+            if all(a is not None for a in alts):
+                sub = sorted({lit for a in alts for lit in a})
+        elif op in _REPEATS:
+            lo, _hi, p = av
+            if lo >= 1:
+                sub = _sequence_anchors(p)
+        if sub:
+            candidates.append(sub)
+    if run:
+        candidates.append(["".join(run)])
+    return _best(candidates)
+
+
+def pattern_anchors(pattern: str, flags: int = 0) -> Optional[List[str]]:
+    """
+    Literals one of which occurs in every match of `pattern` (e.g. r"\\bpraktik\\w*\\b" -> ["praktik"],
+    r"\\b0\\s*(years|jahre)\\b" -> ["jahre", "years"]), or None if no such literal is known.
+    """
+    parsed = _sre_parse.parse(pattern, flags)
+    if parsed.state.flags & re.IGNORECASE and not flags & re.IGNORECASE:
+        return None  # inline (?i): the anchor scan would be case-sensitive
+    return _sequence_anchors(list(parsed))
+
+
+def rule_anchors(rules: Mapping[str, Sequence[str]], flags: int = 0) -> List[Optional[List[str]]]:
+    """
+    Per rule: anchors (literals one of which every matching text contains),
+    or None when some pattern has no anchor (such rules are always confirmed).
+    """
+    out: List[Optional[List[str]]] = []
+    for patterns in rules.values():
+        anchors: Set[str] = set()
+        for p in patterns:
+            a = pattern_anchors(p, flags)
+            if a is None:
+                anchors = set()
+                break
+            anchors.update(a)
+        out.append(sorted(anchors) if anchors else None)
+    return out
+
+
+_CATEGORY_RE = {
+    name: re.compile(esc)
+    for esc, names in {
+        r"\d": ("CATEGORY_DIGIT", "CATEGORY_UNI_DIGIT"),
+        r"\D": ("CATEGORY_NOT_DIGIT", "CATEGORY_UNI_NOT_DIGIT"),
+        r"\s": ("CATEGORY_SPACE", "CATEGORY_UNI_SPACE"),
+        r"\S": ("CATEGORY_NOT_SPACE", "CATEGORY_UNI_NOT_SPACE"),
+        r"\w": ("CATEGORY_WORD", "CATEGORY_UNI_WORD"),
+        r"\W": ("CATEGORY_NOT_WORD", "CATEGORY_UNI_NOT_WORD"),
+    }.items()
+    for name in names
+}
+_BOUNDARIES = {"AT_BOUNDARY", "AT_NON_BOUNDARY", "AT_UNI_BOUNDARY", "AT_UNI_NON_BOUNDARY"}
+# "$" matches before a trailing "\n", "^" after any "\n" under re.MULTILINE
+_LINE_ANCHORS = {"AT_BEGINNING_LINE", "AT_END_LINE", "AT_END"}
+
+
+def _in_class(items, ch: str) -> Optional[bool]:
+    """Membership of `ch` in a parsed [...] class (None if the class has an unknown item)."""
+    negate, hit = False, False
+    for op, av in items:
+        if op is _sre_c.NEGATE:
+            negate = True
+        elif op is _sre_c.LITERAL:
+            hit = hit or chr(av) == ch
+        elif op is _sre_c.RANGE:
+            hit = hit or av[0] <= ord(ch) <= av[1]
+        elif op is _sre_c.CATEGORY and str(av) in _CATEGORY_RE:
+            hit = hit or bool(_CATEGORY_RE[str(av)].fullmatch(ch))
+        else:
+            return None
+    return hit != negate
+
+
+def _sequence_sensitive(items, a: str, b: str, flags: int) -> bool:
+    for op, av in items:
+        if op in (_sre_c.LITERAL, _sre_c.NOT_LITERAL):
+            if chr(av) in (a, b):
+                return True
+        elif op is _sre_c.ANY:
+            if not flags & re.DOTALL and (a == "\n") != (b == "\n"):
+                return True
+        elif op is _sre_c.IN:
+            in_a = _in_class(av, a)
+            if in_a is None or in_a != _in_class(av, b):
+                return True
+        elif op is _sre_c.AT:
+            line = str(av) in _LINE_ANCHORS or (str(av) == "AT_BEGINNING" and flags & re.MULTILINE)
+            if line and "\n" in (a, b):
+                return True
+            if str(av) in _BOUNDARIES and bool(_CATEGORY_RE["CATEGORY_WORD"].fullmatch(a)) != bool(
+                _CATEGORY_RE["CATEGORY_WORD"].fullmatch(b)
+            ):
+                return True
+        elif op is _sre_c.SUBPATTERN:
+            _group, add_flags, del_flags, p = av
+            if _sequence_sensitive(p, a, b, (flags | add_flags) & ~del_flags):
+                return True
+        elif op is _sre_c.BRANCH:
+            if any(_sequence_sensitive(p, a, b, flags) for p in av[1]):
+                return True
+        elif op in _REPEATS:
+            if _sequence_sensitive(av[2], a, b, flags):
+                return True
+        elif op in (_sre_c.ASSERT, _sre_c.ASSERT_NOT):
+            if _sequence_sensitive(av[1], a, b, flags):
+                return True
+        elif op is getattr(_sre_c, "ATOMIC_GROUP", None):
+            if _sequence_sensitive(av, a, b, flags):
+                return True
+        else:
+            # Back-references and anything unknown: assume the pattern can tell a from b
+            return True
+    return False
+
+
+def separator_sensitive(pattern: str, a: str, b: str, flags: int = 0) -> bool:
+    """
+    Whether `pattern` can match differently when one character `a` of the text is
+    replaced by `b` (e.g. the " " / "\n" between title and description).
+
+    False only if every node treats the two characters alike (\\s, \\W, \\b for
+    " " and "\n"); then a match path over one text is a match path over the other.
+    Separators that are not single characters always count as sensitive.
+    """
+    if len(a) != 1 or len(b) != 1:
+        return a != b
+    if a == b:
+        return False
+    parsed = _sre_parse.parse(pattern, flags)
+    return _sequence_sensitive(list(parsed), a, b, parsed.state.flags)
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    One regex for a set of literals, factored as a trie ("api", "apis", "and" -> a(?:pi(?:s)?|nd)).
+    At every position it matches the longest literal that starts there.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # Greedy "?": a longer literal is tried before stopping at this one
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def literal_groups(literals: Sequence[str], min_len: int = 4) -> List[Tuple[str, Tuple[int, ...]]]:
+    """
+    Literals grouped under a shared substring key ("3+ years", "5+ years" -> " years"):
+    [(key, literal indices)]. Each literal is a superstring of its key, so a text that
+    lacks the key lacks the whole group and one `in` check skips all of its literals.
+    A literal that shares no substring of length >= `min_len` is its own key.
+    """
+    subs = [
+        {lit[i:j] for i in range(len(lit)) for j in range(i + min_len, len(lit) + 1)}
+        for lit in literals
+    ]
+    shared = Counter(sub for lit_subs in subs for sub in lit_subs)
+
+    groups: Dict[str, List[int]] = {}
+    for i, (lit, lit_subs) in enumerate(zip(literals, subs)):
+        # The substring shared by the most literals (longer wins ties) is the most useful key
+        key = max(lit_subs, key=lambda sub: (shared[sub], len(sub)), default=lit)
+        if shared[key] < 2:
+            key = lit
+        groups.setdefault(key, []).append(i)
+    return [(key, tuple(idx)) for key, idx in groups.items()]
+
+
+class MultiPatternMatcher:
+    """
+    Matcher for many named regex rules.
+
+    `match_indices` scans the text once for candidates, then confirms only
+    the candidate rules:
+
+    1) every rule gets anchors — literals one of which every match contains
+       (see `rule_anchors`);
+    2) one `findall` over the text with a lookahead around a trie regex of
+       all anchors reports, at every position, the longest anchor starting
+       there; the anchors that are substrings of a hit occur as well, so no
+       anchor occurrence is missed and the candidate set is complete;
+    3) each candidate rule (and each rule without anchors) runs its own
+       compiled `search`, so the result is exactly the set of rules for
+       which `re.search` would succeed. For an anchored rule of bounded
+       width the search starts `width` characters before the first anchor
+       occurrence (no match can start earlier), which skips most of the text
+       for word rules like r"\bund\b".
+
+    `first` uses one alternation of lookaheads:
+
+        (?=(?P<r0>p0a|p0b))|(?=(?P<r1>p1a))|...
+
+    so one `finditer` over the text reports, at every position, the first
+    rule (in rule order) that matches there. It is compiled on the first call.
+
+    `anchors` takes a precomputed `rule_anchors(rules, flags)` (e.g. from the
+    compiled taxonomy cache).
+    """
+
+    def __init__(
+        self,
+        rules: Mapping[str, Sequence[str]],
+        flags: int = 0,
+        anchors: Optional[Sequence[Optional[Sequence[str]]]] = None,
+    ):
+        self.names: List[str] = list(rules)
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        self._single: List[Optional[re.Pattern]] = []
+        parts = []
+        for i, patterns in enumerate(rules.values()):
+            if not patterns:
+                self._single.append(None)
+                continue
+            body = "|".join(f"(?:{p})" for p in patterns)
+            self._single.append(re.compile(body, flags))
+            parts.append(f"(?=(?P<r{i}>{body}))")
+
+        self._flags = flags
+        self._parts = parts
+        self._combined: Optional[re.Pattern] = None
+
+        if anchors is None:
+            anchors = rule_anchors(rules, flags)
+        if len(anchors) != len(self.names):
+            raise ValueError("anchors must have one entry per rule")
+
+        # Rules without anchors are confirmed on every text
+        self._unanchored: List[int] = [
+            i for i, a in enumerate(anchors) if a is None and self._single[i] is not None
+        ]
+
+        fold = str.lower if flags & re.IGNORECASE else (lambda s: s)
+        owners: Dict[str, Set[int]] = {}
+        for i, a in enumerate(anchors):
+            if a is None or self._single[i] is None:
+                continue
+            for lit in a:
+                owners.setdefault(fold(lit), set()).add(i)
+        self._fold = fold
+        # rule -> (anchors, longest match) for case-sensitive anchored rules of bounded width
+        self._lead: Dict[int, Tuple[List[str], int]] = {}
+        if not flags & re.IGNORECASE:
+            for i, a in enumerate(anchors):
+                if a is None or self._single[i] is None:
+                    continue
+                width = _sre_parse.parse(self._single[i].pattern, flags).getwidth()[1]
+                if width < _sre_c.MAXREPEAT:
+                    self._lead[i] = (list(a), width)
+        self._anchor_rules = self._hit_closure(owners)
+        self._all_anchored = frozenset(r for rs in owners.values() for r in rs)
+        # Zero-width lookahead: findall reports the longest anchor at every position, overlaps included
+        self._anchor_re: Optional[re.Pattern] = (
+            re.compile(f"(?=({trie_regex(owners)}))", flags) if owners else None
+        )
+
+    @staticmethod
+    def _hit_closure(owners: Mapping[str, Set[int]]) -> Dict[str, frozenset]:
+        """hit anchor -> rules of every anchor that is a substring of it (they occur as well)."""
+        closure: Dict[str, frozenset] = {}
+        for hit in owners:
+            inside = {hit[i:j] for i in range(len(hit)) for j in range(i + 1, len(hit) + 1)}
+            closure[hit] = frozenset(r for lit in inside & owners.keys() for r in owners[lit])
+        return closure
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self, text: str) -> Set[int]:
+        """Rules whose anchors occur in `text` (one scan), plus rules without anchors."""
+        found: Set[int] = set(self._unanchored)
+        if not text or self._anchor_re is None:
+            return found
+
+        for hit in set(self._anchor_re.findall(text)):
+            # Unknown fold (exotic case mapping): every anchored rule is a candidate
+            found |= self._anchor_rules.get(self._fold(hit), self._all_anchored)
+        return found
+
+    def confirm(self, i: int, text: str) -> bool:
+        """Whether rule `i` matches anywhere in `text` (no anchor scan)."""
+        pattern = self._single[i]
+        if pattern is None:
+            return False
+        pos = 0
+        lead = self._lead.get(i)
+        if lead is not None:
+            anchors, width = lead
+            found = [p for p in (text.find(lit) for lit in anchors) if p >= 0]
+            if not found:
+                return False
+            pos = max(0, min(found) - width)
+        return pattern.search(text, pos) is not None
+
+    def match_indices(self, text: str) -> Set[int]:
+        """Indices of all rules that match anywhere in `text`."""
+        if not text:
+            return set()
+        return {i for i in self.candidates(text) if self.confirm(i, text)}
+
+    def matches(self, text: str) -> List[str]:
+        """Names of all matching rules, in rule order."""
+        return [self.names[i] for i in sorted(self.match_indices(text))]
+
+    def first(self, text: str) -> Optional[str]:
+        """Name of the highest-priority (earliest) rule that matches, or None."""
+        if not text or not self._parts:
+            return None
+        if self._combined is None:
+            self._combined = re.compile("|".join(self._parts), self._flags)
+
+        best: Optional[int] = None
+        for m in self._combined.finditer(text):
+            idx = int(m.lastgroup[1:])
+            if best is None or idx < best:
+                best = idx
+                if best == 0:
+                    break
+        return self.names[best] if best is not None else None
+
+    def matches_many(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.matches(t) for t in texts]
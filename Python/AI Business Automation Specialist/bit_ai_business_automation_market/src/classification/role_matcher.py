@@ -1,31 +1,230 @@
 # src/classification/role_matcher.py
 from __future__ import annotations
 
+import hashlib
+import logging
 import os
-from typing import List
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
 
 import numpy as np
-from openai import OpenAI
+
+from src.classification.embedding_cache import EmbeddingCache, normalize_text
+from src.config import DATA_DIR
+
+logger = logging.getLogger(__name__)
 
 EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIM = int(os.getenv("OPENAI_EMBEDDING_DIM", "1536"))
+
+# openai (default) | hashing (local, deterministic, no network)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+
+# Set EMBEDDING_CACHE=off to bypass the on-disk cache
+EMBEDDING_CACHE_PATH = Path(
+    os.getenv("EMBEDDING_CACHE_PATH", str(DATA_DIR / "cache" / "embeddings.sqlite"))
+)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE", "on").lower() not in {"0", "off", "false", "no"}
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+# Transient API errors (openai exception classes, matched by name: openai is imported lazily)
+TRANSIENT_ERROR_NAMES = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError"}
+
+
+# -----------------------------
+# BACKENDS
+# -----------------------------
+class OpenAIEmbeddingBackend:
+    """OpenAI Embeddings API: many inputs per request."""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, dim: int = EMBEDDING_DIM):
+        self.model = model
+        self.name = model
+        self.dim = dim
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI()
+        return self._client
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        resp = self.client.embeddings.create(model=self.model, input=texts)
+        data = sorted(resp.data, key=lambda d: getattr(d, "index", 0))
+        return np.array([d.embedding for d in data], dtype="float32")
+
+
+class HashingEmbeddingBackend:
+    """
+    Детерминированный локальный эмбеддер (feature hashing по словам и
+    символьным триграммам). Без сети — для тестов и офлайн-прогонов.
+    """
+
+    _TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = self._TOKEN_RE.findall(text.lower())
+        feats = [f"w:{w}" for w in words]
+        for w in words:
+            padded = f"#{w}#"
+            feats.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return feats
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            for feat in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if (h >> 63) & 1 else -1.0
+                out[row, h % self.dim] += sign
+            norm = np.linalg.norm(out[row])
+            if norm > 0:
+                out[row] /= norm
+        return out
+
+
+def _make_default_backend():
+    if EMBEDDING_BACKEND == "hashing":
+        return HashingEmbeddingBackend()
+    return OpenAIEmbeddingBackend()
+
+
+_backend = _make_default_backend()
+_cache: Optional[EmbeddingCache] = EmbeddingCache(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_ENABLED else None
+
+
+def get_embedding_backend():
+    return _backend
+
+
+def set_embedding_backend(backend) -> None:
+    """Подменить backend (например, HashingEmbeddingBackend в тестах)."""
+    global _backend
+    _backend = backend
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    return _cache
+
+
+# -----------------------------
+# EMBEDDINGS
+# -----------------------------
+def _is_transient(e: BaseException) -> bool:
+    """Rate limit, timeout, connection error or 5xx — worth a retry; anything else is not."""
+    if isinstance(e, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(e).__mro__)
+
+
+def _embed_with_retry(backend, batch: List[str], max_retries: int, backoff: float) -> np.ndarray:
+    for attempt in range(max_retries + 1):
+        try:
+            arr = np.asarray(backend.embed(batch), dtype="float32")
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+            if attempt == max_retries:
+                raise RuntimeError(f"Embedding batch failed after {max_retries + 1} attempts: {e}") from e
+            delay = backoff * (2 ** attempt) * (1.0 + random.random())
+            logger.warning(f"[WARN] Embedding batch failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if arr.ndim != 2 or arr.shape[0] != len(batch):
+            raise RuntimeError(f"Backend returned shape {arr.shape} for {len(batch)} inputs")
+        return arr
+    raise AssertionError("unreachable")
+
+
+def get_embeddings(
+    texts: Sequence[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    backend=None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff: float = DEFAULT_BACKOFF_SECONDS,
+) -> np.ndarray:
+    """
+    Embeddings для списка текстов одной матрицей float32 (len(texts) x dim).
+
+    - пустые тексты -> нулевые строки;
+    - повторяющиеся тексты считаются один раз;
+    - найденные в кэше не запрашиваются;
+    - остальные пакуются по batch_size в один запрос, до max_concurrency
+      запросов параллельно, с retry и экспоненциальным backoff
+      (только rate limit / timeout / connection / 5xx, остальное — сразу ошибка).
+
+    dim берётся из полученных векторов (backend.dim — только если текстов нет),
+    так что модель с другой размерностью не обрезается и не дополняется нулями.
+    """
+    backend = backend or _backend
+    norm_texts = [normalize_text(t) for t in texts]
+
+    unique = list(dict.fromkeys(t for t in norm_texts if t))
+    if not unique:
+        return np.zeros((len(norm_texts), backend.dim), dtype="float32")
+
+    vectors: Dict[str, np.ndarray] = {}
+    if _cache is not None:
+        vectors.update(_cache.get_many(backend.name, unique))
+
+    missing = [t for t in unique if t not in vectors]
+    if missing:
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        workers = max(1, min(max_concurrency, len(batches)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(
+                pool.map(lambda b: _embed_with_retry(backend, b, max_retries, backoff), batches)
+            )
+
+        fresh: Dict[str, np.ndarray] = {}
+        for batch, arr in zip(batches, results):
+            for text, vec in zip(batch, arr):
+                fresh[text] = vec
+        vectors.update(fresh)
+
+        if _cache is not None:
+            _cache.put_many(backend.name, fresh)
+
+    dim = len(next(iter(vectors.values())))
+    widths = {len(v) for v in vectors.values()}
+    if len(widths) > 1:
+        raise ValueError(f"Embeddings of {backend.name} have mixed dimensions: {sorted(widths)}")
+
+    out = np.zeros((len(norm_texts), dim), dtype="float32")
+    for i, t in enumerate(norm_texts):
+        if t:
+            out[i] = vectors[t]
+    return out
 
-_client = OpenAI()
 
 def get_embedding(text: str) -> np.ndarray:
     """
     Получить embedding для строки текста.
     Возвращает np.ndarray(dtype=float32).
+    Результат кэшируется на диске по (модель, нормализованный текст).
     """
-    text = (text or "").strip()
-    if not text:
-        return np.zeros(1536, dtype="float32")
-
-    resp = _client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=text,
-    )
-    emb: List[float] = resp.data[0].embedding
-    return np.array(emb, dtype="float32")
+    return get_embeddings([text])[0]
 
 
 def cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
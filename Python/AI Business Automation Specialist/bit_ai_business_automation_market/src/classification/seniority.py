@@ -0,0 +1,196 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.classification.factorize import factorize
+from src.classification.multi_pattern import MultiPatternMatcher, literal_groups
+
+# analyze_linkedin_jobs: plain substrings (matched on lowercased title + description)
+ENTRY_INCLUDE = [
+    # EN
+    "entry level", "entry-level", "junior", "associate", "working student",
+    "0-2 years", "0–2 years", "up to 2 years", "no experience required",
+    "0-1 years", "0–1 years", "1-2 years", "1–2 years",
+    # DE
+    "berufseinstieg", "berufseinsteiger", "junior",
+    "trainee", "ohne berufserfahrung", "ohne erfahrung",
+    "bis 1 jahr erfahrung", "bis 2 jahre erfahrung",
+    "0-2 jahre", "0–2 jahre", "0-1 jahr", "1-2 jahre", "1–2 jahre",
+]
+
+SENIOR_EXCLUDE = [
+    # EN
+    "3+ years", "3 years experience", "3-5 years", "5+ years", "7+ years",
+    "several years of experience", "many years of experience",
+    " senior", "senior ", " lead ", "lead-", "principal", "head of",
+    # DE
+    "3+ jahre", "3 jahre berufserfahrung", "3-5 jahre", "5+ jahre",
+    "mehrjährige berufserfahrung", "langjährige berufserfahrung",
+    " senior", "senior ", "leitende position", "teamlead", "team lead", "leitung",
+]
+
+# analyze_monthly_trends: regexes (matched on lowercased title + description + seniority)
+ENTRY_KEYWORDS = [
+    r"\bentry\b",
+    r"\bjunior\b",
+    r"\btrainee\b",
+    r"\bintern\b",
+    r"\bpraktik\w*\b",
+    r"\bberufseinsteiger\w*\b",
+    r"\bgraduate\b",
+    r"\b0\W*[-–]?\W*2\s*(years|yrs|jahre)\b",
+    r"\b1\W*[-–]?\W*2\s*(years|yrs|jahre)\b",
+    r"\b(keine|ohne)\s*erfahrung\b",
+    r"\b0\s*jahre\b",
+    r"\b1\s*jahr\b",
+    r"\b2\s*jahre\b",
+]
+
+INCLUDE = "include"
+EXCLUDE = "exclude"
+
+
+class SeniorityClassifier:
+    """
+    Compiled entry-level classifier.
+
+    Regex rules go into one MultiPatternMatcher: the text is scanned once for
+    the rules' anchors and only the hit rules are confirmed. Literal rules
+    (`literal=True`) skip the regex engine: they are plain `in` checks,
+    grouped under shared substrings (" years", " jahr", "lead", see
+    `literal_groups`) so that one check skips a whole group. This keeps the
+    full scan as cheap as the original short-circuiting `any(kw in text)`
+    loops (benchmarks: entry_classifier vs. entry_classifier_any). Either
+    way every rule that fires is reported. The label is: at least one include rule fired and
+    no exclude rule fired.
+
+    Batch calls (`classify_many`) also accumulate per-rule hit counts
+    (number of rows where the rule fired) for auditing.
+    """
+
+    def __init__(
+        self,
+        include: Sequence[str],
+        exclude: Sequence[str] = (),
+        literal: bool = False,
+    ):
+        def compile_rules(kind: str, patterns: Sequence[str]) -> Dict[str, List[str]]:
+            out: Dict[str, List[str]] = {}
+            for p in patterns:
+                out.setdefault(f"{kind}:{p}", [re.escape(p) if literal else p])
+            return out
+
+        rules = {**compile_rules(INCLUDE, include), **compile_rules(EXCLUDE, exclude)}
+        # Compiled rule set (name -> [regex]), also merged into larger scans (src.parsing.enrichment)
+        self.rules: Dict[str, List[str]] = rules
+        self.rule_names: List[str] = list(rules)
+        self._is_include = np.array([name.startswith(INCLUDE + ":") for name in self.rule_names])
+        # Literal rules: grouped substring checks (no regex needed)
+        self._literals: Optional[List[str]] = (
+            [name.split(":", 1)[1] for name in self.rule_names] if literal else None
+        )
+        self._groups = literal_groups(self._literals) if literal else []
+        self._matcher = None if literal else MultiPatternMatcher(rules)
+        self.hits: Counter = Counter()
+        self.rows = 0
+
+    def label(self, fired: Iterable[int]) -> bool:
+        """Label from the indices (into `rule_names`) of the rules that fired."""
+        fired = list(fired)
+        include = any(self._is_include[i] for i in fired)
+        exclude = any(not self._is_include[i] for i in fired)
+        return include and not exclude
+
+    def match_indices(self, text: str) -> List[int]:
+        """Indices (into `rule_names`) of the rules that fire on an already lowercased text."""
+        if self._literals is not None:
+            lits = self._literals
+            return sorted(i for key, idx in self._groups if key in text for i in idx if lits[i] in text)
+        return sorted(self._matcher.match_indices(text))
+
+    def classify(self, text: Optional[str]) -> Tuple[bool, Tuple[str, ...]]:
+        """(label, fired rule names in rule order) for one text."""
+        fired = self.match_indices((text or "").lower())
+        return self.label(fired), tuple(self.rule_names[i] for i in fired)
+
+    def is_entry(self, text: Optional[str]) -> bool:
+        return self.classify(text)[0]
+
+    def classify_many(self, texts) -> pd.DataFrame:
+        """
+        Batch API over a Series or list of texts (each distinct text is scanned once).
+        Returns a DataFrame with columns `label` (bool) and `rules` (tuple of fired rules),
+        index taken from the Series. Updates the per-rule hit counts.
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        values = texts.tolist() if isinstance(texts, pd.Series) else list(texts)
+        values = [v if isinstance(v, str) else "" for v in values]
+
+        codes, uniques = factorize(values)
+        results = [self.classify(u) for u in uniques]
+
+        multiplicity = np.bincount(codes, minlength=len(uniques))
+        for (_, fired), n in zip(results, multiplicity):
+            for rule in fired:
+                self.hits[rule] += int(n)
+        self.rows += len(values)
+
+        labels = np.array([r[0] for r in results], dtype=bool)
+        rules = np.empty(len(results), dtype=object)
+        for i, (_, fired) in enumerate(results):
+            rules[i] = fired
+
+        return pd.DataFrame({"label": labels[codes], "rules": rules[codes]}, index=index)
+
+    def hit_stats(self) -> pd.DataFrame:
+        """Accumulated hit counts: rule, kind, pattern, hits, share of classified rows."""
+        return rule_hit_stats(self.hits, self.rows, self.rule_names)
+
+    def reset_stats(self) -> None:
+        self.hits = Counter()
+        self.rows = 0
+
+
+def rule_hit_stats(
+    hits: Dict[str, int],
+    rows: int,
+    rule_names: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    names = list(rule_names) if rule_names is not None else sorted(hits)
+    df = pd.DataFrame({"rule": names})
+    df["kind"] = df["rule"].str.split(":", n=1).str[0]
+    df["pattern"] = df["rule"].str.split(":", n=1).str[1]
+    df["hits"] = [int(hits.get(name, 0)) for name in names]
+    df["share"] = df["hits"] / rows if rows else 0.0
+    return df.sort_values(["kind", "hits"], ascending=[False, False]).reset_index(drop=True)
+
+
+def count_rule_hits(rules: pd.Series) -> Counter:
+    """Per-rule hit counts over a column of fired-rule tuples (e.g. a filtered subset)."""
+    counts: Counter = Counter()
+    for fired in rules:
+        counts.update(fired)
+    return counts
+
+
+_ENTRY_MID_LEVEL: Optional[SeniorityClassifier] = None
+_ENTRY_MID: Optional[SeniorityClassifier] = None
+
+
+def get_entry_mid_level_classifier() -> SeniorityClassifier:
+    """Rules of analyze_linkedin_jobs.is_entry_mid_level (substrings, with senior exclusions)."""
+    global _ENTRY_MID_LEVEL
+    if _ENTRY_MID_LEVEL is None:
+        _ENTRY_MID_LEVEL = SeniorityClassifier(ENTRY_INCLUDE, SENIOR_EXCLUDE, literal=True)
+    return _ENTRY_MID_LEVEL
+
+
+def get_entry_mid_classifier() -> SeniorityClassifier:
+    """Rules of analyze_monthly_trends.is_entry_mid (regexes, no exclusions)."""
+    global _ENTRY_MID
+    if _ENTRY_MID is None:
+        _ENTRY_MID = SeniorityClassifier(ENTRY_KEYWORDS)
+    return _ENTRY_MID
@@ -0,0 +1,123 @@
+# src/classification/similarity.py
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_rows(mat: np.ndarray) -> np.ndarray:
+    """
+    L2-нормализация строк (float32). Нулевые строки остаются нулевыми,
+    их косинусное сходство с любым вектором = 0.0 (как в cosine_sim).
+    """
+    arr = np.asarray(mat, dtype="float32")
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return arr / norms
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k по каждой строке матрицы scores (q x n), отсортировано по убыванию."""
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(int), empty.astype("float32")
+
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.tile(np.arange(n), (scores.shape[0], 1))
+
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    idx = np.take_along_axis(part, order, axis=1)
+    return idx, np.take_along_axis(part_scores, order, axis=1)
+
+
+class SimilarityMatrix:
+    """
+    Каталог эмбеддингов, нормализованный один раз.
+
+    - score(queries)           -> косинусы (q x n) одним matmul
+    - top_k(queries, k)        -> индексы и скоры top-k на запрос
+    - top_k_by_group(q, k)     -> то же внутри каждой группы (например, страны)
+    """
+
+    def __init__(self, catalog: np.ndarray, groups: Optional[Sequence[str]] = None):
+        self.matrix = normalize_rows(catalog)
+        self.groups = np.asarray(groups) if groups is not None else None
+        if self.groups is not None and len(self.groups) != self.matrix.shape[0]:
+            raise ValueError("groups must have one label per catalog row")
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def score(self, queries: np.ndarray) -> np.ndarray:
+        return normalize_rows(queries) @ self.matrix.T
+
+    def top_k(self, queries: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        return _top_k_rows(self.score(queries), k)
+
+    def top_k_by_group(self, queries: np.ndarray, k: int = 10) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        {group: (indices, scores)}; индексы — позиции в исходном каталоге.
+        """
+        if self.groups is None:
+            raise ValueError("SimilarityMatrix was built without groups")
+
+        scores = self.score(queries)
+        out: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for group in dict.fromkeys(self.groups.tolist()):
+            cols = np.flatnonzero(self.groups == group)
+            idx, top = _top_k_rows(scores[:, cols], k)
+            out[group] = (cols[idx], top)
+        return out
+
+
+def cosine_scores(query: np.ndarray, catalog: np.ndarray) -> np.ndarray:
+    """Косинусное сходство одного вектора со всеми строками каталога (1d)."""
+    return SimilarityMatrix(catalog).score(query)[0]
+
+
+# -----------------------------
+# CHUNKED (catalog larger than memory)
+# -----------------------------
+def iter_npy_chunks(path: Path, chunk_rows: int = 50_000) -> Iterator[np.ndarray]:
+    """Читает .npy-матрицу кусками через memory map."""
+    mat = np.load(path, mmap_mode="r")
+    for start in range(0, mat.shape[0], chunk_rows):
+        yield np.asarray(mat[start:start + chunk_rows])
+
+
+def chunked_top_k(
+    queries: np.ndarray,
+    catalog_chunks: Iterable[np.ndarray],
+    k: int = 10,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k по каталогу, который приходит кусками (например, iter_npy_chunks).
+    В памяти одновременно только один кусок + текущие k лучших на запрос.
+    Индексы — глобальные номера строк каталога.
+    """
+    q = normalize_rows(queries)
+    best_idx = np.zeros((q.shape[0], 0), dtype=int)
+    best_scores = np.zeros((q.shape[0], 0), dtype="float32")
+    offset = 0
+
+    for chunk in catalog_chunks:
+        scores = q @ normalize_rows(chunk).T
+        idx, top = _top_k_rows(scores, k)
+
+        cand_idx = np.concatenate([best_idx, idx + offset], axis=1)
+        cand_scores = np.concatenate([best_scores, top], axis=1)
+        sel, best_scores = _top_k_rows(cand_scores, k)
+        best_idx = np.take_along_axis(cand_idx, sel, axis=1)
+
+        offset += chunk.shape[0]
+
+    return best_idx, best_scores
@@ -1,18 +1,81 @@
-import re
-from typing import Dict, List
-
-SKILL_KEYWORDS = {
-    "skill_n8n": [r"\bn8n\b"],
-    "skill_make": [r"\bmake\.com\b", r"\bintegromat\b"],
-    "skill_zapier": [r"\bzapier\b"],
-    "skill_power_automate": [r"power automate", r"microsoft flow"],
-    "skill_llm": [r"\bllm\b", r"large language model", r"chatgpt", r"gpt-", r"azure openai"],
-    "skill_api": [r"\bapi\b", r"rest api"],
-    "skill_sql": [r"\bsql\b"],
-    "skill_python": [r"\bpython\b"],
-    "skill_gdpr": [r"\bgdpr\b", r"ds(g|g)vo"],
-    "skill_bpmn": [r"\bbpmn\b"],
-}
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.classification.factorize import factorize
+from src.classification.multi_pattern import MultiPatternMatcher
+from src.classification.taxonomy import get_taxonomy
+
+# Skill vocabulary lives in skill_taxonomy.json (see taxonomy.py)
+_TAXONOMY = get_taxonomy()
+
+SKILL_KEYWORDS: Dict[str, List[str]] = _TAXONOMY.skill_keywords
+
+# Display labels (skill registry sidecar, presentation tables)
+SKILL_LABELS: Dict[str, str] = _TAXONOMY.skill_labels
+
+
+class SkillMatcher:
+    """
+    Compiled skill matcher: one scan of the lowercased text for the anchors
+    of all SKILL_KEYWORDS rules, then only the hit rules are confirmed
+    (MultiPatternMatcher).
+    """
+
+    def __init__(
+        self,
+        skill_keywords: Mapping[str, Sequence[str]] = SKILL_KEYWORDS,
+        anchors: Optional[Sequence[Optional[Sequence[str]]]] = None,
+    ):
+        self.skill_cols: List[str] = list(skill_keywords)
+        self.skill_keywords: Dict[str, List[str]] = {k: list(v) for k, v in skill_keywords.items()}
+        self._matcher = MultiPatternMatcher(skill_keywords, anchors=anchors)
+
+    def extract(self, text: Optional[str]) -> Dict[str, int]:
+        hits = self._matcher.match_indices((text or "").lower())
+        return {col: int(i in hits) for i, col in enumerate(self.skill_cols)}
+
+    def extract_many(self, texts: Iterable[Optional[str]]) -> List[Dict[str, int]]:
+        return [self.extract(t) for t in texts]
+
+    def extract_matrix(self, texts: Iterable[Optional[str]]) -> np.ndarray:
+        """uint8 matrix (n_texts x n_skills), columns in `skill_cols` order."""
+        rows = []
+        for t in texts:
+            row = np.zeros(len(self.skill_cols), dtype=np.uint8)
+            hits = self._matcher.match_indices((t or "").lower())
+            if hits:
+                row[list(hits)] = 1
+            rows.append(row)
+        if not rows:
+            return np.zeros((0, len(self.skill_cols)), dtype=np.uint8)
+        return np.vstack(rows)
+
+    def extract_frame(self, texts, index=None) -> pd.DataFrame:
+        """
+        Batch API over a list or Series of texts.
+        Each distinct text is scanned once; rows are broadcast back.
+        Returns a DataFrame of uint8 skill_* columns (index taken from the Series).
+        """
+        if index is None and isinstance(texts, pd.Series):
+            index = texts.index
+        values = texts.tolist() if isinstance(texts, pd.Series) else list(texts)
+        values = [v if isinstance(v, str) else "" for v in values]
+        codes, uniques = factorize(values)
+        matrix = self.extract_matrix(uniques)[codes]
+        return pd.DataFrame(matrix, columns=self.skill_cols, index=index)
+
+
+_DEFAULT_MATCHER: Optional[SkillMatcher] = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _DEFAULT_MATCHER
+    if _DEFAULT_MATCHER is None:
+        # Rule anchors come precomputed from the taxonomy cache
+        _DEFAULT_MATCHER = SkillMatcher(SKILL_KEYWORDS, anchors=_TAXONOMY.anchors)
+    return _DEFAULT_MATCHER
 
 
 def extract_skills(text: str) -> Dict[str, int]:
@@ -20,17 +83,12 @@ def extract_skills(text: str) -> Dict[str, int]:
     Very simple keyword-based skill extractor.
     Returns dict {skill_col: 0/1}.
     """
-    if not text:
-        text = ""
-    lower_text = text.lower()
+    return get_skill_matcher().extract(text)
 
-    result = {}
-    for skill_col, patterns in SKILL_KEYWORDS.items():
-        found = any(re.search(p, lower_text) for p in patterns)
-        result[skill_col] = int(bool(found))
 
-    return result
+def extract_skills_bulk(texts: List[str]) -> List[Dict[str, int]]:
+    return get_skill_matcher().extract_many(texts)
 
 
-def extract_skills_bulk(texts: List[str]) -> List[Dict[str, int]]:
-    return [extract_skills(t) for t in texts]
+def extract_skills_frame(texts, index=None) -> pd.DataFrame:
+    return get_skill_matcher().extract_frame(texts, index=index)
@@ -0,0 +1,115 @@
+"""
+Columnar storage of extracted skills.
+
+    data/processed/job_skills_extracted.parquet   one row per job ad:
+        country, role_id, title, url, source_json, skill_* (uint8 0/1)
+    data/processed/job_skills_registry.json       sidecar: bit position -> key, label;
+                                                  taxonomy version + hash the table was built with
+
+The skill columns are stored in registry order, so position `bit` of the
+registry is column `skill_cols[bit]`. Consumers read the 0/1 columns
+directly instead of re-parsing JSON flag strings.
+
+Written by: src/classification/extract_skills_from_raw.py
+Read by:    src/reporting/competency_matrix.py, src/reporting/bit_blocks.py,
+            src/reporting/skill_cooccurrence.py
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.classification.skill_extractor import SKILL_LABELS
+from src.classification.taxonomy import get_taxonomy
+from src.config import PROCESSED_DIR
+
+
+SKILLS_PARQUET = PROCESSED_DIR / "job_skills_extracted.parquet"
+SKILLS_REGISTRY = PROCESSED_DIR / "job_skills_registry.json"
+
+# Bump when the table layout changes
+REGISTRY_VERSION = 1
+
+META_COLUMNS = ["country", "role_id", "title", "url", "source_json"]
+
+
+def build_registry(skill_cols: Sequence[str], labels: Mapping[str, str] = SKILL_LABELS) -> Dict[str, Any]:
+    taxonomy = get_taxonomy()
+    return {
+        "version": REGISTRY_VERSION,
+        "taxonomy": {"version": taxonomy.version, "hash": taxonomy.hash},
+        "skills": [
+            {"bit": i, "key": key, "label": labels.get(key, key)}
+            for i, key in enumerate(skill_cols)
+        ],
+    }
+
+
+def registry_keys(registry: Mapping[str, Any]) -> List[str]:
+    return [s["key"] for s in sorted(registry["skills"], key=lambda s: s["bit"])]
+
+
+def registry_labels(registry: Mapping[str, Any]) -> Dict[str, str]:
+    return {s["key"]: s["label"] for s in registry["skills"]}
+
+
+def read_registry(path: Path = SKILLS_REGISTRY) -> Dict[str, Any]:
+    registry = json.loads(Path(path).read_text(encoding="utf-8"))
+    if registry.get("version") != REGISTRY_VERSION:
+        raise ValueError(f"Unsupported skill registry version in {path}: {registry.get('version')}")
+    return registry
+
+
+def write_skill_table(
+    df: pd.DataFrame,
+    registry: Mapping[str, Any],
+    path: Path = SKILLS_PARQUET,
+    registry_path: Path = SKILLS_REGISTRY,
+) -> None:
+    """Meta columns + skill columns (uint8, registry order) -> Parquet, registry -> JSON."""
+    keys = registry_keys(registry)
+    missing = [c for c in META_COLUMNS + keys if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for skill table: {missing}")
+
+    out = df[META_COLUMNS + keys].copy()
+    out[keys] = out[keys].astype(np.uint8)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out.to_parquet(path, index=False)
+    Path(registry_path).write_text(json.dumps(registry, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def read_skill_table(
+    columns: Optional[Sequence[str]] = None,
+    path: Path = SKILLS_PARQUET,
+    registry_path: Path = SKILLS_REGISTRY,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    (table, registry). columns — meta columns to load in addition to all skill columns.
+    """
+    registry = read_registry(registry_path)
+    keys = registry_keys(registry)
+    meta = list(columns) if columns is not None else META_COLUMNS
+    df = pd.read_parquet(path, columns=meta + keys)
+    return df, registry
+
+
+def append_skill_table(
+    df: pd.DataFrame,
+    registry: Mapping[str, Any],
+    path: Path = SKILLS_PARQUET,
+    registry_path: Path = SKILLS_REGISTRY,
+) -> None:
+    """Add rows to an existing table; the skill set must be unchanged."""
+    existing, old_registry = read_skill_table(path=path, registry_path=registry_path)
+    if registry_keys(old_registry) != registry_keys(registry):
+        raise ValueError(
+            f"Skill set changed since {path} was written; run a full extraction instead of --incremental"
+        )
+    write_skill_table(pd.concat([existing, df], ignore_index=True), registry, path, registry_path)
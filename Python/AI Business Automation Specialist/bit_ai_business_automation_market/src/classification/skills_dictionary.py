@@ -1,61 +1,11 @@
-HARD_SKILLS = {
-    "automation": [
-        "process automation",
-        "workflow automation",
-        "intelligent automation",
-        "rpa",
-        "robotic process automation"
-    ],
-    "programming": [
-        "python",
-        "scripting",
-        "automation scripts"
-    ],
-    "ai_ml": [
-        "machine learning",
-        "nlp",
-        "predictive analytics",
-        "ai models",
-        "intelligent agents"
-    ],
-    "process": [
-        "process optimization",
-        "business process",
-        "process design",
-        "process improvement"
-    ]
-}
+# Substring skill dictionaries (used by extract_skills.py), derived from
+# the "keyword" entries of skill_taxonomy.json — edit the taxonomy, not this file.
+from src.classification.taxonomy import get_taxonomy
 
-TOOLS = {
-    "power_platform": [
-        "power automate",
-        "power apps",
-        "power bi",
-        "power platform"
-    ],
-    "rpa_tools": [
-        "uipath",
-        "automation anywhere",
-        "blue prism"
-    ],
-    "programming_tools": [
-        "python",
-        "selenium"
-    ],
-    "cloud_ai": [
-        "azure",
-        "azure ai",
-        "copilot studio",
-        "ai foundry"
-    ]
-}
+_TAXONOMY = get_taxonomy()
 
-SOFT_SKILLS = [
-    "communication",
-    "stakeholder management",
-    "cross-functional",
-    "change management",
-    "training",
-    "documentation",
-    "collaboration"
-]
+HARD_SKILLS = _TAXONOMY.keyword_groups("hard")
+
+TOOLS = _TAXONOMY.keyword_groups("tools")
+
+SOFT_SKILLS = [kw for terms in _TAXONOMY.keyword_groups("soft").values() for kw in terms]
@@ -0,0 +1,224 @@
+"""
+Skill taxonomy registry.
+
+One data file (src/classification/skill_taxonomy.json, or SKILL_TAXONOMY_PATH)
+is the single source of the skill vocabulary:
+
+    version   taxonomy version string (bump when skills/patterns change)
+    groups    ordered BIT presentation groups: key, label, skills (in display order)
+    skills    one entry per skill:
+                key        skill_* column (kind "flag") or keyword group key (kind "keyword")
+                kind       "flag"    -> regex rule, one uint8 skill_* column in the skill table
+                           "keyword" -> substring group (hard / tools / soft dictionaries)
+                label      display label
+                category   hard | tools | soft
+                patterns   regexes (flag skills only)
+                synonyms   {"de": [...], "en": [...]} plain phrases; flag skills match them as
+                           \\b-bounded literals, keyword groups as substrings
+
+Everything else is derived from it: SKILL_KEYWORDS / SKILL_LABELS (skill_extractor),
+HARD_SKILLS / TOOLS / SOFT_SKILLS (skills_dictionary), skill categories
+(competency_matrix) and BIT_GROUPS (bit_blocks).
+
+The compiled form (validated tables plus the matcher's rule anchors) is
+cached as JSON under data/cache/taxonomy/, keyed by the SHA-256 of the taxonomy
+file, so a large taxonomy is validated and analysed once, not on every import.
+Regex objects themselves are not serialisable; they are compiled when the
+matcher is first built. Set SKILL_TAXONOMY_CACHE=off to bypass the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.classification.multi_pattern import rule_anchors
+from src.config import DATA_DIR
+
+
+TAXONOMY_PATH = Path(os.getenv("SKILL_TAXONOMY_PATH", str(Path(__file__).with_name("skill_taxonomy.json"))))
+TAXONOMY_CACHE_DIR = DATA_DIR / "cache" / "taxonomy"
+TAXONOMY_CACHE_ENABLED = os.getenv("SKILL_TAXONOMY_CACHE", "on").lower() not in {"0", "off", "false", "no"}
+
+# Bump when the compiled layout below changes (invalidates cached files)
+COMPILED_FORMAT = 2
+
+CATEGORIES = ("hard", "tools", "soft")
+KINDS = ("flag", "keyword")
+LANGUAGES = ("en", "de")
+
+
+def taxonomy_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _synonyms(entry: Mapping[str, Any]) -> List[str]:
+    syn = entry.get("synonyms") or {}
+    unknown = set(syn) - set(LANGUAGES)
+    if unknown:
+        raise ValueError(f"Unknown synonym languages for {entry['key']}: {sorted(unknown)}")
+    return [s.lower() for lang in LANGUAGES for s in syn.get(lang, [])]
+
+
+def compile_taxonomy(data: Mapping[str, Any], digest: str) -> Dict[str, Any]:
+    """Validate the taxonomy and derive every lookup table (JSON-serialisable)."""
+    if not data.get("version"):
+        raise ValueError("Skill taxonomy has no version")
+
+    skill_keywords: Dict[str, List[str]] = {}
+    labels: Dict[str, str] = {}
+    categories: Dict[str, str] = {}
+    keyword_groups: Dict[str, Dict[str, List[str]]] = {c: {} for c in CATEGORIES}
+
+    for entry in data.get("skills", []):
+        key, kind, category = entry.get("key"), entry.get("kind"), entry.get("category")
+        if not key:
+            raise ValueError(f"Skill taxonomy entry without key: {entry}")
+        if key in labels:
+            raise ValueError(f"Duplicate skill key in taxonomy: {key}")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind for {key}: {kind!r} (expected one of {KINDS})")
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown category for {key}: {category!r} (expected one of {CATEGORIES})")
+
+        labels[key] = entry.get("label") or key
+        categories[key] = category
+        if kind == "flag":
+            patterns = list(entry.get("patterns", []))
+            patterns += [rf"\b{re.escape(s)}\b" for s in _synonyms(entry)]
+            if not patterns:
+                raise ValueError(f"Flag skill {key} has no patterns or synonyms")
+            for p in patterns:
+                re.compile(p)
+            skill_keywords[key] = patterns
+        else:
+            if entry.get("patterns"):
+                raise ValueError(f"Keyword group {key} takes synonyms, not patterns")
+            keyword_groups[category][key] = _synonyms(entry)
+
+    bit_groups: Dict[str, List[str]] = {}
+    group_labels: Dict[str, str] = {}
+    grouped: Dict[str, str] = {}
+    for group in data.get("groups", []):
+        gkey = group["key"]
+        for s in group.get("skills", []):
+            if s not in skill_keywords:
+                raise ValueError(f"Group {gkey} lists unknown flag skill: {s}")
+            if s in grouped:
+                raise ValueError(f"Skill {s} is in groups {grouped[s]} and {gkey}")
+            grouped[s] = gkey
+        bit_groups[gkey] = list(group.get("skills", []))
+        group_labels[gkey] = group.get("label") or gkey
+
+    return {
+        "format": COMPILED_FORMAT,
+        "version": str(data["version"]),
+        "hash": digest,
+        "skill_keywords": skill_keywords,
+        "labels": labels,
+        "categories": categories,
+        "keyword_groups": keyword_groups,
+        "bit_groups": bit_groups,
+        "group_labels": group_labels,
+        "anchors": rule_anchors(skill_keywords),
+    }
+
+
+class Taxonomy:
+    """Read-only view over a compiled taxonomy."""
+
+    def __init__(self, compiled: Mapping[str, Any]):
+        self._c = compiled
+        self.version: str = compiled["version"]
+        self.hash: str = compiled["hash"]
+        # Flag skills: skill_* column -> regexes, in column order
+        self.skill_keywords: Dict[str, List[str]] = compiled["skill_keywords"]
+        self.bit_groups: Dict[str, List[str]] = compiled["bit_groups"]
+        self.group_labels: Dict[str, str] = compiled["group_labels"]
+        # Candidate-scan anchors for MultiPatternMatcher(skill_keywords, anchors=...)
+        self.anchors: List[Optional[List[str]]] = compiled["anchors"]
+
+    @property
+    def skill_cols(self) -> List[str]:
+        return list(self.skill_keywords)
+
+    @property
+    def skill_labels(self) -> Dict[str, str]:
+        """Labels of flag skills, in column order."""
+        return {k: self._c["labels"][k] for k in self.skill_keywords}
+
+    def label(self, key: str) -> str:
+        return self._c["labels"].get(key, key)
+
+    def category(self, key: str) -> str:
+        """hard | tools | soft, or "other" for keys outside the taxonomy."""
+        return self._c["categories"].get(key, "other")
+
+    def keyword_groups(self, category: str) -> Dict[str, List[str]]:
+        """Keyword groups of one category: group key -> lowercase substrings."""
+        return self._c["keyword_groups"][category]
+
+    def group_of(self, key: str) -> Optional[str]:
+        for group, skills in self.bit_groups.items():
+            if key in skills:
+                return group
+        return None
+
+
+def _read_cache(path: Path, digest: str) -> Optional[Dict[str, Any]]:
+    try:
+        compiled = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if compiled.get("format") != COMPILED_FORMAT or compiled.get("hash") != digest:
+        return None
+    return compiled
+
+
+def load_taxonomy(
+    path: Path = TAXONOMY_PATH,
+    cache_dir: Path = TAXONOMY_CACHE_DIR,
+    use_cache: bool = TAXONOMY_CACHE_ENABLED,
+) -> Taxonomy:
+    raw = Path(path).read_bytes()
+    digest = taxonomy_hash(raw)
+    cache_path = Path(cache_dir) / f"{digest[:16]}.json"
+
+    compiled = _read_cache(cache_path, digest) if use_cache else None
+    if compiled is None:
+        compiled = compile_taxonomy(json.loads(raw.decode("utf-8")), digest)
+        if use_cache:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cache_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(compiled, ensure_ascii=False), encoding="utf-8")
+                tmp.replace(cache_path)
+            except OSError as e:
+                print(f"[WARN] Cannot write taxonomy cache {cache_path}: {e}")
+    return Taxonomy(compiled)
+
+
+_DEFAULT_TAXONOMY: Optional[Taxonomy] = None
+
+
+def get_taxonomy() -> Taxonomy:
+    global _DEFAULT_TAXONOMY
+    if _DEFAULT_TAXONOMY is None:
+        _DEFAULT_TAXONOMY = load_taxonomy()
+    return _DEFAULT_TAXONOMY
+
+
+def main() -> None:
+    tax = get_taxonomy()
+    print(f"[INFO] Skill taxonomy {TAXONOMY_PATH.name} v{tax.version} (sha256 {tax.hash[:16]})")
+    print(f"[INFO] Flag skills: {len(tax.skill_keywords)}, BIT groups: {len(tax.bit_groups)}")
+    for c in CATEGORIES:
+        print(f"[INFO] Keyword groups ({c}): {len(tax.keyword_groups(c))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,14 @@
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.classification.factorize import apply_unique
+from src.classification.multi_pattern import MultiPatternMatcher
+
+# Scraped titles repeat heavily; this bounds the memoized cleaned titles
+TITLE_CACHE_SIZE = 65536
 
 TITLE_NORMALIZATION_RULES = [
     ("ai_business_automation_specialist", [
@@ -42,22 +51,68 @@ TITLE_NORMALIZATION_RULES = [
 ]
 
 
+_WS_RE = re.compile(r"\s+")
+
+
+def clean_title(raw_title: str) -> str:
+    """Lowercase, trim and collapse whitespace (the key the rules run on)."""
+    return _WS_RE.sub(" ", raw_title.strip().lower())
+
+
+class TitleNormalizer:
+    """
+    Compiled title normalizer.
+
+    All rules are compiled once into a single prioritized regex
+    (see MultiPatternMatcher.first): the earliest cluster in the rule
+    list that matches wins, exactly as in the sequential loop.
+    Results are memoized in a bounded LRU keyed on the cleaned title.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Tuple[str, Sequence[str]]] = TITLE_NORMALIZATION_RULES,
+        cache_size: int = TITLE_CACHE_SIZE,
+    ):
+        self.clusters = [cluster for cluster, _ in rules]
+        self._matcher = MultiPatternMatcher(dict(rules), flags=re.IGNORECASE)
+        self._lookup: Callable[[str], Optional[str]] = lru_cache(maxsize=cache_size)(self._matcher.first)
+
+    def normalize(self, raw_title: str) -> Optional[str]:
+        if not raw_title or not isinstance(raw_title, str):
+            return None
+        return self._lookup(clean_title(raw_title))
+
+    def normalize_many(self, titles) -> pd.Series:
+        """
+        Vectorized over a Series (or list): each distinct raw title is
+        normalized once and the result is mapped back by position.
+        """
+        series = titles if isinstance(titles, pd.Series) else pd.Series(list(titles), dtype=object)
+        return apply_unique(series, self.normalize)
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+
+_DEFAULT_NORMALIZER: Optional[TitleNormalizer] = None
+
+
+def get_title_normalizer() -> TitleNormalizer:
+    global _DEFAULT_NORMALIZER
+    if _DEFAULT_NORMALIZER is None:
+        _DEFAULT_NORMALIZER = TitleNormalizer(TITLE_NORMALIZATION_RULES)
+    return _DEFAULT_NORMALIZER
+
+
 def normalize_title(raw_title: str) -> Optional[str]:
     """
     Heuristically map a raw job title to a normalized cluster.
     Returns a string cluster id or None if no clear mapping.
     """
-    if not raw_title:
-        return None
-
-    t = raw_title.strip().lower()
-
-    # Hard-clean some noise
-    t = re.sub(r"\s+", " ", t)
+    return get_title_normalizer().normalize(raw_title)
 
-    for cluster, patterns in TITLE_NORMALIZATION_RULES:
-        for pattern in patterns:
-            if re.search(pattern, t, flags=re.IGNORECASE):
-                return cluster
 
-    return None
+def normalize_titles(titles) -> pd.Series:
+    """Batch API: normalize_title over a Series, computed once per unique title."""
+    return get_title_normalizer().normalize_many(titles)
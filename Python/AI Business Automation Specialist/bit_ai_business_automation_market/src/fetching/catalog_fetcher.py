@@ -8,14 +8,29 @@ catalog_fetcher.py
 - ближайших к роли AI Business Automation Specialist (из role_profile_ai_business_automation.json)
 и сохраняет HTML локально в data/raw/catalogs/{country}/.
 
+Загрузка страниц (CatalogFetcher):
+- пул потоков (--workers) с keep-alive сессией requests на поток;
+- лимит частоты на хост (--rate запросов/с на BERUFENET / AMS / BVZ);
+- conditional GET: ETag / Last-Modified хранятся в {title}.meta.json,
+  при 304 Not Modified страница не скачивается и файл не переписывается;
+- retry с экспоненциальным backoff на сетевые ошибки, 429 и 5xx (Retry-After учитывается).
+
 Использование:
     python -m src.fetching.catalog_fetcher --mode nearest_official_berufe
+    python -m src.fetching.catalog_fetcher --workers 16 --rate 5
+    python -m src.fetching.catalog_fetcher --force            # без conditional GET
 """
 
 import argparse
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
 from requests.exceptions import RequestException
@@ -25,6 +40,16 @@ from ..config import RAW_DIR, ROLE_PROFILE_PATH
 
 CATALOGS_DIR = RAW_DIR / "catalogs"
 
+USER_AGENT = "Mozilla/5.0 (compatible; AI-Business-Automation-Research/1.0)"
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_PER_HOST = 4.0      # requests per second per host
+DEFAULT_TIMEOUT = 15
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
 
 def load_role_profile(path: Path = ROLE_PROFILE_PATH) -> Dict[str, Any]:
     if not path.exists():
@@ -37,9 +62,7 @@ def fetch_url(url: str, timeout: int = 15) -> str:
     Простая обёртка над requests.get с минимальной защитой.
     Возвращает текст HTML/JSON (как есть).
     """
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; AI-Business-Automation-Research/1.0)"
-    }
+    headers = {"User-Agent": USER_AGENT}
     try:
         resp = requests.get(url, headers=headers, timeout=timeout)
         resp.raise_for_status()
@@ -48,6 +71,127 @@ def fetch_url(url: str, timeout: int = 15) -> str:
     return resp.text
 
 
+class HostRateLimiter:
+    """
+    Не чаще rate запросов в секунду на хост (слоты по времени, без bursts).
+    Потокобезопасен: слот резервируется под lock, ожидание — вне его.
+    """
+
+    def __init__(self, rate_per_host: float = DEFAULT_RATE_PER_HOST):
+        self.min_interval = 1.0 / rate_per_host if rate_per_host > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.min_interval:
+            return
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = max(time.monotonic(), self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class CatalogFetcher:
+    """
+    Пул для загрузки многих страниц каталогов.
+
+    fetch(url, etag, last_modified) -> (status, text, headers):
+        status "ok"            — 200, text = тело страницы
+        status "not_modified"  — 304 на conditional GET, text = None
+    Ошибки после всех retry -> RuntimeError (как у fetch_url).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_WORKERS,
+        rate_per_host: float = DEFAULT_RATE_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF_SECONDS,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.limiter = HostRateLimiter(rate_per_host)
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        # One keep-alive session per worker thread (Session is not guaranteed thread-safe)
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self) -> "CatalogFetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def fetch(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Tuple[str, Optional[str], Dict[str, str]]:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.wait(url)
+            delay: Optional[float] = None
+            try:
+                resp = self._session().get(url, headers=headers, timeout=self.timeout)
+                if resp.status_code == 304:
+                    return "not_modified", None, dict(resp.headers)
+                if resp.status_code not in RETRY_STATUS:
+                    resp.raise_for_status()
+                    return "ok", resp.text, dict(resp.headers)
+                error: Exception = RuntimeError(f"HTTP {resp.status_code}")
+                delay = _retry_after(resp)
+            except requests.HTTPError as e:
+                raise RuntimeError(f"Failed to fetch URL {url}: {e}") from e
+            except RequestException as e:
+                error = e
+
+            if attempt == self.max_retries:
+                raise RuntimeError(
+                    f"Failed to fetch URL {url} after {self.max_retries + 1} attempts: {error}"
+                ) from error
+            if delay is None:
+                delay = self.backoff * (2 ** attempt) * (1.0 + random.random())
+            print(f"[WARN] {url}: {error}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+
 def sanitize_filename(name: str) -> str:
     """
     Упрощённая нормализация в имя файла.
@@ -57,17 +201,40 @@ def sanitize_filename(name: str) -> str:
     return out[:120]  # ограничим длину на всякий случай
 
 
-def save_catalog_html(country: str, title_de: str, url: str, html: str) -> Path:
+def catalog_paths(country: str, title_de: str) -> Tuple[Path, Path]:
+    """(html, meta.json) для профессии в data/raw/catalogs/{country}/."""
+    out_dir = CATALOGS_DIR / country.lower()
+    base_name = sanitize_filename(title_de or "unknown_title")
+    return out_dir / f"{base_name}.html", out_dir / f"{base_name}.meta.json"
+
+
+def load_catalog_meta(country: str, title_de: str) -> Optional[Dict[str, Any]]:
+    """meta.json сохранённой страницы, если есть и сама страница, иначе None."""
+    file_path, meta_path = catalog_paths(country, title_de)
+    if not (file_path.exists() and meta_path.exists()):
+        return None
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+
+def save_catalog_html(
+    country: str,
+    title_de: str,
+    url: str,
+    html: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Path:
     """
     Сохранить HTML-страницу профессии в:
       data/raw/catalogs/{country}/{sanitized_title}.html
+    Валидаторы ответа (ETag / Last-Modified) пишутся в meta.json для conditional GET.
     """
     country = country.lower()
-    out_dir = CATALOGS_DIR / country
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    base_name = sanitize_filename(title_de or "unknown_title")
-    file_path = out_dir / f"{base_name}.html"
+    file_path, meta_path = catalog_paths(country, title_de)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
     file_path.write_text(html, encoding="utf-8")
 
     meta = {
@@ -75,16 +242,62 @@ def save_catalog_html(country: str, title_de: str, url: str, html: str) -> Path:
         "title_de": title_de,
         "url": url,
     }
-    meta_path = out_dir / f"{base_name}.meta.json"
+    if etag:
+        meta["etag"] = etag
+    if last_modified:
+        meta["last_modified"] = last_modified
     meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
 
     return file_path
 
 
-def fetch_nearest_official_berufe() -> List[Path]:
+def _fetch_entry(fetcher: CatalogFetcher, entry: Dict[str, Any], conditional: bool) -> Tuple[str, Optional[Path]]:
+    country = entry.get("country", "XX")
+    title_de = entry.get("title_de", "unknown")
+    url = entry["url"]
+
+    etag = last_modified = None
+    meta = load_catalog_meta(country, title_de) if conditional else None
+    if meta and meta.get("url") == url:
+        etag, last_modified = meta.get("etag"), meta.get("last_modified")
+        if not (etag or last_modified):
+            # Saved before validators were recorded: the file date is the best guess
+            file_path, _ = catalog_paths(country, title_de)
+            last_modified = formatdate(file_path.stat().st_mtime, usegmt=True)
+
+    try:
+        status, html, headers = fetcher.fetch(url, etag=etag, last_modified=last_modified)
+    except RuntimeError as e:
+        print(f"[ERROR] {country} – {title_de}: {e}")
+        return "failed", None
+
+    if status == "not_modified":
+        print(f"[INFO] Not modified: {country} – {title_de}")
+        return status, catalog_paths(country, title_de)[0]
+
+    path = save_catalog_html(
+        country=country,
+        title_de=title_de,
+        url=url,
+        html=html or "",
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+    )
+    print(f"[INFO] Saved: {path}")
+    return status, path
+
+
+def fetch_nearest_official_berufe(
+    max_workers: int = DEFAULT_WORKERS,
+    rate_per_host: float = DEFAULT_RATE_PER_HOST,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    conditional: bool = True,
+) -> List[Path]:
     """
     Берёт из role_profile_ai_business_automation.json список nearest_official_berufe_hypotheses,
-    скачивает соответствующие страницы и сохраняет в каталоге data/raw/catalogs.
+    скачивает соответствующие страницы (пулом, с лимитом на хост) и сохраняет в каталоге data/raw/catalogs.
+    Возвращает пути актуальных страниц (скачанных и не изменившихся).
     """
     profile = load_role_profile()
     berufe = profile.get("nearest_official_berufe_hypotheses", [])
@@ -92,29 +305,27 @@ def fetch_nearest_official_berufe() -> List[Path]:
     if not berufe:
         raise ValueError("No 'nearest_official_berufe_hypotheses' entries found in role profile.")
 
-    saved_paths: List[Path] = []
-
+    entries = []
     for entry in berufe:
-        country = entry.get("country", "XX")
-        title_de = entry.get("title_de", "unknown")
-        url = entry.get("url")
-
-        if not url:
+        if not entry.get("url"):
             print(f"[WARN] Skipping entry without URL: {entry}")
             continue
-
-        print(f"[INFO] Fetching {country} – {title_de}: {url}")
-        try:
-            html = fetch_url(url)
-        except RuntimeError as e:
-            print(f"[ERROR] {e}")
-            continue
-
-        path = save_catalog_html(country=country, title_de=title_de, url=url, html=html)
-        print(f"[INFO] Saved: {path}")
-        saved_paths.append(path)
-
-    return saved_paths
+        entries.append(entry)
+
+    print(f"[INFO] Fetching {len(entries)} pages ({max_workers} workers, {rate_per_host:g} req/s per host)")
+    workers = max(1, min(max_workers, len(entries)))
+    with CatalogFetcher(workers, rate_per_host, timeout, max_retries) as fetcher:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda e: _fetch_entry(fetcher, e, conditional), entries))
+
+    counts: Dict[str, int] = {}
+    for status, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    print(
+        f"[INFO] Downloaded: {counts.get('ok', 0)}, not modified: {counts.get('not_modified', 0)}, "
+        f"failed: {counts.get('failed', 0)}"
+    )
+    return [path for _, path in results if path is not None]
 
 
 def main():
@@ -128,12 +339,28 @@ def main():
         default="nearest_official_berufe",
         help="Was soll geladen werden (aktuell: nearest_official_berufe)."
     )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parallele Downloads (default: {DEFAULT_WORKERS}).")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_HOST,
+                        help=f"Max. Anfragen pro Sekunde und Host, 0 = ohne Limit (default: {DEFAULT_RATE_PER_HOST:g}).")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Timeout pro Anfrage in Sekunden (default: {DEFAULT_TIMEOUT}).")
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"Wiederholungen bei Netzwerkfehlern, 429 und 5xx (default: {DEFAULT_MAX_RETRIES}).")
+    parser.add_argument("--force", action="store_true",
+                        help="Alles neu laden (kein If-None-Match / If-Modified-Since).")
 
     args = parser.parse_args()
 
     if args.mode == "nearest_official_berufe":
-        paths = fetch_nearest_official_berufe()
-        print(f"[INFO] Done. Saved {len(paths)} files.")
+        paths = fetch_nearest_official_berufe(
+            max_workers=args.workers,
+            rate_per_host=args.rate,
+            timeout=args.timeout,
+            max_retries=args.retries,
+            conditional=not args.force,
+        )
+        print(f"[INFO] Done. {len(paths)} files up to date.")
 
 
 if __name__ == "__main__":
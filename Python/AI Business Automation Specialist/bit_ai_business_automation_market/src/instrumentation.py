@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+instrumentation.py
+
+Лёгкие замеры горячих участков пайплайна:
+
+    wall time, CPU time, peak RSS процесса, rows in / rows out
+
+Каждый замер — одна строка JSON в data/processed/run_log.jsonl
+(путь можно переопределить через RUN_LOG_PATH, отключить — INSTRUMENTATION=off).
+С --profile (или INSTRUMENTATION_PROFILE=1) каждый внешний замер дополнительно
+пишет cProfile-статистику в data/processed/profiles/<script>.<name>.prof
+(смотреть: python -m pstats <file>).
+
+Использование:
+    from src.instrumentation import instrumented, measure
+
+    @instrumented()                      # rows_in/rows_out = len() первого аргумента / результата
+    def dedupe(df): ...
+
+    with measure("extract_skills", rows_in=len(jobs)) as m:
+        ...
+        m.rows_out = len(df)
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from src.config import PROCESSED_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+RUN_LOG_PATH = Path(os.environ.get("RUN_LOG_PATH", PROCESSED_DIR / "run_log.jsonl"))
+PROFILE_DIR = PROCESSED_DIR / "profiles"
+
+ENABLED = os.environ.get("INSTRUMENTATION", "on").lower() not in {"0", "off", "false", "no"}
+
+# Shared by all stages of one `python -m src.run` invocation (set by the runner)
+RUN_ID = os.environ.get("RUN_ID") or uuid.uuid4().hex[:12]
+
+_profile = os.environ.get("INSTRUMENTATION_PROFILE", "").lower() in {"1", "on", "true", "yes"}
+# Only the outermost measured block is profiled (cProfile profilers cannot nest)
+_depth = 0
+
+
+def enable_profiling(enabled: bool = True) -> None:
+    global _profile
+    _profile = enabled
+
+
+def add_profile_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Also dump cProfile stats of every measured stage to data/processed/profiles/.",
+    )
+
+
+def script_name() -> str:
+    """Имя модуля скрипта (src.analyze_monthly_trends), иначе имя файла."""
+    main = sys.modules.get("__main__")
+    spec = getattr(main, "__spec__", None)
+    if spec is not None and spec.name:
+        return spec.name
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "interactive"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковый RSS процесса (МБ): resource, иначе psutil, иначе None."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return round(getattr(info, "peak_wset", info.rss) / (1 << 20), 1)
+
+
+def count_rows(obj: Any) -> Optional[int]:
+    """Число строк DataFrame / Series / массива / списка; для остального None."""
+    shape = getattr(obj, "shape", None)
+    if shape:
+        return int(shape[0])
+    if isinstance(obj, (list, tuple, dict, set)):
+        return len(obj)
+    return None
+
+
+def write_record(record: Dict[str, Any], path: Optional[Path] = None) -> None:
+    path = path or RUN_LOG_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # One short line per write: appends from parallel stages do not interleave
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+class Measurement:
+    def __init__(self, name: str, rows_in: Optional[int] = None, **extra: Any):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.extra: Dict[str, Any] = extra
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.profile_path: Optional[Path] = None
+
+    def record(self, status: str) -> Dict[str, Any]:
+        rec = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "run_id": RUN_ID,
+            "script": script_name(),
+            "name": self.name,
+            "status": status,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+        }
+        if self.profile_path is not None:
+            rec["profile"] = str(self.profile_path)
+        rec.update(self.extra)
+        return rec
+
+
+@contextmanager
+def measure(name: str, rows_in: Optional[int] = None, **extra: Any) -> Iterator[Measurement]:
+    """Замер блока; rows_out и доп. поля можно выставить на yielded Measurement."""
+    global _depth
+    m = Measurement(name, rows_in, **extra)
+    if not ENABLED:
+        yield m
+        return
+
+    profiler = cProfile.Profile() if _profile and _depth == 0 else None
+    _depth += 1
+    status = "error"
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield m
+        status = "ok"
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        m.wall_s = time.perf_counter() - wall0
+        m.cpu_s = time.process_time() - cpu0
+        _depth -= 1
+        if profiler is not None:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            m.profile_path = PROFILE_DIR / f"{script_name()}.{name}.prof"
+            profiler.dump_stats(str(m.profile_path))
+        write_record(m.record(status))
+
+
+def instrumented(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Декоратор: measure() вокруг вызова функции.
+    rows_in — по первому аргументу, rows_out — по результату (см. count_rows).
+    """
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            rows_in = count_rows(args[0]) if args else None
+            with measure(label, rows_in=rows_in) as m:
+                result = func(*args, **kwargs)
+                m.rows_out = count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def read_run_log(path: Optional[Path] = None):
+    """run_log.jsonl как DataFrame (для сравнения до/после оптимизаций)."""
+    import pandas as pd
+
+    path = path or RUN_LOG_PATH
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize data/processed/run_log.jsonl.")
+    parser.add_argument("--last", type=int, default=1, help="Number of most recent runs to show (default: 1).")
+    args = parser.parse_args()
+
+    df = read_run_log()
+    if df.empty:
+        print(f"[INFO] Run log is empty: {RUN_LOG_PATH}")
+        return
+
+    runs = df.drop_duplicates("run_id", keep="last")["run_id"].tolist()[-args.last:]
+    cols = ["run_id", "script", "name", "status", "wall_s", "cpu_s", "peak_rss_mb", "rows_in", "rows_out"]
+    print(df[df["run_id"].isin(runs)][cols].to_markdown(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+dates.py
+
+Пакетный разбор дат публикации вакансий (вместо разбора по одному значению).
+
+1) collect_date_columns — поля дат из `dates` (raw_jobs_stream) -> колонки DataFrame;
+2) parse_date_column    — одна колонка целиком:
+   - числа и строки из цифр -> epoch (ms, если > 1e10, иначе s);
+   - строки -> to_datetime(format="ISO8601"), затем "3 days ago" относительно
+     времени скрейпа, остаток -> format="mixed";
+   - значения вне диапазона datetime64[ns] (epoch 1e20, "3000-01-01", ...) -> NaT,
+     а не исключение на весь пакет;
+3) resolve_dates        — coalesce колонок в порядке ключей (первая валидная дата).
+
+Используется в:
+    - src/analyze_linkedin_jobs.py
+    - src/analyze_monthly_trends.py
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+RELATIVE_RE = r"(?i)(\d+)\s*(day|days|week|weeks|month|months)\s*ago"
+
+# Epoch values above this are milliseconds (1e10 s is in the year 2286)
+EPOCH_MS_THRESHOLD = 10_000_000_000
+
+ReferenceTime = Union[None, str, pd.Timestamp, Sequence[Any], pd.Series]
+
+
+def collect_date_columns(
+    dates: Sequence[Mapping[str, Any]],
+    keys: Sequence[str],
+    nested_containers: Sequence[str] = (),
+) -> pd.DataFrame:
+    """
+    Колонки-кандидаты: сначала верхний уровень по `keys`,
+    затем вложенные контейнеры ("jobPosting.postedAt", ...). Пустые колонки не создаются.
+    """
+    cols: Dict[str, list] = {}
+
+    for key in keys:
+        col = [d.get(key) for d in dates]
+        if any(v is not None for v in col):
+            cols[key] = col
+
+    for container in nested_containers:
+        subs = [d.get(container) if isinstance(d.get(container), dict) else None for d in dates]
+        if not any(subs):
+            continue
+        for key in keys:
+            col = [s.get(key) if s else None for s in subs]
+            if any(v is not None for v in col):
+                cols[f"{container}.{key}"] = col
+
+    return pd.DataFrame(cols, index=pd.RangeIndex(len(dates)), dtype=object)
+
+
+def _reference_series(reference: ReferenceTime, index: pd.Index) -> pd.Series:
+    """Время скрейпа по строкам (UTC); где неизвестно — текущее время."""
+    now = pd.Timestamp.now(tz="UTC")
+    if reference is None:
+        return pd.Series(now, index=index)
+    if isinstance(reference, (str, pd.Timestamp)):
+        ts = pd.to_datetime(reference, utc=True, errors="coerce")
+        return pd.Series(now if pd.isna(ts) else ts, index=index)
+
+    ref = pd.to_datetime(pd.Series(list(reference), index=index), utc=True, errors="coerce", format="ISO8601")
+    return ref.fillna(now)
+
+
+# Range of datetime64[ns] in epoch seconds
+_EPOCH_MIN_S = pd.Timestamp.min.value / 1e9
+_EPOCH_MAX_S = pd.Timestamp.max.value / 1e9
+
+
+def _to_ns(parsed: pd.Series) -> pd.Series:
+    """
+    datetime64[ns, UTC]; значения вне диапазона ns -> NaT.
+    (pandas 3 разбирает строки в datetime64[us], где "3000-01-01" допустим.)
+    """
+    parsed = parsed.where(parsed.isna() | ((parsed >= pd.Timestamp.min.tz_localize("UTC"))
+                                           & (parsed <= pd.Timestamp.max.tz_localize("UTC"))))
+    return parsed.astype("datetime64[ns, UTC]")
+
+
+def _from_epoch(nums: pd.Series) -> pd.Series:
+    out = pd.Series(pd.NaT, index=nums.index, dtype="datetime64[ns, UTC]")
+    nums = nums.astype("float64")
+    ms = nums > EPOCH_MS_THRESHOLD
+    seconds = nums.where(~ms, nums / 1000)
+    # Out-of-range / infinite epochs stay NaT instead of raising for the whole column
+    valid = np.isfinite(seconds) & (seconds >= _EPOCH_MIN_S) & (seconds <= _EPOCH_MAX_S)
+    for mask, unit in ((ms & valid, "ms"), (~ms & valid, "s")):
+        if mask.any():
+            out[mask] = _to_ns(pd.to_datetime(nums[mask], unit=unit, utc=True, errors="coerce"))
+    return out
+
+
+def _from_relative(strings: pd.Series, reference: pd.Series) -> pd.Series:
+    """"3 days ago" / "2 weeks ago" / "1 month ago" относительно reference (векторно)."""
+    out = pd.Series(pd.NaT, index=strings.index, dtype="datetime64[ns, UTC]")
+    parts = strings.str.extract(RELATIVE_RE)
+    hit = parts[0].notna()
+    if not hit.any():
+        return out
+
+    n = parts.loc[hit, 0].astype(int)
+    unit = parts.loc[hit, 1].str.lower()
+    ref = reference.loc[n.index]
+
+    days = unit.str.startswith("day")
+    weeks = unit.str.startswith("week")
+    months = unit.str.startswith("month")
+
+    out[days[days].index] = ref[days] - pd.to_timedelta(n[days], unit="D")
+    out[weeks[weeks].index] = ref[weeks] - pd.to_timedelta(n[weeks] * 7, unit="D")
+    # DateOffset(months=n) is calendar-aware: one vector op per distinct n
+    for m in n[months].unique():
+        idx = n[months][n[months] == m].index
+        out[idx] = ref[idx] - pd.DateOffset(months=int(m))
+    return out
+
+
+def parse_date_column(values: pd.Series, reference: Optional[pd.Series] = None) -> pd.Series:
+    """
+    Разбор одной колонки сырых значений -> datetime64[ns, UTC] (NaT, если не удалось).
+    """
+    out = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns, UTC]")
+    if values.empty:
+        return out
+    if reference is None:
+        reference = _reference_series(None, values.index)
+
+    is_num = values.map(lambda v: isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool))
+    is_str = values.map(lambda v: isinstance(v, str))
+
+    strings = values[is_str].astype(str).str.strip()
+    strings = strings[strings != ""]
+
+    # Digit-only strings are epoch values, not calendar dates
+    digits = strings.str.fullmatch(r"\d+(\.\d+)?")
+    nums = pd.concat([
+        pd.to_numeric(values[is_num].astype(object).map(float), errors="coerce"),
+        pd.to_numeric(strings[digits], errors="coerce").astype("float64"),
+    ])
+    if len(nums):
+        out[nums.index] = _from_epoch(nums.dropna()).reindex(nums.index)
+
+    strings = strings[~digits]
+    if strings.empty:
+        return out
+
+    parsed = _to_ns(pd.to_datetime(strings, utc=True, errors="coerce", format="ISO8601"))
+    out[parsed.index] = parsed
+
+    rest = strings[parsed.isna()]
+    if not rest.empty:
+        rel = _from_relative(rest, reference)
+        out[rel.index] = rel
+
+        rest = rest[rel.isna()]
+        if not rest.empty:
+            out[rest.index] = _to_ns(pd.to_datetime(rest, utc=True, errors="coerce", format="mixed"))
+
+    return out
+
+
+def resolve_dates(
+    dates: Sequence[Mapping[str, Any]],
+    keys: Sequence[str],
+    nested_containers: Sequence[str] = (),
+    reference: ReferenceTime = None,
+) -> pd.Series:
+    """
+    Одна дата на запись: колонки-кандидаты разбираются целиком и
+    объединяются в порядке приоритета (keys, затем вложенные контейнеры).
+    reference — время скрейпа (скаляр или по строкам) для "N days ago".
+    """
+    frame = collect_date_columns(dates, keys, nested_containers)
+    ref = _reference_series(reference, frame.index)
+
+    out = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns, UTC]")
+    for col in frame.columns:
+        missing = out.isna()
+        if not missing.any():
+            break
+        todo = frame.loc[missing, col].dropna()
+        if todo.empty:
+            continue
+        parsed = parse_date_column(todo, ref.loc[todo.index])
+        out[parsed.index] = out[parsed.index].fillna(parsed)
+    return out
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+dedup_index.py
+
+Персистентный индекс уже виденных вакансий (SQLite):
+
+    data/processed/dedup_index.sqlite
+
+Ключ вакансии:
+- url_key      — URL без query/fragment (LinkedIn добавляет ?trk=... к каждому запросу);
+- fingerprint  — sha1 нормализованного контента (title, company, location, description).
+
+Вакансия считается известной, если совпал любой из двух ключей.
+Для каждой хранится first_seen / last_seen / seen_count.
+
+Индекс разделён на scope: у каждого потребителя свой набор:
+- "linkedin_jobs"  — вакансии, прочитанные analyze_linkedin_jobs (счётчик новых);
+- "monthly_trends" — то же для analyze_monthly_trends;
+- "job_skills"     — вакансии, чьи скиллы уже в job_skills_extracted.parquet
+                     (extract_skills_from_raw, per_role: ключ включает country/role).
+
+Использование:
+    python -m src.parsing.dedup_index          # статистика по scope
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from src.config import PROCESSED_DIR
+
+
+DEDUP_INDEX_PATH = PROCESSED_DIR / "dedup_index.sqlite"
+
+FINGERPRINT_FIELDS = ["title", "company", "location", "description"]
+
+# SQLite limits the number of bound parameters per statement
+_SQL_CHUNK = 400
+
+
+def canonical_url(url: str) -> str:
+    """URL без query-строки и фрагмента, host в нижнем регистре, без завершающего '/'."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").lower().split())
+
+
+def content_fingerprint(rec: Dict[str, Any]) -> str:
+    payload = "\x1f".join(_norm(rec.get(f)) for f in FINGERPRINT_FIELDS)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def ad_keys(rec: Dict[str, Any], per_role: bool = False) -> Tuple[str, str]:
+    """
+    (url_key, fingerprint) для записи из raw_jobs_stream.
+    per_role=True — одна и та же вакансия в разных country/role считается разной.
+    """
+    url_key = canonical_url(rec.get("url", ""))
+    fingerprint = content_fingerprint(rec)
+    if per_role:
+        prefix = f"{rec.get('country', '')}/{rec.get('role_id', '')}|"
+        url_key = prefix + url_key if url_key else ""
+        fingerprint = prefix + fingerprint
+    return url_key, fingerprint
+
+
+class DedupIndex:
+    """
+    Индекс вакансий в SQLite (одна таблица, разделённая по scope).
+    """
+
+    def __init__(self, path: Path = DEDUP_INDEX_PATH, scope: str = "raw", per_role: bool = False):
+        self.path = Path(path)
+        self.scope = scope
+        self.per_role = per_role
+        self.new = 0
+        self.known = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Stages run in parallel by src.run may write concurrently: wait for the lock
+            self._conn = sqlite3.connect(str(self.path), timeout=30)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS ads (
+                    scope TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    url_key TEXT NOT NULL,
+                    country TEXT,
+                    role_id TEXT,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    seen_count INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (scope, fingerprint)
+                );
+                CREATE INDEX IF NOT EXISTS ads_url ON ads (scope, url_key);
+                """
+            )
+        return self._conn
+
+    def _lookup(self, column: str, values: List[str]) -> Dict[str, str]:
+        """{value: fingerprint строки индекса} для найденных значений колонки."""
+        found: Dict[str, str] = {}
+        values = [v for v in dict.fromkeys(values) if v]
+        for i in range(0, len(values), _SQL_CHUNK):
+            chunk = values[i:i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT {column}, fingerprint FROM ads WHERE scope = ? AND {column} IN ({placeholders})",
+                [self.scope, *chunk],
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def filter_new(
+        self,
+        records: List[Dict[str, Any]],
+        touch: bool = True,
+        ignore_stored: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает только ещё не виденные вакансии (повторы внутри батча тоже отбрасываются).
+        touch=True: новые вносятся в индекс, у известных обновляется last_seen / seen_count.
+        ignore_stored=True: сравнение только внутри батча (scope сейчас будет перестроен с нуля).
+        """
+        keys = [ad_keys(rec, self.per_role) for rec in records]
+        by_url = {} if ignore_stored else self._lookup("url_key", [u for u, _ in keys])
+        by_fp = {} if ignore_stored else self._lookup("fingerprint", [f for _, f in keys])
+
+        now = datetime.now(timezone.utc).isoformat()
+        new_records: List[Dict[str, Any]] = []
+        inserts: List[tuple] = []
+        touched: Dict[str, int] = {}
+        batch_urls: Dict[str, str] = {}
+
+        for rec, (url_key, fp) in zip(records, keys):
+            existing = by_fp.get(fp) or (by_url.get(url_key) if url_key else None)
+            if existing is None and url_key in batch_urls:
+                existing = batch_urls[url_key]
+
+            if existing is not None:
+                touched[existing] = touched.get(existing, 0) + 1
+                self.known += 1
+                continue
+
+            by_fp[fp] = fp
+            if url_key:
+                batch_urls[url_key] = fp
+            inserts.append(
+                (self.scope, fp, url_key, rec.get("country", ""), rec.get("role_id", ""), now, now)
+            )
+            new_records.append(rec)
+            self.new += 1
+
+        if touch:
+            # Repeats of a just-inserted ad inside this batch count as sightings too
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO ads "
+                    "(scope, fingerprint, url_key, country, role_id, first_seen, last_seen, seen_count) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 1)",
+                    inserts,
+                )
+                self.conn.executemany(
+                    "UPDATE ads SET last_seen = ?, seen_count = seen_count + ? "
+                    "WHERE scope = ? AND fingerprint = ?",
+                    [(now, n, self.scope, fp) for fp, n in touched.items()],
+                )
+
+        return new_records
+
+    def touch(self, records: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Регистрирует вакансии в индексе; возвращает число новых."""
+        before = self.new
+        for _ in iter_new_jobs(records, self, batch_size):
+            pass
+        return self.new - before
+
+    def reset(self) -> None:
+        """Очищает текущий scope (например, перед полным пересчётом)."""
+        with self.conn:
+            self.conn.execute("DELETE FROM ads WHERE scope = ?", (self.scope,))
+
+    def stats(self) -> Dict[str, int]:
+        total = self.conn.execute("SELECT COUNT(*) FROM ads WHERE scope = ?", (self.scope,)).fetchone()[0]
+        return {"ads": int(total), "new": self.new, "known": self.known}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def iter_new_jobs(
+    records: Iterable[Dict[str, Any]],
+    index: DedupIndex,
+    batch_size: int = 1000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Фильтр поверх iter_raw_jobs: отдаёт только вакансии, которых ещё нет в индексе
+    (и сразу регистрирует их). Известные вакансии дальше по пайплайну не идут.
+    """
+    batch: List[Dict[str, Any]] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            yield from index.filter_new(batch)
+            batch = []
+    if batch:
+        yield from index.filter_new(batch)
+
+
+def main() -> None:
+    if not DEDUP_INDEX_PATH.exists():
+        print(f"[INFO] Dedup index not found: {DEDUP_INDEX_PATH}")
+        return
+    conn = sqlite3.connect(str(DEDUP_INDEX_PATH))
+    rows = conn.execute(
+        "SELECT scope, COUNT(*), SUM(seen_count), MIN(first_seen), MAX(last_seen) FROM ads GROUP BY scope"
+    ).fetchall()
+    conn.close()
+    for scope, n, seen, first, last in rows:
+        print(f"[INFO] {scope}: {n} ads, {seen} sightings, first_seen={first}, last_seen={last}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+enrichment.py
+
+Разметка вакансий за один проход по тексту.
+
+Вместо того чтобы каждый шаг (скиллы, entry-level, язык, ...) сам приводил
+описание к нижнему регистру и сканировал его своим regex, правила всех
+выбранных разметчиков объединяются в один MultiPatternMatcher:
+
+1) для каждой уникальной пары (title, description) строится один канонический
+   текст title + "\n" + description в нижнем регистре;
+2) один проход по нему ищет якоря (литералы) правил всех разметчиков, затем
+   проверяются только задетые правила -> множество сработавших правил;
+3) каждый разметчик переводит свою часть правил в колонки.
+
+joiner у каждого разметчика свой — тот, с которым его правила применялись
+раньше: skills — " " (как extract_skills_frame в pipeline), entry — "\n"
+(как analyze_linkedin_jobs). Для большинства правил разделитель не важен
+(\\s, \\W, \\b одинаково видят " " и "\n"); правила, которые его различают
+(литеральный пробел: "power automate", "rest api"), у разметчиков с другим
+joiner проверяются отдельно — на том же уже приведённом тексте, где "\n"
+заменён их joiner (multi_pattern.separator_sensitive). Результат тот же, что
+у отдельного скана с каждым joiner.
+Кластер тайтла считается по короткому полю title (TitleNormalizer с кешем,
+правило — первое совпадение по очищенному тайтлу), описание для него не сканируется.
+
+Зарегистрированные разметчики (LABELERS):
+    title     -> title_normalized
+    skills    -> skill_* (uint8, правила skill_extractor.SKILL_KEYWORDS)
+    entry     -> is_entry_mid (правила analyze_linkedin_jobs.is_entry_mid_level)
+    language  -> language ("de" / "en" / None, по служебным словам)
+
+Использование:
+    from src.parsing.enrichment import enrich_jobs
+    labels = enrich_jobs(df, labels=["skills", "entry"])   # только нужные колонки
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.classification.factorize import factorize
+from src.classification.multi_pattern import MultiPatternMatcher, rule_anchors, separator_sensitive
+from src.classification.seniority import SeniorityClassifier, get_entry_mid_level_classifier
+from src.classification.skill_extractor import SkillMatcher, get_skill_matcher
+from src.classification.title_normalizer import TitleNormalizer, get_title_normalizer
+
+
+# Function words that are frequent in one language and rare in the other
+LANGUAGE_MARKERS: Dict[str, List[str]] = {
+    "de": ["und", "der", "die", "das", "wir", "sie", "mit", "für", "ihre", "eine", "oder", "bei", "sich", "nicht"],
+    "en": ["and", "the", "we", "you", "with", "for", "your", "our", "are", "will", "this", "have", "is", "of"],
+}
+
+# A language needs at least this many distinct markers to be detected
+MIN_LANGUAGE_MARKERS = 2
+
+# Separator of the one text every text labeler is scanned on
+CANONICAL_JOINER = "\n"
+
+
+class Labeler:
+    """
+    Базовый разметчик.
+
+    source = "text":  rules (name -> [regex] по тексту в нижнем регистре) и decode(),
+                      текст = title + joiner + description;
+    source = "title": label_titles() по полю title, без скана описания.
+
+    По умолчанию каждое правило даёт bool-колонку с его именем (columns пуст),
+    а label_titles() применяет те же rules / decode() к тайтлу.
+    """
+
+    name: str = ""
+    source: str = "text"
+    joiner: str = " "
+    columns: List[str] = []
+    rules: Dict[str, List[str]] = {}
+
+    @property
+    def output_columns(self) -> List[str]:
+        return list(self.columns) or list(self.rules)
+
+    def decode(self, fired: Sequence[int]) -> Tuple[Any, ...]:
+        """Значения колонок по индексам сработавших правил (индексы в self.rules)."""
+        hit = set(fired)
+        return tuple(i in hit for i in range(len(self.rules)))
+
+    def to_frame(self, rows: List[Tuple[Any, ...]]) -> pd.DataFrame:
+        return pd.DataFrame(rows, columns=self.output_columns)
+
+    def label_titles(self, titles: pd.Series) -> pd.DataFrame:
+        matcher = MultiPatternMatcher(self.rules)
+        codes, uniques = factorize(titles.fillna("").astype(str).str.lower())
+        frame = self.to_frame([self.decode(sorted(matcher.match_indices(t))) for t in uniques]).iloc[codes]
+        frame.index = titles.index
+        return frame
+
+
+class TitleLabeler(Labeler):
+    name = "title"
+    source = "title"
+    columns = ["title_normalized"]
+
+    def __init__(self, normalizer: Optional[TitleNormalizer] = None):
+        self.normalizer = normalizer or get_title_normalizer()
+
+    def label_titles(self, titles: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame({"title_normalized": self.normalizer.normalize_many(titles)}, index=titles.index)
+
+
+class SkillsLabeler(Labeler):
+    name = "skills"
+
+    def __init__(self, matcher: Optional[SkillMatcher] = None):
+        matcher = matcher or get_skill_matcher()
+        self.columns = list(matcher.skill_cols)
+        self.rules = matcher.skill_keywords
+
+    def decode(self, fired: Sequence[int]) -> Tuple[Any, ...]:
+        return tuple(fired)
+
+    def to_frame(self, rows: List[Tuple[Any, ...]]) -> pd.DataFrame:
+        matrix = np.zeros((len(rows), len(self.columns)), dtype=np.uint8)
+        for i, fired in enumerate(rows):
+            if fired:
+                matrix[i, list(fired)] = 1
+        return pd.DataFrame(matrix, columns=self.columns)
+
+
+class EntryLabeler(Labeler):
+    name = "entry"
+    # analyze_linkedin_jobs classifies f"{title}\n{description}"
+    joiner = "\n"
+    columns = ["is_entry_mid"]
+
+    def __init__(self, classifier: Optional[SeniorityClassifier] = None):
+        self.classifier = classifier or get_entry_mid_level_classifier()
+        self.rules = self.classifier.rules
+
+    def decode(self, fired: Sequence[int]) -> Tuple[Any, ...]:
+        return (self.classifier.label(fired),)
+
+    def to_frame(self, rows: List[Tuple[Any, ...]]) -> pd.DataFrame:
+        return pd.DataFrame({"is_entry_mid": np.array([r[0] for r in rows], dtype=bool)})
+
+
+class LanguageLabeler(Labeler):
+    name = "language"
+    columns = ["language"]
+
+    def __init__(self, markers: Dict[str, List[str]] = LANGUAGE_MARKERS, min_markers: int = MIN_LANGUAGE_MARKERS):
+        self.rules = {f"{lang}:{w}": [rf"\b{w}\b"] for lang, words in markers.items() for w in words}
+        self._lang = [name.split(":", 1)[0] for name in self.rules]
+        self.min_markers = min_markers
+
+    def decode(self, fired: Sequence[int]) -> Tuple[Any, ...]:
+        counts: Dict[str, int] = {}
+        for i in fired:
+            counts[self._lang[i]] = counts.get(self._lang[i], 0) + 1
+        ranked = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+        if not ranked or ranked[0][1] < self.min_markers:
+            return (None,)
+        if len(ranked) > 1 and ranked[1][1] == ranked[0][1]:
+            return (None,)
+        return (ranked[0][0],)
+
+
+LABELERS: Dict[str, Callable[[], Labeler]] = {
+    "title": TitleLabeler,
+    "skills": SkillsLabeler,
+    "entry": EntryLabeler,
+    "language": LanguageLabeler,
+}
+
+
+def register_labeler(name: str, factory: Callable[[], Labeler]) -> None:
+    """Добавить разметчик в реестр (его правила войдут в общий проход)."""
+    LABELERS[name] = factory
+    get_enricher.cache_clear()
+
+
+class _Scan:
+    """
+    All text labelers over one canonical text: one matcher, each labeler owns a
+    contiguous slice of rule indices.
+
+    Separator-sensitive rules of a labeler with another joiner are confirmed on
+    the text with that joiner instead. Their anchors can differ between the two
+    texts only across the separator, so the anchor scan of the canonical text
+    plus a check of the few characters around the separator finds all of their
+    candidates.
+    """
+
+    def __init__(self, labelers: Sequence[Labeler], joiners: Sequence[str], canonical: str):
+        self.labelers = list(labelers)
+        self.canonical = canonical
+        self._slices: List[Tuple[int, int]] = []
+
+        rules: Dict[str, List[str]] = {}
+        self._joiner_of: Dict[int, str] = {}
+        for lab, joiner in zip(self.labelers, joiners):
+            start = len(rules)
+            for rule, patterns in lab.rules.items():
+                if any(separator_sensitive(p, canonical, joiner) for p in patterns):
+                    self._joiner_of[len(rules)] = joiner
+                rules[f"{lab.name}|{rule}"] = patterns
+            self._slices.append((start, len(rules)))
+
+        anchors = rule_anchors(rules)
+        self._matcher = MultiPatternMatcher(rules, anchors=anchors) if rules else None
+
+        # joiner -> [(anchor, rule)] of the sensitive rules; an anchor spanning the separator
+        # lies within `_window` characters on either side of it
+        self._boundary: Dict[str, List[Tuple[str, int]]] = {}
+        for i, joiner in self._joiner_of.items():
+            self._boundary.setdefault(joiner, []).extend((lit, i) for lit in anchors[i] or ())
+        self._window = max((len(lit) for owned in self._boundary.values() for lit, _ in owned), default=0)
+
+    def scan(self, title: str, description: str) -> List[Tuple[Any, ...]]:
+        """Decoded rows of every labeler; title / description are already lowercased."""
+        fired: List[int] = []
+        if self._matcher is not None:
+            text = title + self.canonical + description
+            candidates = self._matcher.candidates(text)
+            for joiner, owned in self._boundary.items():
+                if owned:
+                    window = title[-self._window:] + joiner + description[:self._window]
+                    candidates.update(i for lit, i in owned if lit in window)
+
+            swapped: Dict[str, str] = {}
+            for i in sorted(candidates):
+                joiner = self._joiner_of.get(i)
+                if joiner is None:
+                    target = text
+                else:
+                    if joiner not in swapped:
+                        swapped[joiner] = title + joiner + description
+                    target = swapped[joiner]
+                if self._matcher.confirm(i, target):
+                    fired.append(i)
+        return [
+            lab.decode([i - a for i in fired if a <= i < b])
+            for lab, (a, b) in zip(self.labelers, self._slices)
+        ]
+
+
+class JobEnricher:
+    """
+    Один проход по тексту вакансии для всех выбранных разметчиков.
+
+    - labels: имена из LABELERS (по умолчанию все), порядок задаёт порядок колонок;
+    - joiner: общий разделитель title и description для всех разметчиков
+      (None — у каждого свой Labeler.joiner, текст строится с CANONICAL_JOINER).
+    """
+
+    def __init__(self, labels: Optional[Sequence[str]] = None, joiner: Optional[str] = None):
+        names = list(labels) if labels is not None else list(LABELERS)
+        unknown = [n for n in names if n not in LABELERS]
+        if unknown:
+            raise ValueError(f"Unknown labels: {unknown}. Registered: {list(LABELERS)}")
+
+        self.labelers: List[Labeler] = [LABELERS[n]() for n in names]
+        self.joiner = joiner
+
+        text_labelers = [lab for lab in self.labelers if lab.source == "text"]
+        self._scan: Optional[_Scan] = None
+        if text_labelers:
+            self._scan = _Scan(
+                text_labelers,
+                [lab.joiner if joiner is None else joiner for lab in text_labelers],
+                CANONICAL_JOINER if joiner is None else joiner,
+            )
+
+    @property
+    def columns(self) -> List[str]:
+        return [col for lab in self.labelers for col in lab.output_columns]
+
+    def enrich(self, titles: pd.Series, descriptions: pd.Series) -> pd.DataFrame:
+        """
+        Все колонки выбранных разметчиков (index = titles.index).
+        """
+        index = titles.index
+        frames: Dict[str, pd.DataFrame] = {}
+
+        if self._scan is not None:
+            title_text = titles.fillna("").astype(str).tolist()
+            desc_text = descriptions.fillna("").astype(str).tolist()
+            # Lowercased once per distinct ad; title and description kept apart for the separator swap
+            codes, uniques = factorize(list(zip(title_text, desc_text)))
+            decoded = [self._scan.scan(t.lower(), d.lower()) for t, d in uniques]
+            for k, lab in enumerate(self._scan.labelers):
+                frame = lab.to_frame([row[k] for row in decoded]).iloc[codes]
+                frame.index = index
+                frames[lab.name] = frame
+
+        for lab in self.labelers:
+            if lab.source == "title":
+                frames[lab.name] = lab.label_titles(titles)
+
+        if not frames:
+            return pd.DataFrame(index=index)
+        return pd.concat([frames[lab.name] for lab in self.labelers], axis=1)
+
+
+@lru_cache(maxsize=None)
+def get_enricher(labels: Optional[Tuple[str, ...]] = None, joiner: Optional[str] = None) -> JobEnricher:
+    return JobEnricher(labels, joiner)
+
+
+def enrich_jobs(
+    df: pd.DataFrame,
+    labels: Optional[Sequence[str]] = None,
+    title_col: str = "raw_title",
+    text_col: str = "description",
+    joiner: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Колонки разметки для df (только выбранные labels, по умолчанию все).
+    """
+    enricher = get_enricher(tuple(labels) if labels is not None else None, joiner)
+    return enricher.enrich(df[title_col], df[text_col])
@@ -6,7 +6,7 @@ job_ads_pipeline.py
 
 Pipeline для обработки сырых вакансий:
 
-1) Читает данные из CSV / Parquet / JSON.
+1) Читает данные из CSV / Parquet / JSON / JSONL (целиком или батчами, --chunksize).
    Ожидаемые минимальные колонки:
       - id (или job_id)         [опционально]
       - country                  [DE / AT / CH]
@@ -14,30 +14,38 @@ Pipeline для обработки сырых вакансий:
       - description              [полное описание вакансии]
       - source                   [опционально: job board / system]
 
-2) Нормализует тайтл -> title_normalized (cluster id)
-   - использует src.classification.title_normalizer.normalize_title
+2) Размечает вакансии одним проходом по тексту (src.parsing.enrichment):
+   - title_normalized (cluster id) — по тайтлу, один расчёт на уникальный тайтл;
+   - skill_*, is_entry_mid, language — один скан title + description
+   Набор колонок задаётся --labels (по умолчанию все разметчики).
 
-3) Извлекает скиллы -> столбцы skill_*
-   - использует src.classification.skill_extractor.extract_skills
-
-4) Сохраняет результат в data/processed/job_ads_labeled.parquet
+3) Сохраняет результат в data/processed/job_ads_labeled.parquet
    (или путь, заданный аргументом --output).
 
 Использование:
     python -m src.parsing.job_ads_pipeline --input data/raw/job_ads/de/sample.csv
+    python -m src.parsing.job_ads_pipeline --input data/raw/job_ads/de/sample.csv --workers 8
+    python -m src.parsing.job_ads_pipeline --input data/raw/job_ads/dach.jsonl --chunksize 50000
+    python -m src.parsing.job_ads_pipeline --input data/raw/job_ads/de/sample.csv --labels title,skills
 
 """
 
 import argparse
-import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional, Sequence
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from ..config import RAW_DIR, PROCESSED_DIR
-from ..classification.title_normalizer import normalize_title
-from ..classification.skill_extractor import extract_skills
+from .enrichment import LABELERS, enrich_jobs
+
+
+# Several chunks per worker keep the pool busy when chunks take uneven time
+CHUNKS_PER_WORKER = 4
 
 
 def detect_format(path: Path) -> str:
@@ -51,6 +59,8 @@ def detect_format(path: Path) -> str:
         return "parquet"
     if suffix in [".json"]:
         return "json"
+    if suffix in [".jsonl", ".ndjson"]:
+        return "jsonl"
     raise ValueError(f"Unsupported file extension: {suffix}")
 
 
@@ -67,13 +77,46 @@ def load_job_ads(input_path: Path, fmt: Optional[str] = None) -> pd.DataFrame:
         df = pd.read_parquet(input_path)
     elif fmt == "json":
         df = pd.read_json(input_path, orient="records", lines=False)
+    elif fmt == "jsonl":
+        df = pd.read_json(input_path, orient="records", lines=True)
     else:
         raise ValueError(f"Unsupported format: {fmt}")
 
     return df
 
 
-def ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
+def iter_job_ad_batches(input_path: Path,
+                        chunksize: int,
+                        fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Потоковое чтение сырых вакансий батчами по chunksize строк:
+    - CSV      -> pd.read_csv(chunksize=...)
+    - Parquet  -> чтение по row groups / батчам pyarrow
+    - JSONL    -> построчно (pd.read_json(lines=True, chunksize=...))
+    Обычный JSON-массив потоково не читается — для него нужен JSON Lines.
+    """
+    if fmt is None:
+        fmt = detect_format(input_path)
+
+    if fmt == "csv":
+        yield from pd.read_csv(input_path, chunksize=chunksize)
+    elif fmt == "parquet":
+        pf = pq.ParquetFile(input_path)
+        for batch in pf.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif fmt == "jsonl":
+        with pd.read_json(input_path, orient="records", lines=True, chunksize=chunksize) as reader:
+            yield from reader
+    elif fmt == "json":
+        raise ValueError(
+            "Chunked mode needs JSON Lines (.jsonl); a plain JSON array cannot be streamed. "
+            "Run without --chunksize or convert the file to JSON Lines."
+        )
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def ensure_columns(df: pd.DataFrame, id_offset: int = 0) -> pd.DataFrame:
     """
     Приводим DataFrame к ожидаемым колонкам:
     - country
@@ -81,6 +124,9 @@ def ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     - description
     - source
     - job_id (если возможно)
+
+    id_offset — сдвиг для сгенерированных job_id (в потоковом режиме,
+    чтобы id шли сквозной нумерацией по батчам).
     """
 
     if "country" not in df.columns:
@@ -121,47 +167,160 @@ def ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
         if found is not None and found != "job_id":
             df = df.rename(columns={found: "job_id"})
         elif found is None:
-            df["job_id"] = range(1, len(df) + 1)
+            df["job_id"] = range(id_offset + 1, id_offset + len(df) + 1)
 
     return df
 
 
-def apply_title_normalization(df: pd.DataFrame) -> pd.DataFrame:
+def apply_enrichment(df: pd.DataFrame, labels: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
-    Применяем normalize_title к колонке raw_title.
+    Все колонки разметки одним проходом по тексту (title + description).
+    labels — подмножество src.parsing.enrichment.LABELERS (None = все).
     """
-    df["title_normalized"] = df["raw_title"].astype(str).apply(normalize_title)
+    enriched = enrich_jobs(df.assign(raw_title=df["raw_title"].fillna("").astype(str)), labels=labels)
+    for col in enriched.columns:
+        # skill_* stay nullable integers in the output Parquet
+        df[col] = enriched[col].astype("Int64") if col.startswith("skill_") else enriched[col]
     return df
 
 
-def apply_skill_extraction(df: pd.DataFrame) -> pd.DataFrame:
+def _label_chunk(df: pd.DataFrame, labels: Optional[Sequence[str]] = None) -> pd.DataFrame:
     """
-    Применяем extract_skills к тексту (title + description).
+    Разметка одного куска (см. apply_enrichment).
+    Функция модульного уровня, чтобы её можно было отдать в ProcessPoolExecutor.
     """
-    texts = (df["raw_title"].fillna("").astype(str) + " " +
-             df["description"].fillna("").astype(str))
+    return apply_enrichment(df.copy(), labels)
 
-    skill_dicts = [extract_skills(t) for t in texts]
 
-    skills_df = pd.DataFrame(skill_dicts)
-    if not skills_df.empty:
-        for col in skills_df.columns:
-            df[col] = skills_df[col].astype("Int64")
+def split_chunks(df: pd.DataFrame, n_chunks: int) -> List[pd.DataFrame]:
+    """
+    Делим DataFrame на n_chunks последовательных кусков (порядок строк сохраняется).
+    """
+    n_chunks = max(1, min(n_chunks, len(df)))
+    bounds = [round(i * len(df) / n_chunks) for i in range(n_chunks + 1)]
+    return [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
 
-    return df
+
+def label_job_ads(df: pd.DataFrame,
+                  workers: int = 1,
+                  pool: Optional[ProcessPoolExecutor] = None,
+                  labels: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Разметка вакансий (тайтл-кластер, скиллы, entry-level, язык — см. labels).
+
+    workers <= 1 -> последовательно в текущем процессе.
+    workers > 1  -> DataFrame режется на куски, куски размечаются в пуле процессов
+                    и собираются обратно в исходном порядке.
+    Результат совпадает с последовательным режимом.
+    pool — готовый пул (переиспользуется между батчами в потоковом режиме).
+    """
+    if workers <= 1 or len(df) < 2:
+        return _label_chunk(df, labels)
+
+    label_chunk = partial(_label_chunk, labels=labels)
+    chunks = split_chunks(df, workers * CHUNKS_PER_WORKER)
+    if pool is not None:
+        return pd.concat(list(pool.map(label_chunk, chunks)))
+
+    with ProcessPoolExecutor(max_workers=workers) as own_pool:
+        parts = list(own_pool.map(label_chunk, chunks))
+
+    return pd.concat(parts)
+
+
+def _arrow_schema(table: pa.Table) -> pa.Schema:
+    """
+    Схема выходного файла по первому батчу.
+    Полностью пустые колонки (тип null) фиксируем как string,
+    чтобы следующие батчи с заполненными значениями в неё помещались.
+    """
+    fields = [
+        pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+        for f in table.schema
+    ]
+    return pa.schema(fields)
+
+
+def process_job_ads_chunked(input_path: Path,
+                            output_path: Path,
+                            chunksize: int,
+                            input_format: Optional[str] = None,
+                            workers: int = 1,
+                            labels: Optional[Sequence[str]] = None) -> Path:
+    """
+    Потоковый режим: батч -> ensure_columns -> разметка -> дозапись в Parquet.
+    Пиковая память ограничена размером батча, а не размером входного файла.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    writer: Optional[pq.ParquetWriter] = None
+    schema: Optional[pa.Schema] = None
+    total = 0
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        for i, batch in enumerate(iter_job_ad_batches(input_path, chunksize, fmt=input_format)):
+            batch = ensure_columns(batch, id_offset=total)
+            batch = label_job_ads(batch, workers=workers, pool=pool, labels=labels)
+
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            if writer is None:
+                schema = _arrow_schema(table)
+                writer = pq.ParquetWriter(output_path, schema)
+            try:
+                table = table.select(schema.names).cast(schema)
+            except (KeyError, pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(
+                    f"Batch {i} does not match the schema of the first batch: {e}. "
+                    "Try a larger --chunksize or a typed input (Parquet)."
+                ) from e
+
+            writer.write_table(table)
+            total += len(batch)
+            print(f"[INFO] Batch {i}: {len(batch)} rows (total {total}).")
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+
+    if writer is None:
+        raise ValueError(f"No rows read from {input_path}")
+
+    return output_path
 
 
 def process_job_ads(input_path: Path,
                     output_path: Optional[Path] = None,
-                    input_format: Optional[str] = None) -> Path:
+                    input_format: Optional[str] = None,
+                    workers: int = 1,
+                    chunksize: Optional[int] = None,
+                    labels: Optional[Sequence[str]] = None) -> Path:
     """
     Полный пайплайн:
       - загрузка
       - нормализация колонок
-      - нормализация тайтлов
-      - извлечение скиллов
+      - разметка (тайтлы, скиллы, entry-level, язык) одним проходом
       - сохранение Parquet
+
+    chunksize задан -> потоковый режим (process_job_ads_chunked).
     """
+    if output_path is None:
+        output_path = PROCESSED_DIR / "job_ads_labeled.parquet"
+
+    if chunksize:
+        print(f"[INFO] Streaming raw job ads from: {input_path} (chunksize={chunksize})")
+        process_job_ads_chunked(
+            input_path=input_path,
+            output_path=output_path,
+            chunksize=chunksize,
+            input_format=input_format,
+            workers=workers,
+            labels=labels,
+        )
+        print(f"[INFO] Saved processed job ads to: {output_path}")
+        return output_path
+
     print(f"[INFO] Loading raw job ads from: {input_path}")
     df = load_job_ads(input_path, fmt=input_format)
     print(f"[INFO] Loaded {len(df)} rows.")
@@ -169,14 +328,8 @@ def process_job_ads(input_path: Path,
     df = ensure_columns(df)
     print("[INFO] Columns after ensure_columns:", list(df.columns))
 
-    df = apply_title_normalization(df)
-    print("[INFO] Applied title normalization.")
-
-    df = apply_skill_extraction(df)
-    print("[INFO] Applied skill extraction.")
-
-    if output_path is None:
-        output_path = PROCESSED_DIR / "job_ads_labeled.parquet"
+    df = label_job_ads(df, workers=workers, labels=labels)
+    print(f"[INFO] Applied labels {labels or list(LABELERS)} (workers={workers}).")
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_parquet(output_path, index=False)
@@ -205,8 +358,27 @@ def main():
         "--format",
         type=str,
         default=None,
-        choices=["csv", "parquet", "json"],
-        help="Inputformat (csv/parquet/json). Wird ansonsten aus der Dateiendung abgeleitet."
+        choices=["csv", "parquet", "json", "jsonl"],
+        help="Inputformat (csv/parquet/json/jsonl). Wird ansonsten aus der Dateiendung abgeleitet."
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Anzahl Prozesse für Titel-/Skill-Labelling (Default: 1 = seriell)."
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Streaming-Modus: Eingabe in Batches dieser Größe lesen und an die Parquet-Datei anhängen."
+    )
+    parser.add_argument(
+        "--labels",
+        type=str,
+        default=None,
+        help=f"Komma-separierte Labeler ({','.join(LABELERS)}). Default: alle, in einem Textdurchlauf."
     )
 
     args = parser.parse_args()
@@ -221,6 +393,9 @@ def main():
         input_path=input_path,
         output_path=output_path,
         input_format=args.format,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        labels=args.labels.split(",") if args.labels else None,
     )
 
 
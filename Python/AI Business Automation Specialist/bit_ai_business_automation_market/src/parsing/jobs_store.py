@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+jobs_store.py
+
+Канонический колоночный стор нормализованных вакансий:
+
+    data/processed/jobs/country=DE/role_id=<role>/month=2025-10/part-0.parquet
+
+- Партиции: country / role_id / month (месяц публикации, YYYY-MM).
+- Запись инкрементальная: перезаписываются только партиции,
+  которые есть во входном DataFrame, остальные остаются на диске.
+  prune=True — входной DataFrame считается полным срезом: партиции,
+  которых в нём нет (например, месяцы вне окна 6m), удаляются.
+- Чтение: только нужные партиции (фильтры) и колонки.
+
+Пишет: src/analyze_monthly_trends.py
+Читает: build_monthly (analyze_monthly_trends --from-store) и дальнейшие шаги.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.config import PROCESSED_DIR
+
+
+JOBS_STORE_DIR = PROCESSED_DIR / "jobs"
+
+PARTITION_COLS = ["country", "role_id", "month"]
+UNKNOWN_MONTH = "unknown"
+
+
+def _month_key(posted_at: pd.Series) -> pd.Series:
+    dt = pd.to_datetime(posted_at, utc=True, errors="coerce")
+    return dt.dt.strftime("%Y-%m").fillna(UNKNOWN_MONTH)
+
+
+def _partition_key(path: Path, base_dir: Path) -> str:
+    """country=DE/role_id=x/month=2025-10 -> DE/x/2025-10"""
+    return "/".join(part.split("=", 1)[1] for part in path.relative_to(base_dir).parts)
+
+
+def prune_partitions(keep: Iterable[str], base_dir: Path = JOBS_STORE_DIR) -> List[str]:
+    """
+    Удаляет партиции (country/role_id/month), которых нет в keep,
+    и опустевшие каталоги country= / role_id=. Возвращает удалённые.
+    """
+    keep = set(keep)
+    removed = []
+    for p in sorted(base_dir.glob("country=*/role_id=*/month=*")):
+        if p.is_dir() and _partition_key(p, base_dir) not in keep:
+            shutil.rmtree(p)
+            removed.append(_partition_key(p, base_dir))
+    for parent in sorted(base_dir.glob("country=*/role_id=*")) + sorted(base_dir.glob("country=*")):
+        if parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+    return removed
+
+
+def write_jobs(df: pd.DataFrame, base_dir: Path = JOBS_STORE_DIR, prune: bool = False) -> List[str]:
+    """
+    Записывает вакансии в партиционированный Parquet-датасет.
+    Возвращает список перезаписанных партиций (country/role_id/month).
+
+    prune=True: df — полный срез, остальные партиции удаляются (см. prune_partitions).
+    """
+    missing = [c for c in ["country", "role_id", "posted_at"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for jobs store: {missing}")
+
+    if df.empty:
+        if prune and base_dir.exists():
+            prune_partitions([], base_dir)
+        return []
+
+    out = df.copy()
+    out["month"] = _month_key(out["posted_at"])
+    for col in ["country", "role_id"]:
+        out[col] = out[col].astype(str)
+
+    table = pa.Table.from_pandas(out, preserve_index=False)
+
+    base_dir.mkdir(parents=True, exist_ok=True)
+    ds.write_dataset(
+        table,
+        base_dir=str(base_dir),
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([(c, pa.string()) for c in PARTITION_COLS]),
+            flavor="hive",
+        ),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+
+    parts = out[PARTITION_COLS].drop_duplicates().sort_values(PARTITION_COLS)
+    written = ["/".join(row) for row in parts.itertuples(index=False, name=None)]
+    if prune:
+        prune_partitions(written, base_dir)
+    return written
+
+
+def read_jobs(
+    columns: Optional[Iterable[str]] = None,
+    countries: Optional[Iterable[str]] = None,
+    role_ids: Optional[Iterable[str]] = None,
+    months: Optional[Iterable[str]] = None,
+    since_month: Optional[str] = None,
+    base_dir: Path = JOBS_STORE_DIR,
+) -> pd.DataFrame:
+    """
+    Читает только нужные партиции и колонки.
+
+    months / since_month — в формате YYYY-MM.
+    Партиции с неизвестной датой (month=unknown) при since_month отбрасываются.
+    """
+    if not base_dir.exists():
+        raise FileNotFoundError(
+            f"Jobs store not found: {base_dir}. Сначала запусти: python -m src.analyze_monthly_trends"
+        )
+
+    dataset = ds.dataset(str(base_dir), format="parquet", partitioning="hive")
+
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if countries is not None:
+        expr = _and(ds.field("country").isin([str(c) for c in countries]))
+    if role_ids is not None:
+        expr = _and(ds.field("role_id").isin([str(r) for r in role_ids]))
+    if months is not None:
+        expr = _and(ds.field("month").isin([str(m) for m in months]))
+    if since_month is not None:
+        expr = _and((ds.field("month") >= since_month) & (ds.field("month") != UNKNOWN_MONTH))
+
+    cols = list(columns) if columns is not None else None
+    table = dataset.to_table(columns=cols, filter=expr)
+    df = table.to_pandas()
+
+    for col in PARTITION_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+
+    if "posted_at" in df.columns:
+        df["posted_at"] = pd.to_datetime(df["posted_at"], utc=True, errors="coerce")
+
+    return df
+
+
+def list_partitions(base_dir: Path = JOBS_STORE_DIR) -> pd.DataFrame:
+    """Список партиций (country, role_id, month) без чтения данных."""
+    rows = []
+    for p in sorted(base_dir.glob("country=*/role_id=*/month=*")):
+        if not p.is_dir():
+            continue
+        rows.append(
+            {
+                "country": p.parent.parent.name.split("=", 1)[1],
+                "role_id": p.parent.name.split("=", 1)[1],
+                "month": p.name.split("=", 1)[1],
+                "files": len(list(p.glob("*.parquet"))),
+            }
+        )
+    return pd.DataFrame(rows, columns=["country", "role_id", "month", "files"])
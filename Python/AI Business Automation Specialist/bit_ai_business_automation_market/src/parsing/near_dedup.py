@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+near_dedup.py
+
+Поиск почти-дубликатов вакансий (re-post с другим gender-суффиксом,
+написанием города, tracking-параметром в URL и т.п.):
+
+1) нормализация текста (title + description) и словесные шинглы;
+2) MinHash-сигнатуры (numpy, universal hashing);
+3) LSH banding: кандидаты — документы с совпавшей полосой сигнатуры;
+4) проверка кандидатов по оценке Jaccard >= threshold и union-find -> cluster id.
+
+Сложность ~ O(n * num_perm), без попарного сравнения всех вакансий.
+
+Использование:
+    from src.parsing.near_dedup import near_duplicate_clusters
+    cluster_ids = near_duplicate_clusters(texts, threshold=0.8)
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+
+# Mersenne prime 2^31 - 1: a * x stays below 2^62 in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint64((1 << 31) - 1)
+
+# Permutations hashed at once (bounds the temporary perm x shingles matrix)
+_PERM_BLOCK = 16
+
+# (m/w/d), (w/m/x), m/f/d, (all genders), (gn) ...
+_GENDER_RE = re.compile(
+    r"\(?\s*\b[mwfdx]\s*/\s*[mwfdx]\s*(?:/\s*[mwfdx])?\b\s*\)?|\(\s*(?:all genders|gn\*?|d)\s*\)",
+    re.IGNORECASE,
+)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_for_shingles(text: str) -> List[str]:
+    """Токены текста без gender-суффиксов и пунктуации, в нижнем регистре."""
+    text = _GENDER_RE.sub(" ", text or "")
+    return _TOKEN_RE.findall(text.lower())
+
+
+def shingle_hashes(text: str, k: int = DEFAULT_SHINGLE_SIZE) -> np.ndarray:
+    """uint64-хеши словесных k-грамм (короткий текст -> один шингл из всех токенов)."""
+    tokens = normalize_for_shingles(text)
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+
+    h = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+    if len(h) < k:
+        k = len(h)
+
+    # Polynomial combination of token hashes, reduced into [0, 2^31 - 1)
+    acc = np.zeros(len(h) - k + 1, dtype=np.uint64)
+    for i in range(k):
+        acc = (acc * np.uint64(1_000_003) + h[i:len(h) - k + 1 + i]) % _PRIME
+    return np.unique(acc)
+
+
+def choose_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) с bands * rows <= num_perm, у которых точка перегиба
+    S-кривой (1/b)^(1/r) ближе всего к threshold.
+    """
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands == 0:
+            break
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = np.arange(n)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Smaller index stays the root, so cluster ids follow input order
+            if ra < rb:
+                self.parent[rb] = ra
+            else:
+                self.parent[ra] = rb
+
+
+class MinHashLSH:
+    """
+    MinHash + LSH для кластеризации почти-дубликатов.
+
+    - threshold: минимальная оценка Jaccard по шинглам, чтобы считать пару дубликатом;
+    - num_perm: длина сигнатуры (точность оценки ~ 1/sqrt(num_perm));
+    - shingle_size: длина словесной k-граммы.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+        seed: int = 1,
+        batch_size: int = 2000,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.batch_size = batch_size
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (signatures uint64 n x num_perm, маска пустых документов).
+        Документы обрабатываются батчами: все шинглы батча одним массивом,
+        минимум по документу через np.minimum.reduceat.
+        """
+        n = len(texts)
+        sig = np.full((n, self.num_perm), _MAX_HASH, dtype=np.uint64)
+        empty = np.zeros(n, dtype=bool)
+
+        for start in range(0, n, self.batch_size):
+            parts = [shingle_hashes(t, self.shingle_size) for t in texts[start:start + self.batch_size]]
+            lengths = np.array([len(p) for p in parts])
+            empty[start:start + len(parts)] = lengths == 0
+            nonempty = np.flatnonzero(lengths > 0)
+            if len(nonempty) == 0:
+                continue
+
+            flat = np.concatenate([parts[i] for i in nonempty])
+            offsets = np.concatenate([[0], np.cumsum(lengths[nonempty])[:-1]])
+            rows = start + nonempty
+            # (perm block x total_shingles) -> min per document segment
+            for p in range(0, self.num_perm, _PERM_BLOCK):
+                a = self._a[p:p + _PERM_BLOCK, None]
+                b = self._b[p:p + _PERM_BLOCK, None]
+                hashed = (a * flat[None, :] + b) % _PRIME
+                sig[rows, p:p + _PERM_BLOCK] = np.minimum.reduceat(hashed, offsets, axis=1).T
+
+        return sig, empty
+
+    def cluster(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Cluster id для каждого текста (int64, 0..k-1 в порядке первого появления).
+        Пустые тексты получают собственные кластеры.
+        """
+        texts = list(texts)
+        n = len(texts)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        sig, empty = self.signatures(texts)
+        uf = _UnionFind(n)
+        docs = np.flatnonzero(~empty)
+
+        for band in range(self.bands):
+            block = np.ascontiguousarray(sig[docs, band * self.rows:(band + 1) * self.rows])
+            keys = block.view(np.dtype((np.void, block.dtype.itemsize * self.rows))).ravel()
+            _, bucket = np.unique(keys, return_inverse=True)
+
+            order = np.argsort(bucket, kind="stable")
+            sorted_bucket = bucket[order]
+            starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+
+            for s, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+                members = docs[order[s:s + size]]
+                head = members[0]
+                # Verify candidates against the bucket head (estimated Jaccard)
+                agree = (sig[members[1:]] == sig[head]).mean(axis=1)
+                for m in members[1:][agree >= self.threshold]:
+                    uf.union(int(head), int(m))
+
+        roots = np.array([uf.find(i) for i in range(n)])
+        _, first_idx, inverse = np.unique(roots, return_index=True, return_inverse=True)
+        # Renumber clusters by first appearance
+        rank = np.empty(len(first_idx), dtype=np.int64)
+        rank[np.argsort(first_idx, kind="stable")] = np.arange(len(first_idx))
+        return rank[inverse]
+
+
+def near_duplicate_clusters(
+    texts: Iterable[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE_SIZE,
+) -> np.ndarray:
+    """Cluster id почти-дубликатов для каждого текста (см. MinHashLSH)."""
+    return MinHashLSH(threshold, num_perm, shingle_size).cluster(list(texts))
+
+
+def job_text(title: Optional[str], description: Optional[str]) -> str:
+    """Текст вакансии для near-dedup: title + description."""
+    return f"{title or ''}\n{description or ''}"
+
+
+def keep_first_per_cluster(cluster_ids: np.ndarray) -> np.ndarray:
+    """Булева маска: первая строка каждого кластера."""
+    mask = np.zeros(len(cluster_ids), dtype=bool)
+    _, first_idx = np.unique(cluster_ids, return_index=True)
+    mask[first_idx] = True
+    return mask
@@ -0,0 +1,483 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+raw_jobs_stream.py
+
+Единый слой чтения сырых Apify-выгрузок:
+
+    data/raw/{DE,AT,CH}/{role_id}/*.json
+
+1) Обходит файлы и отдаёт вакансии генератором (без общего списка в памяти).
+2) Приводит каждую вакансию к единому формату (normalize_raw_job).
+3) Ведёт манифест (размер, mtime, sha256) в data/processed/raw_manifest.json
+   и кэширует нормализованные записи по каждому файлу.
+   Повторный запуск парсит только новые или изменённые файлы,
+   остальные записи читаются из кэша.
+
+Используется в:
+    - src/analyze_linkedin_jobs.py
+    - src/analyze_monthly_trends.py
+    - src/classification/extract_skills_from_raw.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.config import BASE_DIR, PROCESSED_DIR, RAW_DIR
+
+
+COUNTRIES = ["DE", "AT", "CH"]
+
+MANIFEST_PATH = PROCESSED_DIR / "raw_manifest.json"
+CACHE_DIR = PROCESSED_DIR / "raw_cache"
+
+# Bump when normalize_raw_job changes its output, so cached files are rebuilt
+SCHEMA_VERSION = 1
+
+TITLE_KEYS = ["title", "jobTitle", "position", "job_title"]
+COMPANY_KEYS = ["companyName", "company", "company_name"]
+LOCATION_KEYS = ["location", "jobLocation", "job_location", "city"]
+DESCRIPTION_KEYS = ["description", "jobDescription", "descriptionText", "job_description"]
+URL_KEYS = ["url", "jobUrl", "jobURL", "job_url", "link", "applyUrl"]
+SENIORITY_KEYS = ["seniorityLevel", "seniority", "experienceLevel"]
+
+# Union of the date fields used by analyze_linkedin_jobs and analyze_monthly_trends
+DATE_FIELDS = [
+    "postedAt", "posted_at",
+    "datePosted", "date_posted",
+    "publishedAt", "published_at",
+    "listedAt", "listed_at",
+    "postingDate", "posting_date",
+    "createdAt", "created_at",
+    "listedAtDate", "publishedAtDate", "date",
+]
+NESTED_DATE_CONTAINERS = ["jobPosting", "job", "posting", "data"]
+
+# Characters read per step when streaming a JSON array / JSONL file
+JSON_CHUNK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class RawFile:
+    path: Path
+    country: str
+    role_id: str
+
+    @property
+    def rel_path(self) -> str:
+        try:
+            return self.path.relative_to(BASE_DIR).as_posix()
+        except ValueError:
+            return self.path.as_posix()
+
+    @property
+    def scraped_at(self) -> str:
+        """Время выгрузки (mtime файла, UTC ISO) — база для "N days ago"."""
+        return datetime.fromtimestamp(self.path.stat().st_mtime, tz=timezone.utc).isoformat()
+
+
+# -----------------------------
+# FILE DISCOVERY
+# -----------------------------
+def iter_raw_files(
+    raw_dir: Path = RAW_DIR,
+    countries: Optional[Iterable[str]] = None,
+    role_ids: Optional[Iterable[str]] = None,
+) -> Iterator[RawFile]:
+    """
+    Обходит data/raw/{country}/{role_id}/*.json в детерминированном порядке.
+    """
+    countries = [c.upper() for c in (countries or COUNTRIES)]
+    wanted_roles = {r.lower() for r in role_ids} if role_ids else None
+
+    for country in countries:
+        country_dir = raw_dir / country
+        if not country_dir.is_dir():
+            continue
+
+        for role_dir in sorted(p for p in country_dir.iterdir() if p.is_dir()):
+            role_id = role_dir.name.strip().lower()
+            if wanted_roles is not None and role_id not in wanted_roles:
+                continue
+
+            for path in sorted(role_dir.glob("*.json")):
+                yield RawFile(path=path, country=country, role_id=role_id)
+
+
+# -----------------------------
+# PARSING
+# -----------------------------
+_NON_SPACE = re.compile(r"\S")
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """
+    Последовательный json.JSONDecoder.raw_decode по файлу, читаемому кусками:
+    в памяти один разбираемый элемент и один кусок, а не весь файл.
+    """
+
+    def __init__(self, f, chunk_size: int = JSON_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Следующий непробельный символ ("" в конце файла), без сдвига."""
+        while True:
+            m = _NON_SPACE.search(self.buf, self.pos)
+            if m:
+                self.pos = m.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self._fill():
+                return ""
+
+    def skip(self) -> None:
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Следующее JSON-значение (json.JSONDecodeError, если оно битое)."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # The value may continue in the next chunk
+                if self._fill():
+                    continue
+                raise
+            # A value ending exactly at the chunk border (e.g. a number) may be cut
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def lines(self) -> Iterator[str]:
+        """Остаток файла построчно (для JSONL)."""
+        rest = self.buf[self.pos:]
+        self.buf, self.pos = "", 0
+        if not self.eof:
+            rest += self.f.readline()
+        yield from rest.splitlines()
+        if not self.eof:
+            yield from self.f
+
+
+def _iter_jsonl(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(obj, dict):
+            yield obj
+
+
+def iter_json_items(path: Path, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Читает файл Apify потоково (json.JSONDecoder.raw_decode по кускам chunk_size):
+    - JSON-массив — по одному элементу, файл целиком в память не читается;
+      если массив обрывается или битый — отдаются элементы до ошибки и печатается WARN;
+    - JSONL (по одной вакансии на строку) — построчно, битые строки пропускаются;
+    - один объект с ключом items / results / data — этот объект (обёртка)
+      загружается целиком; объект без них считается одной вакансией.
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        stream = _JsonStream(f, chunk_size)
+        head = stream.peek()
+        if not head:
+            return
+
+        if head == "[":
+            stream.skip()
+            try:
+                while True:
+                    ch = stream.peek()
+                    if ch == ",":
+                        stream.skip()
+                        continue
+                    if ch == "]":
+                        return
+                    if not ch:
+                        raise json.JSONDecodeError("Unterminated array", "", 0)
+                    obj = stream.value()
+                    if isinstance(obj, dict):
+                        yield obj
+            except json.JSONDecodeError:
+                print(f"[WARN] Невозможно распарсить JSON: {path}")
+            return
+
+        if head == "{":
+            try:
+                first = stream.value()
+            except json.JSONDecodeError:
+                first = None
+
+            if first is not None and not stream.peek():
+                # Single document: an items / results / data wrapper or one ad
+                data = first.get("items") or first.get("results") or first.get("data") or [first]
+                if isinstance(data, list):
+                    for obj in data:
+                        if isinstance(obj, dict):
+                            yield obj
+                return
+
+            if first is not None:
+                # More values follow -> JSONL; the first line is already decoded
+                yield first
+                yield from _iter_jsonl(stream.lines())
+                return
+
+        # Not a JSON document -> line by line from the start
+        f.seek(0)
+        yield from _iter_jsonl(f)
+
+
+def _first_str(obj: Dict[str, Any], keys: List[str]) -> str:
+    """Первое непустое строковое значение из списка ключей."""
+    for k in keys:
+        val = obj.get(k)
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    return ""
+
+
+def _extract_dates(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Сырые значения полей даты (верхний уровень + вложенные контейнеры)."""
+    dates: Dict[str, Any] = {k: obj[k] for k in DATE_FIELDS if obj.get(k) not in (None, "")}
+
+    for container in NESTED_DATE_CONTAINERS:
+        sub = obj.get(container)
+        if isinstance(sub, dict):
+            nested = {k: sub[k] for k in DATE_FIELDS if sub.get(k) not in (None, "")}
+            if nested:
+                dates[container] = nested
+
+    return dates
+
+
+def normalize_raw_job(obj: Dict[str, Any], raw_file: RawFile, scraped_at: str = "") -> Dict[str, Any]:
+    """
+    Единый формат записи, общий для всех анализаторов.
+    Даты не парсятся здесь: `dates` разбирается пакетно (src.parsing.dates),
+    scraped_at — время выгрузки файла для относительных дат.
+    """
+    return {
+        "country": raw_file.country,
+        "role_id": raw_file.role_id,
+        "title": _first_str(obj, TITLE_KEYS),
+        "company": _first_str(obj, COMPANY_KEYS),
+        "location": _first_str(obj, LOCATION_KEYS),
+        "description": _first_str(obj, DESCRIPTION_KEYS),
+        "url": _first_str(obj, URL_KEYS),
+        "seniority": _first_str(obj, SENIORITY_KEYS),
+        "dates": _extract_dates(obj),
+        "source_file": raw_file.rel_path,
+        "scraped_at": scraped_at,
+    }
+
+
+# -----------------------------
+# MANIFEST + CACHE
+# -----------------------------
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class RawManifest:
+    """
+    Манифест сырых файлов: rel_path -> {size, mtime_ns, sha256, records}.
+
+    Проверка "изменился ли файл":
+      - размер и mtime совпали -> файл не менялся (без хеширования);
+      - иначе считаем sha256: если совпал -> только обновляем mtime.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH, cache_dir: Path = CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                data = {}
+            if data.get("schema_version") == SCHEMA_VERSION:
+                self.entries = data.get("files", {})
+
+    def cache_path(self, sha256: str) -> Path:
+        return self.cache_dir / f"{sha256}.jsonl"
+
+    def lookup(self, raw_file: RawFile) -> Optional[str]:
+        """
+        Возвращает sha256 файла, если для него есть валидный кэш, иначе None.
+        """
+        entry = self.entries.get(raw_file.rel_path)
+        if not entry:
+            return None
+
+        stat = raw_file.path.stat()
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            sha = entry["sha256"]
+        else:
+            sha = file_sha256(raw_file.path)
+            if sha != entry["sha256"]:
+                return None
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._dirty = True
+
+        return sha if self.cache_path(sha).exists() else None
+
+    def record(self, raw_file: RawFile, sha256: str, records: int) -> None:
+        stat = raw_file.path.stat()
+        self.entries[raw_file.rel_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            "records": records,
+        }
+        self._dirty = True
+
+    def prune(self, seen: Iterable[str]) -> None:
+        """Удаляет из манифеста файлы, которых больше нет на диске."""
+        seen = set(seen)
+        for rel in [r for r in self.entries if r not in seen]:
+            del self.entries[rel]
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"schema_version": SCHEMA_VERSION, "files": self.entries}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+        self._dirty = False
+
+
+def _iter_cached(cache_path: Path, raw_file: RawFile) -> Iterator[Dict[str, Any]]:
+    scraped_at = raw_file.scraped_at
+    with open(cache_path, "r", encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            # Country/role/scrape time come from the file itself, not from the cache
+            rec["country"] = raw_file.country
+            rec["role_id"] = raw_file.role_id
+            rec["source_file"] = raw_file.rel_path
+            rec["scraped_at"] = scraped_at
+            yield rec
+
+
+def _iter_parsed(raw_file: RawFile, manifest: RawManifest) -> Iterator[Dict[str, Any]]:
+    sha = file_sha256(raw_file.path)
+    cache_path = manifest.cache_path(sha)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+
+    n = 0
+    scraped_at = raw_file.scraped_at
+    with open(tmp, "w", encoding="utf-8") as out:
+        for obj in iter_json_items(raw_file.path):
+            rec = normalize_raw_job(obj, raw_file, scraped_at)
+            out.write(json.dumps(rec, ensure_ascii=False, default=str))
+            out.write("\n")
+            n += 1
+            yield rec
+
+    tmp.replace(cache_path)
+    manifest.record(raw_file, sha, n)
+
+
+# -----------------------------
+# PUBLIC API
+# -----------------------------
+def iter_raw_jobs(
+    raw_dir: Path = RAW_DIR,
+    countries: Optional[Iterable[str]] = None,
+    role_ids: Optional[Iterable[str]] = None,
+    changed_only: bool = False,
+    use_cache: bool = True,
+    manifest_path: Path = MANIFEST_PATH,
+    cache_dir: Path = CACHE_DIR,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Генератор нормализованных вакансий из data/raw.
+
+    - use_cache=True: неизменённые файлы читаются из кэша, изменённые парсятся
+      заново, манифест сохраняется после полного обхода.
+    - changed_only=True: отдаются только записи из новых/изменённых файлов.
+    """
+    if not use_cache:
+        for raw_file in iter_raw_files(raw_dir, countries, role_ids):
+            if raw_file.path.stat().st_size == 0:
+                continue
+            scraped_at = raw_file.scraped_at
+            for obj in iter_json_items(raw_file.path):
+                yield normalize_raw_job(obj, raw_file, scraped_at)
+        return
+
+    manifest = RawManifest(manifest_path, cache_dir)
+    full_scan = countries is None and role_ids is None
+    seen: List[str] = []
+
+    for raw_file in iter_raw_files(raw_dir, countries, role_ids):
+        seen.append(raw_file.rel_path)
+        if raw_file.path.stat().st_size == 0:
+            continue
+
+        sha = manifest.lookup(raw_file)
+        if sha is not None:
+            if not changed_only:
+                yield from _iter_cached(manifest.cache_path(sha), raw_file)
+            continue
+
+        yield from _iter_parsed(raw_file, manifest)
+
+    if full_scan:
+        manifest.prune(seen)
+    manifest.save()
+
+
+def main() -> None:
+    n_jobs = sum(1 for _ in iter_raw_jobs())
+    n_files = len(RawManifest().entries)
+    print(f"[INFO] Raw manifest: {n_files} files, {n_jobs} jobs → {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
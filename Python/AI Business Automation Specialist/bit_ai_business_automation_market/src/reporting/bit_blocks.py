@@ -4,43 +4,21 @@ from __future__ import annotations
 from pathlib import Path
 import pandas as pd
 
+from src.classification.skill_extractor import SKILL_LABELS
+from src.classification.skill_store import SKILLS_PARQUET
+from src.classification.taxonomy import get_taxonomy
 
+
+# Fallback input when the Parquet skill table is not there
 PIVOT_FILE = Path("data/processed/competency_matrix_pivot_country_role.csv")
 OUT_DIR = Path("data/processed/bit_blocks")
 
-# BIT groups (edit here if you add more skills)
-BIT_GROUPS: dict[str, list[str]] = {
-    "tools_stack": [
-        "skill_n8n",
-        "skill_make",
-        "skill_zapier",
-        "skill_power_automate",
-        "skill_api",
-    ],
-    "hard_skills": [
-        "skill_python",
-        "skill_sql",
-        "skill_llm",
-    ],
-    "compliance_process": [
-        "skill_gdpr",
-        "skill_bpmn",
-    ],
-}
+# BIT groups and their labels come from skill_taxonomy.json ("groups")
+BIT_GROUPS: dict[str, list[str]] = get_taxonomy().bit_groups
+BIT_GROUP_LABELS: dict[str, str] = {**get_taxonomy().group_labels, "other": "Other"}
 
 # Friendly labels for presentation-ready CSVs
-FRIENDLY: dict[str, str] = {
-    "skill_n8n": "n8n",
-    "skill_make": "Make",
-    "skill_zapier": "Zapier",
-    "skill_power_automate": "Power Automate",
-    "skill_api": "API",
-    "skill_python": "Python",
-    "skill_sql": "SQL",
-    "skill_llm": "LLM",
-    "skill_gdpr": "GDPR",
-    "skill_bpmn": "BPMN",
-}
+FRIENDLY: dict[str, str] = dict(SKILL_LABELS)
 
 
 def _require_columns(df: pd.DataFrame, cols: list[str], file_hint: str) -> None:
@@ -85,14 +63,7 @@ def _add_bit_group(long_df: pd.DataFrame) -> pd.DataFrame:
 
     out = long_df.copy()
     out["bit_group"] = out["skill_key"].map(skill_to_group).fillna("other")
-    out["bit_group_label"] = out["bit_group"].map(
-        {
-            "tools_stack": "Tools stack",
-            "hard_skills": "Hard skills",
-            "compliance_process": "Compliance / Process",
-            "other": "Other",
-        }
-    ).fillna(out["bit_group"])
+    out["bit_group_label"] = out["bit_group"].map(BIT_GROUP_LABELS).fillna(out["bit_group"])
     return out
 
 
@@ -137,7 +108,7 @@ def _pivot_for_presentation(
 def _topn_by_country_blocks(country_overall: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
     # Top N per country within each BIT block
     tmp = _add_bit_group(country_overall)
-    tmp = tmp[tmp["bit_group"].isin({"tools_stack", "hard_skills", "compliance_process"})].copy()
+    tmp = tmp[tmp["bit_group"].isin(set(BIT_GROUPS))].copy()
 
     tmp["rank"] = tmp.groupby(["country", "bit_group"])["share"].rank(method="first", ascending=False)
     top = tmp[tmp["rank"] <= top_n].copy()
@@ -146,13 +117,28 @@ def _topn_by_country_blocks(country_overall: pd.DataFrame, top_n: int = 5) -> pd
     return top[["country", "bit_group_label", "skill_label", "share"]]
 
 
-def main() -> None:
+def load_pivot() -> pd.DataFrame:
+    """
+    Share pivot (country, role_id, category x skill_*): built straight from the
+    0/1 skill table, so no JSON or CSV is re-parsed; the CSV written by
+    competency_matrix is read only when the skill table is missing.
+    """
+    if SKILLS_PARQUET.exists():
+        # Imported here: src.reporting imports this module, and a module-level import
+        # would load competency_matrix twice when it runs as `python -m`
+        from src.reporting.competency_matrix import competency_long, competency_pivot, load_skill_matrix
+
+        return competency_pivot(competency_long(*load_skill_matrix()))
+
     if not PIVOT_FILE.exists():
-        raise FileNotFoundError(f"Not found: {PIVOT_FILE}")
+        raise FileNotFoundError(f"Not found: {SKILLS_PARQUET} or {PIVOT_FILE}")
+    return pd.read_csv(PIVOT_FILE)
+
 
+def main() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    pivot = pd.read_csv(PIVOT_FILE)
+    pivot = load_pivot()
     long_country_role = _add_bit_group(_to_long_country_role(pivot))
     country_overall = _country_overall_unweighted(long_country_role)
 
@@ -1,33 +1,23 @@
 import ast
 import json
 from pathlib import Path
+from typing import Tuple
 
+import numpy as np
 import pandas as pd
 
-from src.classification.skills_dictionary import HARD_SKILLS, SOFT_SKILLS, TOOLS
+from src.classification.factorize import factorize
+from src.classification.skill_store import SKILLS_PARQUET, read_skill_table, registry_keys
+from src.classification.taxonomy import get_taxonomy
 
-IN_FILE = Path("data/processed/job_skills_extracted.csv")
+IN_FILE = SKILLS_PARQUET
+# Older extractor output: one JSON skill_flags string per row
+LEGACY_CSV = Path("data/processed/job_skills_extracted.csv")
 OUT_LONG = Path("data/processed/competency_matrix_long.csv")
 OUT_PIVOT = Path("data/processed/competency_matrix_pivot_country_role.csv")
 OUT_TOP = Path("data/processed/competency_top_by_country_role.csv")
 
 
-def _to_set(x) -> set[str]:
-    """Normalize dictionary/list values from skills_dictionary to a set of skill keys."""
-    if x is None:
-        return set()
-    if isinstance(x, (list, tuple, set)):
-        return set(map(str, x))
-    if isinstance(x, dict):
-        return set(map(str, x.keys()))
-    return {str(x)}
-
-
-HARD_SET = _to_set(HARD_SKILLS)
-SOFT_SET = _to_set(SOFT_SKILLS)
-TOOLS_SET = _to_set(TOOLS)
-
-
 def parse_skill_flags(val) -> dict:
     """
     skill_flags can be:
@@ -59,30 +49,80 @@ def parse_skill_flags(val) -> dict:
 
 
 def skill_category(skill_key: str) -> str:
-    TOOLS = {"skill_n8n", "skill_make", "skill_zapier", "skill_power_automate"}
-    HARD  = {"skill_python", "skill_sql", "skill_api", "skill_llm", "skill_gdpr", "skill_bpmn"}
-    SOFT  = set()  # сейчас у тебя soft-пакет не извлекается (позже расширим)
+    """hard / tools / soft from the skill taxonomy; "other" for unknown keys."""
+    return get_taxonomy().category(skill_key)
+
 
-    if skill_key in TOOLS:
-        return "tools"
-    if skill_key in HARD:
-        return "hard"
-    if skill_key in SOFT:
-        return "soft"
-    return "other"
+def _is_active(v) -> bool:
+    try:
+        return int(v) == 1
+    except Exception:
+        return bool(v)
 
 
+def skill_flag_matrix(flags: pd.Series) -> pd.DataFrame:
+    """
+    Wide 0/1 matrix (uint8): one row per job ad, one column per active skill key.
 
-def main():
-    if not IN_FILE.exists():
-        raise FileNotFoundError(f"Input not found: {IN_FILE}")
+    Ads found by several queries share the same skill_flags string, so each
+    distinct value is parsed once and its row is broadcast back by code.
+    """
+    codes, uniques = factorize(flags)
+    active = [
+        [str(k) for k, v in parse_skill_flags(u).items() if _is_active(v)]
+        for u in uniques
+    ]
+
+    keys = list(dict.fromkeys(k for row in active for k in row))
+    col = {k: j for j, k in enumerate(keys)}
+    unique_matrix = np.zeros((len(uniques), len(keys)), dtype=np.uint8)
+    for i, row in enumerate(active):
+        unique_matrix[i, [col[k] for k in row]] = 1
+
+    return pd.DataFrame(
+        unique_matrix[codes],
+        index=flags.index,
+        columns=pd.Index(keys, name="skill_key"),
+    )
+
+
+def skill_mentions(df: pd.DataFrame, matrix: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mentions per (country, role_id, category, skill_key): grouped column sums
+    of the 0/1 matrix, skills without mentions in a group are dropped.
+    """
+    sums = matrix.groupby([df["country"], df["role_id"]]).sum()
+    mentions = sums.stack()
+    mentions = mentions[mentions > 0].astype("int64")
+
+    agg = mentions.rename("mentions").reset_index()
+    categories = {k: skill_category(k) for k in matrix.columns}
+    agg.insert(2, "category", agg["skill_key"].map(categories))
+    return agg.sort_values(["country", "role_id", "category", "skill_key"]).reset_index(drop=True)
+
+
+def load_skill_matrix() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (jobs with country / role_id, job x skill 0/1 matrix).
+    Reads the Parquet skill table; the legacy CSV with JSON skill_flags is parsed only as a fallback.
+    """
+    if IN_FILE.exists():
+        df, registry = read_skill_table(columns=["country", "role_id"])
+        return df[["country", "role_id"]], df[registry_keys(registry)].rename_axis(columns="skill_key")
+
+    if not LEGACY_CSV.exists():
+        raise FileNotFoundError(f"Input not found: {IN_FILE} (or legacy {LEGACY_CSV})")
 
-    df = pd.read_csv(IN_FILE)
+    df = pd.read_csv(LEGACY_CSV)
     needed = {"country", "role_id", "title", "url", "skill_flags"}
     missing = needed - set(df.columns)
     if missing:
-        raise ValueError(f"Missing columns in {IN_FILE}: {sorted(missing)}")
+        raise ValueError(f"Missing columns in {LEGACY_CSV}: {sorted(missing)}")
+    return df[["country", "role_id"]], skill_flag_matrix(df["skill_flags"])
+
 
+def competency_long(df: pd.DataFrame, matrix: pd.DataFrame) -> pd.DataFrame:
+    """Mentions + job_ads denominator + share per (country, role_id, category, skill_key)."""
     # Denominator: how many job ads per (country, role_id)
     denom = (
         df.groupby(["country", "role_id"])
@@ -90,52 +130,20 @@ def main():
         .reset_index(name="job_ads")
     )
 
-    rows = []
-    for _, r in df.iterrows():
-        flags = parse_skill_flags(r.get("skill_flags"))
-        if not flags:
-            continue
-
-        # active skills only
-        for k, v in flags.items():
-            try:
-                active = int(v) == 1
-            except Exception:
-                active = bool(v)
-            if not active:
-                continue
-
-            k = str(k)
-            rows.append(
-                {
-                    "country": r["country"],
-                    "role_id": r["role_id"],
-                    "skill_key": k,
-                    "category": skill_category(k),
-                }
-            )
-
-    long_df = pd.DataFrame(rows)
-    if long_df.empty:
-        print("❌ No active skills found in skill_flags.")
-        return
-
-    # counts per country-role-skill
-    agg = (
-        long_df.groupby(["country", "role_id", "category", "skill_key"])
-        .size()
-        .reset_index(name="mentions")
-    )
+    # job x skill 0/1 matrix -> counts per country-role-skill
+    agg = skill_mentions(df, matrix)
+    if agg.empty:
+        return agg
 
     # add denominator + share
     agg = agg.merge(denom, on=["country", "role_id"], how="left")
     agg["share"] = agg["mentions"] / agg["job_ads"]
+    return agg
 
-    OUT_LONG.parent.mkdir(parents=True, exist_ok=True)
-    agg.to_csv(OUT_LONG, index=False)
 
-    # Pivot matrix (share) for easy pasting to report: per country-role as rows, skills as columns
-    pivot = agg.pivot_table(
+def competency_pivot(agg: pd.DataFrame) -> pd.DataFrame:
+    """Share matrix: (country, role_id, category) rows, skills as columns."""
+    return agg.pivot_table(
         index=["country", "role_id", "category"],
         columns="skill_key",
         values="share",
@@ -143,6 +151,20 @@ def main():
         fill_value=0.0,
     ).reset_index()
 
+
+def main():
+    df, matrix = load_skill_matrix()
+
+    agg = competency_long(df, matrix)
+    if agg.empty:
+        print("❌ No active skills found in the skill table.")
+        return
+
+    OUT_LONG.parent.mkdir(parents=True, exist_ok=True)
+    agg.to_csv(OUT_LONG, index=False)
+
+    # Pivot matrix (share) for easy pasting to report: per country-role as rows, skills as columns
+    pivot = competency_pivot(agg)
     pivot.to_csv(OUT_PIVOT, index=False)
 
     # Top skills per (country, role, category)
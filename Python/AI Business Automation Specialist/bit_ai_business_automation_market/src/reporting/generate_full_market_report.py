@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import datetime
 import pandas as pd
 
+from src.instrumentation import add_profile_arg, enable_profiling, instrumented
+
 # -----------------------------
 # PATH CONFIGURATION
 # -----------------------------
@@ -80,6 +83,7 @@ def build_table_share(df: pd.DataFrame, max_rows: int = 10) -> str:
     return df2.to_markdown(index=False)
 
 
+@instrumented()
 def generate_markdown(summary: pd.DataFrame) -> str:
     today = datetime.date.today().isoformat()
 
@@ -246,6 +250,12 @@ _Auto-generated by BIT Market Analyzer._
 # MAIN
 # -----------------------------
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Full LinkedIn market report (Marp Markdown).")
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
     if not SUMMARY_FILE.exists():
         raise FileNotFoundError(f"Не найден summary файл: {SUMMARY_FILE}")
 
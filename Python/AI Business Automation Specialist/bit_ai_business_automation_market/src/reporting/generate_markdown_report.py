@@ -4,6 +4,7 @@ from typing import List
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from ..instrumentation import instrumented
 from ..reporting.summary_tables import (
     summarize_by_title,
     summarize_by_country_and_title,
@@ -67,6 +68,7 @@ def plot_skill_heatmap(df: pd.DataFrame,
     return out_path
 
 
+@instrumented()
 def generate_markdown_report(df: pd.DataFrame,
                              output_md: Path = Path("docs/03_market_analysis_de_at_ch.md")) -> Path:
     """
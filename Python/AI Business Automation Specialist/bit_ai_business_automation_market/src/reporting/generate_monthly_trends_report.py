@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import datetime as dt
 import pandas as pd
 
+from src.instrumentation import add_profile_arg, enable_profiling, instrumented, measure
+
 
 # -----------------------------
 # PATH RESOLUTION (ROBUST)
@@ -106,6 +109,7 @@ def fmt_table(df: pd.DataFrame, cols: list[str], max_rows: int = 20) -> str:
     return d[cols].to_markdown(index=False)
 
 
+@instrumented()
 def generate_markdown(
     summary: pd.DataFrame,
     figures_rel_dir: str,
@@ -238,6 +242,12 @@ _Auto-generated._
 # MAIN
 # -----------------------------
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Monthly trends report (DACH / country / focus role).")
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
     if not IN_FILE.exists():
         raise FileNotFoundError(f"Не найден файл: {IN_FILE}. Сначала запусти: python -m src.analyze_monthly_trends")
 
@@ -246,12 +256,14 @@ def main() -> None:
     for col in ["total_jobs", "entry_mid_jobs"]:
         df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
 
-    parts = [
-        agg_dach(df),
-        agg_by_country(df),
-        agg_focus_role(df, role_id="junior_automation_specialist"),
-    ]
-    summary = pd.concat(parts, ignore_index=True)
+    with measure("aggregate_monthly_trends", rows_in=len(df)) as m:
+        parts = [
+            agg_dach(df),
+            agg_by_country(df),
+            agg_focus_role(df, role_id="junior_automation_specialist"),
+        ]
+        summary = pd.concat(parts, ignore_index=True)
+        m.rows_out = len(summary)
 
     summary.to_csv(OUT_SUMMARY_CSV, index=False, encoding="utf-8")
     print(f"✅ Saved summary CSV: {OUT_SUMMARY_CSV}")
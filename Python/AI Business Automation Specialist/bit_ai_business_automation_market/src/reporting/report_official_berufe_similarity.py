@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
+import hashlib
 import logging
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-from src.classification.role_matcher import get_embedding, cosine_sim
+from src.classification.role_matcher import (
+    get_embedding,
+    get_embedding_backend,
+    get_embedding_cache,
+    get_embeddings,
+)
+from src.classification.similarity import SimilarityMatrix, cosine_scores
 from src.config import DATA_DIR
+from src.instrumentation import add_profile_arg, enable_profiling, instrumented
 
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -24,7 +32,19 @@ IMG_DIR.mkdir(exist_ok=True)
 
 ROLE_PROFILE_MD = DOCS_DIR / "01_role_profile.md"
 REPORT_MD = DOCS_DIR / "05_similarity_official_berufe.md"
+CATALOG_CSV = DATA_DIR / "processed" / "catalog_official_berufe.csv"
 CATALOG_SCORED_CSV = DATA_DIR / "processed" / "catalog_official_berufe_scored.csv"
+ROLE_PROFILE_JSON = DATA_DIR / "reference" / "role_profile_ai_business_automation.json"
+MAPPING_CSV = DATA_DIR / "reference" / "official_berufe_bit_mapping.csv"
+MARKET_BLOCK_MD = DOCS_DIR / "market_titles_mapping.md"
+
+# Fingerprints of the inputs of the last successful run
+REPORT_STATE_JSON = DATA_DIR / "processed" / "similarity_report_state.json"
+
+COUNTRIES = ["DE", "AT", "CH"]
+GLOBAL_PLOT = IMG_DIR / "top10_official_berufe_similarity.png"
+HEATMAP_PLOT = IMG_DIR / "heatmap_official_berufe_de_at_ch.png"
+COUNTRY_PLOTS = {c: IMG_DIR / f"top10_official_berufe_{c.lower()}.png" for c in COUNTRIES}
 
 
 def _fallback_role_text() -> str:
@@ -45,7 +65,7 @@ def load_role_profile_vector() -> np.ndarray:
     """
     text = ""
 
-    json_path = DATA_DIR / "reference" / "role_profile_ai_business_automation.json"
+    json_path = ROLE_PROFILE_JSON
     if json_path.exists():
         try:
             with open(json_path, "r", encoding="utf-8") as f:
@@ -77,7 +97,7 @@ def load_role_profile_vector() -> np.ndarray:
 
 
 def load_official_catalog() -> pd.DataFrame:
-    path = DATA_DIR / "processed" / "catalog_official_berufe.csv"
+    path = CATALOG_CSV
 
     df = pd.read_csv(
         path,
@@ -104,7 +124,7 @@ def load_official_catalog() -> pd.DataFrame:
 
 # ----- Mapping offizieller Beruf → BIT-Rolle -----
 def load_bit_mapping() -> pd.DataFrame:
-    path = DATA_DIR / "reference" / "official_berufe_bit_mapping.csv"
+    path = MAPPING_CSV
     if not path.exists():
         logger.warning(f"[WARN] Mapping-Datei nicht gefunden: {path}")
         return pd.DataFrame()
@@ -131,6 +151,17 @@ def load_bit_mapping() -> pd.DataFrame:
 
 
 # ----- Similarity-Berechnung -----
+def _catalog_texts(df: pd.DataFrame) -> List[str]:
+    """official_title + notes (если есть) — текст для эмбеддинга строки каталога."""
+    title_col = "official_title"
+    notes_col = "notes" if "notes" in df.columns else None
+
+    if notes_col:
+        return (df[title_col].fillna("") + " " + df[notes_col].fillna("")).tolist()
+    return df[title_col].fillna("").tolist()
+
+
+@instrumented()
 def compute_similarity(df: pd.DataFrame, role_vec: np.ndarray) -> pd.DataFrame:
     """
     Считаем похожесть official_berufe на профиль роли.
@@ -141,18 +172,18 @@ def compute_similarity(df: pd.DataFrame, role_vec: np.ndarray) -> pd.DataFrame:
             f"DataFrame does not contain 'official_title' column. Columns: {df.columns}"
         )
 
-    title_col = "official_title"
-    notes_col = "notes" if "notes" in df.columns else None
-
-    if notes_col:
-        texts: List[str] = (
-            df[title_col].fillna("") + " " + df[notes_col].fillna("")
-        ).tolist()
-    else:
-        texts = df[title_col].fillna("").tolist()
-
-    emb_list = [get_embedding(t) for t in texts]
-    emb_arr = np.vstack(emb_list).astype(float)
+    texts = _catalog_texts(df)
+    emb_arr = get_embeddings(texts).astype(float)
+
+    cache = get_embedding_cache()
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(
+            "[DEBUG] embedding cache: hits=%d misses=%d hit_rate=%.1f%%",
+            stats["hits"],
+            stats["misses"],
+            100.0 * stats["hit_rate"],
+        )
 
     norms = np.linalg.norm(emb_arr, axis=1)
     logger.info(
@@ -161,9 +192,9 @@ def compute_similarity(df: pd.DataFrame, role_vec: np.ndarray) -> pd.DataFrame:
         float(norms.max()),
     )
 
-    sims = [cosine_sim(role_vec, v) for v in emb_arr]
+    sims = cosine_scores(role_vec, emb_arr)
     df_out = df.copy()
-    df_out["similarity"] = sims
+    df_out["similarity"] = sims.astype(float)
 
     logger.info(
         "[DEBUG] similarity stats: min=%.6f max=%.6f",
@@ -173,7 +204,47 @@ def compute_similarity(df: pd.DataFrame, role_vec: np.ndarray) -> pd.DataFrame:
     return df_out
 
 
+def compute_similarity_many(
+    df: pd.DataFrame,
+    role_vecs: Dict[str, np.ndarray],
+    top_k: int = 10,
+) -> pd.DataFrame:
+    """
+    Несколько профилей ролей против каталога за один matmul.
+    Возвращает long-таблицу top-k по каждой (роль, страна):
+    role, country, rank, official_title, source, kldb_code, similarity.
+    """
+    if "official_title" not in df.columns:
+        raise ValueError(
+            f"DataFrame does not contain 'official_title' column. Columns: {df.columns}"
+        )
+
+    names = list(role_vecs)
+    queries = np.vstack([np.asarray(role_vecs[n], dtype="float32").ravel() for n in names])
+    index = SimilarityMatrix(get_embeddings(_catalog_texts(df)), groups=df["country"].tolist())
+
+    rows: List[Dict[str, Any]] = []
+    for country, (idx, scores) in index.top_k_by_group(queries, k=top_k).items():
+        for qi, name in enumerate(names):
+            for rank, (pos, score) in enumerate(zip(idx[qi], scores[qi]), start=1):
+                rec = df.iloc[int(pos)]
+                rows.append(
+                    {
+                        "role": name,
+                        "country": country,
+                        "rank": rank,
+                        "official_title": rec["official_title"],
+                        "source": rec.get("source", ""),
+                        "kldb_code": rec.get("kldb_code", ""),
+                        "similarity": float(score),
+                    }
+                )
+    return pd.DataFrame(rows)
+
+
 def plot_top10_by_country(df: pd.DataFrame, country: str, output_path: Path) -> None:
+    import matplotlib.pyplot as plt
+
     subset = (
         df[df["country"] == country]
         .sort_values("similarity", ascending=False)
@@ -203,6 +274,7 @@ def plot_top10_global(df: pd.DataFrame, output_path: Path) -> None:
     Глобальный Top-10 список официальных профессий по similarity к роли
     (без разделения по странам).
     """
+    import matplotlib.pyplot as plt
 
     if "official_title" not in df.columns or "similarity" not in df.columns:
         logger.warning("[WARN] Für globalen Top-10-Plot fehlen Spalten.")
@@ -244,6 +316,7 @@ def plot_heatmap(df: pd.DataFrame, output_path: Path) -> None:
     - Общий colorbar справа показывает шкалу Cosine Similarity.
     - В каждой ячейке подписано числовое значение (0.xx).
     """
+    import matplotlib.pyplot as plt
 
     countries = ["DE", "AT", "CH"]
     cmaps = {"DE": "Blues", "AT": "Reds", "CH": "Greens"}
@@ -348,26 +421,110 @@ def plot_heatmap(df: pd.DataFrame, output_path: Path) -> None:
     logger.info(f"[INFO] Saved heatmap → {output_path}")
 
 
-def generate_similarity_report() -> str:
-    role_vec = load_role_profile_vector()
-    df = load_official_catalog()
-    df_sim = compute_similarity(df, role_vec)
-
-    # CSV
-    CATALOG_SCORED_CSV.parent.mkdir(parents=True, exist_ok=True)
-    df_sim.to_csv(CATALOG_SCORED_CSV, index=False)
-    logger.info(f"[OK] catalog_official_berufe_scored.csv gespeichert: {CATALOG_SCORED_CSV}")
-    plot_top10_global(
-        df_sim,
-        IMG_DIR / "top10_official_berufe_similarity.png",
+# ----- Incremental regeneration -----
+def file_fingerprint(path: Path) -> Optional[str]:
+    """sha256 содержимого файла (None, если файла нет)."""
+    if not path.exists():
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def input_fingerprints() -> Dict[str, Optional[str]]:
+    """Отпечатки всех входов отчёта (без чтения каталога в pandas)."""
+    return {
+        "catalog": file_fingerprint(CATALOG_CSV),
+        "role_profile": file_fingerprint(ROLE_PROFILE_JSON),
+        "mapping": file_fingerprint(MAPPING_CSV),
+        "market_block": file_fingerprint(MARKET_BLOCK_MD),
+        "model": get_embedding_backend().name,
+    }
+
+
+def country_fingerprints(df: pd.DataFrame) -> Dict[str, str]:
+    """Отпечаток строк каталога по каждой стране."""
+    cols = ["country", "source", "official_title", "kldb_code", "notes"]
+    out = {}
+    for country, sub in df.groupby("country", sort=True):
+        payload = sub[cols].to_csv(index=False, sep=";").encode("utf-8")
+        out[str(country)] = hashlib.sha256(payload).hexdigest()
+    return out
+
+
+def load_report_state() -> Dict[str, Any]:
+    if not REPORT_STATE_JSON.exists():
+        return {}
+    try:
+        return json.loads(REPORT_STATE_JSON.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"[WARN] Report-State nicht lesbar ({REPORT_STATE_JSON}): {e}")
+        return {}
+
+
+def save_report_state(inputs: Dict[str, Optional[str]], countries: Dict[str, str]) -> None:
+    REPORT_STATE_JSON.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_STATE_JSON.write_text(
+        json.dumps({"inputs": inputs, "countries": countries}, indent=2),
+        encoding="utf-8",
     )
 
-    plot_top10_by_country(df_sim, "DE", IMG_DIR / "top10_official_berufe_de.png")
-    plot_top10_by_country(df_sim, "AT", IMG_DIR / "top10_official_berufe_at.png")
-    plot_top10_by_country(df_sim, "CH", IMG_DIR / "top10_official_berufe_ch.png")
-    plot_heatmap(df_sim, IMG_DIR / "heatmap_official_berufe_de_at_ch.png")
 
-    # Markdown
+def load_scored_catalog() -> pd.DataFrame:
+    df = pd.read_csv(CATALOG_SCORED_CSV, dtype=str).fillna("")
+    df["similarity"] = df["similarity"].astype(float)
+    return df
+
+
+def score_catalog_incremental(
+    df: pd.DataFrame,
+    countries: Dict[str, str],
+    state: Dict[str, Any],
+    full: bool,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Similarity для каталога. Страны, чьи строки не изменились с прошлого
+    прогона, берут скоры из catalog_official_berufe_scored.csv.
+    Возвращает (df_sim, изменённые страны): пересчитанные и удалённые из каталога
+    (строки удалённых в df_sim не попадают).
+    """
+    old_countries = state.get("countries", {})
+    if not full and CATALOG_SCORED_CSV.exists():
+        changed = [c for c, h in countries.items() if old_countries.get(c) != h]
+        changed += sorted(c for c in old_countries if c not in countries)
+    else:
+        changed = list(countries)
+
+    if not changed:
+        return load_scored_catalog(), []
+
+    recompute = [c for c in changed if c in countries]
+    if len(recompute) == len(countries):
+        return compute_similarity(df, load_role_profile_vector()), changed
+
+    role_vec = load_role_profile_vector() if recompute else None
+
+    old = load_scored_catalog()
+    df_sim = df.copy()
+    df_sim["similarity"] = 0.0
+    for country in countries:
+        mask = (df_sim["country"] == country).to_numpy()
+        if country in recompute:
+            df_sim.loc[mask, "similarity"] = compute_similarity(df[mask], role_vec)["similarity"].to_numpy()
+        else:
+            df_sim.loc[mask, "similarity"] = old.loc[old["country"] == country, "similarity"].to_numpy()
+    if recompute:
+        logger.info(f"[INFO] Similarity neu berechnet für: {', '.join(recompute)}")
+    removed = [c for c in changed if c not in countries]
+    if removed:
+        logger.info(f"[INFO] Aus dem Katalog entfernt: {', '.join(removed)}")
+    return df_sim, changed
+
+
+def build_report_markdown(df_sim: pd.DataFrame) -> str:
+    """Markdown-отчёт: топ-10 по странам, mapping → BIT Role Level, market-блок."""
     lines: List[str] = []
     lines.append("# Top-10 offizielle Berufe – Nähe zur Rolle AI Business Automation Specialist\n")
     lines.append("![Top-10 offizielle Berufe](img/top10_official_berufe_similarity.png)\n")
@@ -455,20 +612,87 @@ def generate_similarity_report() -> str:
                 lines.append(table.to_markdown(index=False))
                 lines.append("")
 
-    market_block = DOCS_DIR / "market_titles_mapping.md"
+    market_block = MARKET_BLOCK_MD
     if market_block.exists():
         lines.append("\n## Market-Titles (DE/EN) – Zuordnung zu Top-Berufen\n")
         lines.append(market_block.read_text(encoding="utf-8"))
 
     md = "\n".join(lines)
+    return md
+
+
+@instrumented()
+def generate_similarity_report(force: bool = False) -> str:
+    """
+    Инкрементальная генерация отчёта:
+
+    - входы не менялись и все выходы на месте -> ничего не делаем;
+    - изменились только mapping / market-блок -> только Markdown;
+    - изменились строки каталога отдельных стран -> пересчёт только этих стран
+      (+ их графики, глобальный график и heatmap);
+    - изменились профиль роли или модель эмбеддингов -> полный пересчёт.
+    """
+    inputs = input_fingerprints()
+    state = load_report_state()
+    old_inputs = state.get("inputs", {})
+
+    # Country plots are expected only for countries of the last run (a removed country has none)
+    expected = state.get("countries") or COUNTRY_PLOTS
+    plots = [GLOBAL_PLOT, HEATMAP_PLOT, *(p for c, p in COUNTRY_PLOTS.items() if c in expected)]
+    outputs_exist = CATALOG_SCORED_CSV.exists() and REPORT_MD.exists() and all(p.exists() for p in plots)
+
+    if not force and outputs_exist and inputs == old_inputs:
+        logger.info("[INFO] Inputs unverändert – Similarity-Report ist aktuell.")
+        return REPORT_MD.read_text(encoding="utf-8")
+
+    df = load_official_catalog()
+    countries = country_fingerprints(df)
+
+    full = (
+        force
+        or inputs["role_profile"] != old_inputs.get("role_profile")
+        or inputs["model"] != old_inputs.get("model")
+    )
+    df_sim, changed = score_catalog_incremental(df, countries, state, full)
+
+    if changed:
+        CATALOG_SCORED_CSV.parent.mkdir(parents=True, exist_ok=True)
+        df_sim.to_csv(CATALOG_SCORED_CSV, index=False)
+        logger.info(f"[OK] catalog_official_berufe_scored.csv gespeichert: {CATALOG_SCORED_CSV}")
+
+    if changed or not GLOBAL_PLOT.exists():
+        plot_top10_global(df_sim, GLOBAL_PLOT)
+    for country, path in COUNTRY_PLOTS.items():
+        if country not in countries:
+            # Country dropped from the catalog: its old plot must not survive
+            if path.exists():
+                path.unlink()
+                logger.info(f"[INFO] Plot entfernt ({country} nicht mehr im Katalog): {path}")
+        elif country in changed or not path.exists():
+            plot_top10_by_country(df_sim, country, path)
+    if changed or not HEATMAP_PLOT.exists():
+        plot_heatmap(df_sim, HEATMAP_PLOT)
+
+    md = build_report_markdown(df_sim)
     REPORT_MD.write_text(md, encoding="utf-8")
     logger.info(f"[OK] Markdown-Report aktualisiert: {REPORT_MD}")
 
+    save_report_state(inputs, countries)
     return md
 
 
 def main() -> None:
-    generate_similarity_report()
+    parser = argparse.ArgumentParser(description="Similarity-Report: offizielle Berufe vs. Rollenprofil.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Alles neu berechnen, auch wenn sich die Eingaben nicht geändert haben.",
+    )
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+    generate_similarity_report(force=args.force)
 
 
 if __name__ == "__main__":
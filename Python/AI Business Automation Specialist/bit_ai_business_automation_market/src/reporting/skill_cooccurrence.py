@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+skill_cooccurrence.py
+
+Совместная встречаемость скиллов в вакансиях (по странам / ролям).
+
+1) Разреженная матрица X (вакансия x скилл, scipy.sparse CSR) строится
+   прямо из uint8-колонок job_skills_extracted.parquet (skill_store),
+   по колонкам — без плотной матрицы на все скиллы сразу.
+2) Для каждой группы (country / role_id / обе / весь DACH) одно
+   произведение C = Xᵀ X даёт все попарные счётчики; диагональ — поддержка скилла.
+3) Метрики по ненулевым парам (векторно):
+       lift = C_ab * n / (c_a * c_b)
+       pmi  = ln(lift)
+       npmi = pmi / -ln(C_ab / n)          (от -1 до 1)
+4) top_k(skill) — лучшие со-скиллы по lift / pmi / npmi / count.
+
+Выход:
+    data/processed/skill_cooccurrence_pairs.csv   все пары с count >= --min-count
+    data/processed/skill_co_skills_top.csv         top-k со-скиллов для каждого скилла
+
+Использование:
+    python -m src.reporting.skill_cooccurrence                   # по странам
+    python -m src.reporting.skill_cooccurrence --by country role_id --min-count 5 --top-k 10
+    python -m src.reporting.skill_cooccurrence --by              # весь DACH одной группой
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+
+from src.classification.skill_store import (
+    SKILLS_PARQUET,
+    SKILLS_REGISTRY,
+    read_registry,
+    registry_keys,
+    registry_labels,
+)
+from src.config import PROCESSED_DIR
+from src.instrumentation import add_profile_arg, enable_profiling, measure
+
+
+OUT_PAIRS = PROCESSED_DIR / "skill_cooccurrence_pairs.csv"
+OUT_TOP = PROCESSED_DIR / "skill_co_skills_top.csv"
+
+METRICS = ["lift", "pmi", "npmi", "count"]
+
+# Skill columns read from Parquet at once (bounds the dense temporary)
+COLUMN_BATCH = 256
+
+
+def skill_csr(
+    path: Path = SKILLS_PARQUET,
+    registry_path: Path = SKILLS_REGISTRY,
+    meta_columns: Sequence[str] = ("country", "role_id"),
+) -> Tuple[pd.DataFrame, sp.csr_matrix, List[str], Dict[str, str]]:
+    """
+    (meta, X, skill keys, labels): X — разреженная 0/1 матрица (вакансия x скилл, int32)
+    в порядке реестра. Колонки читаются пачками по COLUMN_BATCH.
+    """
+    registry = read_registry(registry_path)
+    keys = registry_keys(registry)
+    pf = pq.ParquetFile(path)
+    meta = pf.read(columns=list(meta_columns)).to_pandas()
+    n = len(meta)
+
+    rows: List[np.ndarray] = []
+    cols: List[np.ndarray] = []
+    for start in range(0, len(keys), COLUMN_BATCH):
+        batch = keys[start:start + COLUMN_BATCH]
+        dense = pf.read(columns=batch).to_pandas().to_numpy(dtype=np.uint8)
+        r, c = np.nonzero(dense)
+        rows.append(r)
+        cols.append(c + start)
+
+    r = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    c = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    X = sp.csr_matrix((np.ones(len(r), dtype=np.int32), (r, c)), shape=(n, len(keys)))
+    return meta, X, keys, registry_labels(registry)
+
+
+class SkillCooccurrence:
+    """
+    Co-occurrence of skills within one set of job ads.
+
+    - counts:  sparse (k x k) Xᵀ X; counts[a, b] = ads mentioning both a and b,
+               the diagonal is the support of each skill;
+    - pairs(): every pair a < b with count >= min_count and its lift / PMI / NPMI;
+    - top_k(): best co-skills of one skill by a metric.
+    """
+
+    def __init__(self, X: sp.spmatrix, skills: Sequence[str]):
+        X = sp.csr_matrix(X, dtype=np.int32)
+        if X.shape[1] != len(skills):
+            raise ValueError("X must have one column per skill")
+        self.skills = list(skills)
+        self._pos = {s: i for i, s in enumerate(self.skills)}
+        self.n = X.shape[0]
+        self.counts = (X.T @ X).tocsr()
+        self.support = self.counts.diagonal().astype(np.int64)
+
+    def _metrics(self, a: np.ndarray, b: np.ndarray, count: np.ndarray) -> Dict[str, np.ndarray]:
+        count = count.astype(np.float64)
+        expected = self.support[a].astype(np.float64) * self.support[b] / self.n
+        lift = count / expected
+        pmi = np.log(lift)
+        p_ab = count / self.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # p_ab == 1 (both skills in every ad): perfectly associated
+            npmi = np.where(p_ab < 1.0, pmi / -np.log(p_ab), 1.0)
+        return {"lift": lift, "pmi": pmi, "npmi": npmi}
+
+    def pairs(self, min_count: int = 1) -> pd.DataFrame:
+        """All pairs a < b with at least min_count common ads."""
+        upper = sp.triu(self.counts, k=1).tocoo()
+        keep = upper.data >= max(min_count, 1)
+        a, b, count = upper.row[keep], upper.col[keep], upper.data[keep].astype(np.int64)
+
+        skills = np.asarray(self.skills, dtype=object)
+        out = pd.DataFrame({
+            "skill_a": skills[a],
+            "skill_b": skills[b],
+            "count": count,
+            "support_a": self.support[a],
+            "support_b": self.support[b],
+            "job_ads": self.n,
+            **self._metrics(a, b, count),
+        })
+        return out.sort_values(["lift", "count"], ascending=[False, False]).reset_index(drop=True)
+
+    def top_k(self, skill: str, k: int = 10, metric: str = "lift", min_count: int = 1) -> pd.DataFrame:
+        """Top-k co-skills of `skill` (sparse row of counts, no loop over skill pairs)."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}. Use one of {METRICS}")
+        a = self._pos[skill]
+        row = self.counts.getrow(a)
+        b, count = row.indices, row.data.astype(np.int64)
+        keep = (b != a) & (count >= max(min_count, 1))
+        b, count = b[keep], count[keep]
+
+        values = self._metrics(np.full(len(b), a), b, count)
+        values["count"] = count.astype(np.float64)
+        score = values[metric]
+
+        k = min(k, len(b))
+        if k == 0:
+            return pd.DataFrame(columns=["skill", "co_skill", "count", "lift", "pmi", "npmi"])
+        best = np.argpartition(-score, k - 1)[:k] if k < len(b) else np.arange(len(b))
+        best = best[np.lexsort((-count[best], -score[best]))]
+
+        return pd.DataFrame({
+            "skill": skill,
+            "co_skill": [self.skills[j] for j in b[best]],
+            "count": count[best],
+            "lift": values["lift"][best],
+            "pmi": values["pmi"][best],
+            "npmi": values["npmi"][best],
+        })
+
+    def top_k_all(self, k: int = 10, metric: str = "lift", min_count: int = 1) -> pd.DataFrame:
+        frames = [self.top_k(s, k, metric, min_count) for s, sup in zip(self.skills, self.support) if sup > 0]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=["skill", "co_skill", "count", "lift", "pmi", "npmi"])
+        return pd.concat(frames, ignore_index=True)
+
+
+def cooccurrence_by_group(
+    meta: pd.DataFrame,
+    X: sp.csr_matrix,
+    skills: Sequence[str],
+    by: Sequence[str] = ("country",),
+) -> Dict[Tuple, SkillCooccurrence]:
+    """{group key: SkillCooccurrence} — one Xᵀ X per group (rows sliced from the CSR matrix)."""
+    by = list(by)
+    if not by:
+        return {(): SkillCooccurrence(X, skills)}
+
+    out: Dict[Tuple, SkillCooccurrence] = {}
+    for key, idx in meta.groupby(by, sort=True).indices.items():
+        key = key if isinstance(key, tuple) else (key,)
+        out[key] = SkillCooccurrence(X[idx], skills)
+    return out
+
+
+def _with_group(df: pd.DataFrame, by: Sequence[str], key: Tuple) -> pd.DataFrame:
+    for i, (col, val) in enumerate(zip(by, key)):
+        df.insert(i, col, val)
+    return df
+
+
+def build_tables(
+    meta: pd.DataFrame,
+    X: sp.csr_matrix,
+    skills: Sequence[str],
+    labels: Optional[Dict[str, str]] = None,
+    by: Sequence[str] = ("country",),
+    min_count: int = 1,
+    top_k: int = 10,
+    metric: str = "lift",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(pairs, top co-skills) for every group, with skill labels."""
+    labels = labels or {}
+    pairs, tops = [], []
+    for key, co in cooccurrence_by_group(meta, X, skills, by).items():
+        pairs.append(_with_group(co.pairs(min_count), by, key))
+        tops.append(_with_group(co.top_k_all(top_k, metric, min_count), by, key))
+
+    pairs_df = pd.concat(pairs, ignore_index=True)
+    top_df = pd.concat(tops, ignore_index=True)
+    for df, cols in ((pairs_df, ["skill_a", "skill_b"]), (top_df, ["skill", "co_skill"])):
+        for col in cols:
+            df[f"{col}_label"] = df[col].map(labels).fillna(df[col])
+    return pairs_df, top_df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Skill co-occurrence, lift and PMI per country / role.")
+    parser.add_argument(
+        "--by",
+        nargs="*",
+        default=["country"],
+        choices=["country", "role_id"],
+        help="Group columns (default: country). Pass --by with no value for one DACH-wide group.",
+    )
+    parser.add_argument("--min-count", type=int, default=3, help="Minimum number of common ads per pair (default: 3).")
+    parser.add_argument("--top-k", type=int, default=10, help="Co-skills per skill in the top table (default: 10).")
+    parser.add_argument("--metric", choices=METRICS, default="lift", help="Ranking metric for the top table.")
+    add_profile_arg(parser)
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
+    if not SKILLS_PARQUET.exists():
+        raise FileNotFoundError(
+            f"Input not found: {SKILLS_PARQUET} (run python -m src.classification.extract_skills_from_raw)"
+        )
+
+    meta, X, skills, labels = skill_csr()
+    print(f"[INFO] Job x skill matrix: {X.shape[0]} ads x {X.shape[1]} skills, {X.nnz} mentions")
+
+    with measure("skill_cooccurrence", rows_in=X.shape[0]) as m:
+        pairs, top = build_tables(
+            meta, X, skills, labels,
+            by=args.by, min_count=args.min_count, top_k=args.top_k, metric=args.metric,
+        )
+        m.rows_out = len(pairs)
+
+    OUT_PAIRS.parent.mkdir(parents=True, exist_ok=True)
+    pairs.to_csv(OUT_PAIRS, index=False)
+    top.to_csv(OUT_TOP, index=False)
+
+    print(f"✅ Saved:\n - {OUT_PAIRS} ({len(pairs):,} pairs)\n - {OUT_TOP} ({len(top):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+run.py
+
+Оркестратор пайплайна bit_ai: стадии (скрипты), их входы и выходы в data/.
+
+1) Граф стадий строится по файлам: стадия зависит от тех, чьи outputs
+   входят в её inputs (плюс явные `after`).
+2) Стадия пропускается, если sha256 её входов и выходов совпадает с прошлым
+   успешным запуском (data/processed/run_state.json). Код стадии — модуль и все
+   модули src.*, которые он импортирует (транзитивно), тоже входит в хеш входов.
+   Хеши файлов кешируются по (size, mtime_ns) — неизменённые файлы не перечитываются.
+   outputs могут быть glob-шаблонами (jobs_[A-Z][A-Z]_*.csv); side_outputs —
+   общее изменяемое состояние (dedup_index.sqlite): не хешируется, но стадия
+   устарела, если его нет на диске. rolling_window — окно "последние 6 месяцев"
+   считается от текущей даты, поэтому дата запуска (UTC) тоже входит в хеш входов:
+   такая стадия пересчитывается раз в день даже на неизменённом data/raw.
+3) Независимые стадии (например, все plot_*) запускаются параллельно
+   отдельными процессами (python -m <module>), лог каждой — в data/processed/run_logs/.
+4) В конце печатается время каждой стадии; замеры стадий и их шагов
+   (src.instrumentation) пишутся в data/processed/run_log.jsonl с общим run_id.
+   --profile — cProfile-дампы шагов каждой стадии в data/processed/profiles/.
+
+Использование:
+    python -m src.run                          # всё, что устарело
+    python -m src.run --dry-run                # только план
+    python -m src.run --force --jobs 4         # пересчитать всё, до 4 стадий параллельно
+    python -m src.run --only competency_matrix bit_blocks
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.config import BASE_DIR, PROCESSED_DIR
+from src.instrumentation import RUN_ID, write_record
+
+
+RUN_STATE_PATH = PROCESSED_DIR / "run_state.json"
+RUN_LOG_DIR = PROCESSED_DIR / "run_logs"
+
+# Bump when the state layout changes
+STATE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    module: str
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    args: Tuple[str, ...] = ()
+    # Written by the stage but shared with other stages (not hashed, only required to exist)
+    side_outputs: Tuple[str, ...] = ()
+    # Filters on a window relative to today (e.g. last 6 months): stale on a new day
+    rolling_window: bool = False
+
+    @property
+    def source(self) -> str:
+        """Файл модуля стадии (изменение кода тоже делает стадию устаревшей)."""
+        return self.module.replace(".", "/") + ".py"
+
+
+PROC = "data/processed"
+TAXONOMY = "src/classification/skill_taxonomy.json"
+# first_seen / last_seen of ads, updated by every raw reader
+DEDUP_INDEX = f"{PROC}/dedup_index.sqlite"
+
+STAGES: List[Stage] = [
+    # Warms data/processed/raw_cache once, so the raw readers below do not race on it
+    Stage("raw_cache", "src.parsing.raw_jobs_stream",
+          inputs=("data/raw",),
+          outputs=(f"{PROC}/raw_manifest.json",)),
+    Stage("linkedin_jobs", "src.analyze_linkedin_jobs",
+          inputs=("data/raw",),
+          outputs=(f"{PROC}/summary_linkedin_market.csv",
+                   f"{PROC}/seniority_rule_hits_linkedin.csv",
+                   f"{PROC}/jobs_[A-Z][A-Z]_*.csv"),
+          after=("raw_cache",),
+          side_outputs=(DEDUP_INDEX,),
+          rolling_window=True),
+    Stage("monthly_trends", "src.analyze_monthly_trends",
+          inputs=("data/raw",),
+          outputs=(f"{PROC}/monthly_total_vs_entry.csv",
+                   f"{PROC}/jobs_all_with_dates_deduped_6m.csv",
+                   f"{PROC}/seniority_rule_hits_monthly.csv",
+                   f"{PROC}/jobs"),
+          after=("raw_cache",),
+          side_outputs=(DEDUP_INDEX,),
+          rolling_window=True),
+    Stage("extract_skills", "src.classification.extract_skills_from_raw",
+          inputs=("data/raw", TAXONOMY),
+          outputs=(f"{PROC}/job_skills_extracted.parquet", f"{PROC}/job_skills_registry.json"),
+          after=("raw_cache",),
+          side_outputs=(DEDUP_INDEX,)),
+    Stage("competency_matrix", "src.reporting.competency_matrix",
+          inputs=(f"{PROC}/job_skills_extracted.parquet", f"{PROC}/job_skills_registry.json", TAXONOMY),
+          outputs=(f"{PROC}/competency_matrix_long.csv",
+                   f"{PROC}/competency_matrix_pivot_country_role.csv",
+                   f"{PROC}/competency_top_by_country_role.csv")),
+    Stage("skill_cooccurrence", "src.reporting.skill_cooccurrence",
+          inputs=(f"{PROC}/job_skills_extracted.parquet", f"{PROC}/job_skills_registry.json"),
+          outputs=(f"{PROC}/skill_cooccurrence_pairs.csv", f"{PROC}/skill_co_skills_top.csv")),
+    Stage("bit_blocks", "src.reporting.bit_blocks",
+          inputs=(f"{PROC}/job_skills_extracted.parquet", f"{PROC}/job_skills_registry.json", TAXONOMY),
+          outputs=(f"{PROC}/bit_blocks",)),
+    Stage("monthly_trends_report", "src.reporting.generate_monthly_trends_report",
+          inputs=(f"{PROC}/monthly_total_vs_entry.csv",),
+          outputs=(f"{PROC}/monthly_trends_summary.csv", "reports/bit_dach_ai_automation_monthly_trends_report.md")),
+    Stage("full_market_report", "src.reporting.generate_full_market_report",
+          inputs=(f"{PROC}/summary_linkedin_market.csv",),
+          outputs=("reports/bit_dach_ai_automation_market_report.md",)),
+    Stage("plot_linkedin_market", "src.visualization.plot_linkedin_market",
+          inputs=(f"{PROC}/summary_linkedin_market.csv",),
+          outputs=(f"{PROC}/figures/total_jobs_by_role_country.png",
+                   f"{PROC}/figures/entry_jobs_by_role_country.png",
+                   f"{PROC}/figures/entry_share_by_role_country.png")),
+    Stage("plot_junior_automation_specialist", "src.visualization.plot_junior_automation_specialist",
+          inputs=(f"{PROC}/summary_linkedin_market.csv",),
+          outputs=(f"{PROC}/figures/junior_automation_specialist",)),
+    Stage("plot_monthly_trends", "src.visualization.plot_monthly_trends",
+          inputs=(f"{PROC}/monthly_total_vs_entry.csv",),
+          outputs=(f"{PROC}/figures/monthly_trends",)),
+    Stage("plot_monthly_trends_master", "src.visualization.plot_monthly_trends_master",
+          inputs=(f"{PROC}/monthly_total_vs_entry.csv",),
+          outputs=(f"{PROC}/figures/monthly_trends_master",)),
+    Stage("plot_competency_bars", "src.visualization.plot_competency_bars",
+          inputs=(f"{PROC}/competency_matrix_long.csv",),
+          outputs=(f"{PROC}/figures/competency_top_overall_bar.png",
+                   f"{PROC}/figures/competency_top_[A-Z][A-Z]_bar.png")),
+]
+
+
+# -----------------------------
+# HASHING
+# -----------------------------
+def _is_glob(rel: str) -> bool:
+    return any(ch in rel for ch in "*?[")
+
+
+def _module_file(module: str, root: Path) -> Optional[Path]:
+    base = root / module.replace(".", "/")
+    for path in (base.with_suffix(".py"), base / "__init__.py"):
+        if path.is_file():
+            return path
+    return None
+
+
+def _imported_modules(path: Path, package: str) -> Set[str]:
+    """src.* modules imported by one file (absolute and relative imports, incl. submodules)."""
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+    found: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split(".")[: len(package.split(".")) - node.level + 1]
+                base = ".".join(parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            found.add(base)
+            # "from src.x import y" may import the submodule src.x.y
+            found.update(f"{base}.{a.name}" for a in node.names)
+    return {m for m in found if m == "src" or m.startswith("src.")}
+
+
+def module_sources(module: str, root: Path = BASE_DIR) -> List[str]:
+    """
+    Файлы кода модуля и всех модулей src.*, которые он импортирует (транзитивно),
+    вместе с __init__.py их пакетов — относительно root.
+    """
+    seen: Set[Path] = set()
+    stack = [module]
+    visited: Set[str] = set()
+    while stack:
+        name = stack.pop()
+        if name in visited:
+            continue
+        visited.add(name)
+        # Parent packages run their __init__.py on import
+        parts = name.split(".")
+        stack.extend(".".join(parts[:i]) for i in range(1, len(parts)))
+
+        path = _module_file(name, root)
+        if path is None or path in seen:
+            continue
+        seen.add(path)
+        package = name if path.name == "__init__.py" else ".".join(parts[:-1])
+        stack.extend(_imported_modules(path, package))
+    return sorted(p.relative_to(root).as_posix() for p in seen)
+
+
+class FileHasher:
+    """
+    sha256 файлов с кешем по (size, mtime_ns): rel_path -> [size, mtime_ns, sha256].
+    """
+
+    def __init__(self, cache: Optional[Dict[str, list]] = None, root: Path = BASE_DIR):
+        self.cache: Dict[str, list] = cache or {}
+        self.root = root
+
+    def file_hash(self, path: Path) -> str:
+        rel = path.relative_to(self.root).as_posix()
+        stat = path.stat()
+        cached = self.cache.get(rel)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.cache[rel] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def digest(self, rel_paths: Iterable[str]) -> Optional[str]:
+        """
+        Общий хеш набора путей (файлы и каталоги рекурсивно).
+        None, если какого-то пути нет на диске.
+        """
+        h = hashlib.sha256()
+        for rel in sorted(set(rel_paths)):
+            if _is_glob(rel):
+                files = sorted(p for p in self.root.glob(rel) if p.is_file())
+                if not files:
+                    return None
+            else:
+                path = self.root / rel
+                if not path.exists():
+                    return None
+                files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+            for f in files:
+                h.update(f.relative_to(self.root).as_posix().encode("utf-8"))
+                h.update(self.file_hash(f).encode("ascii"))
+        return h.hexdigest()
+
+
+# -----------------------------
+# STATE
+# -----------------------------
+def load_state(path: Path = RUN_STATE_PATH) -> Dict[str, dict]:
+    if not path.exists():
+        return {"version": STATE_VERSION, "stages": {}, "files": {}}
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        state = {}
+    if state.get("version") != STATE_VERSION:
+        return {"version": STATE_VERSION, "stages": {}, "files": {}}
+    return state
+
+
+def save_state(state: Dict[str, dict], path: Path = RUN_STATE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+# -----------------------------
+# GRAPH
+# -----------------------------
+def _covers(output: str, path: str) -> bool:
+    if _is_glob(output):
+        return fnmatch.fnmatchcase(path, output)
+    return path == output or path.startswith(output.rstrip("/") + "/")
+
+
+def build_dependencies(stages: List[Stage]) -> Dict[str, Set[str]]:
+    """stage -> имена стадий, которые должны завершиться раньше."""
+    names = {s.name for s in stages}
+    deps: Dict[str, Set[str]] = {s.name: set() for s in stages}
+    for stage in stages:
+        deps[stage.name].update(a for a in stage.after if a in names)
+        for other in stages:
+            if other.name == stage.name:
+                continue
+            if any(_covers(out, inp) for out in other.outputs for inp in stage.inputs):
+                deps[stage.name].add(other.name)
+    return deps
+
+
+def topological_order(stages: List[Stage], deps: Dict[str, Set[str]]) -> List[str]:
+    order: List[str] = []
+    done: Set[str] = set()
+    pending = [s.name for s in stages]
+    while pending:
+        ready = [n for n in pending if deps[n] <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {pending}")
+        order.extend(ready)
+        done.update(ready)
+        pending = [n for n in pending if n not in done]
+    return order
+
+
+# -----------------------------
+# RUNNER
+# -----------------------------
+class Runner:
+    def __init__(
+        self,
+        stages: List[Stage],
+        force: bool = False,
+        jobs: int = 1,
+        dry_run: bool = False,
+        profile: bool = False,
+    ):
+        self.stages = {s.name: s for s in stages}
+        self.deps = build_dependencies(stages)
+        self.order = topological_order(stages, self.deps)
+        self.force = force
+        self.jobs = max(1, jobs)
+        self.dry_run = dry_run
+
+        self.state = load_state()
+        self.hasher = FileHasher(self.state.get("files", {}))
+        self.results: Dict[str, Tuple[str, float]] = {}
+        self._sources: Dict[str, List[str]] = {}
+
+        # Stage measurements of this invocation share one run id in the run log
+        self.env = {**os.environ, "RUN_ID": RUN_ID}
+        if profile:
+            self.env["INSTRUMENTATION_PROFILE"] = "1"
+
+    def sources(self, stage: Stage) -> List[str]:
+        """Код стадии: модуль и его транзитивные импорты src.* (по одному разбору на запуск)."""
+        if stage.module not in self._sources:
+            self._sources[stage.module] = module_sources(stage.module, BASE_DIR) or [stage.source]
+        return self._sources[stage.module]
+
+    def input_digest(self, stage: Stage) -> Optional[str]:
+        digest = self.hasher.digest((*stage.inputs, *self.sources(stage)))
+        if digest is None or not stage.rolling_window:
+            return digest
+        # The window moves every day: the run date is an input as well
+        today = datetime.now(timezone.utc).date().isoformat()
+        return hashlib.sha256(f"{digest}:{today}".encode("ascii")).hexdigest()
+
+    def is_fresh(self, stage: Stage) -> bool:
+        prev = self.state["stages"].get(stage.name)
+        if self.force or not prev or prev.get("status") != "ok":
+            return False
+        if prev.get("args") != list(stage.args):
+            return False
+        if not all((BASE_DIR / p).exists() for p in stage.side_outputs):
+            return False
+        return (prev.get("inputs") == self.input_digest(stage)
+                and prev.get("outputs") == self.hasher.digest(stage.outputs))
+
+    def _execute(self, stage: Stage) -> Tuple[int, float, Path]:
+        RUN_LOG_DIR.mkdir(parents=True, exist_ok=True)
+        log_path = RUN_LOG_DIR / f"{stage.name}.log"
+        t0 = time.perf_counter()
+        with open(log_path, "w", encoding="utf-8") as log:
+            proc = subprocess.run(
+                [sys.executable, "-m", stage.module, *stage.args],
+                cwd=str(BASE_DIR),
+                env=self.env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        return proc.returncode, time.perf_counter() - t0, log_path
+
+    def _record(self, stage: Stage, inputs: Optional[str], seconds: float) -> None:
+        self.state["stages"][stage.name] = {
+            "status": "ok",
+            "inputs": inputs,
+            "outputs": self.hasher.digest(stage.outputs),
+            "args": list(stage.args),
+            "seconds": round(seconds, 3),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.state["files"] = self.hasher.cache
+        save_state(self.state)
+
+    def plan(self) -> None:
+        """--dry-run: что будет запущено (стадии после устаревших тоже считаются устаревшими)."""
+        stale: Set[str] = set()
+        for name in self.order:
+            stage = self.stages[name]
+            upstream = sorted(self.deps[name] & stale)
+            if upstream:
+                reason = f"run (after {', '.join(upstream)})"
+            elif self.is_fresh(stage):
+                reason = "skip (unchanged)"
+            else:
+                reason = "run"
+            if reason.startswith("run"):
+                stale.add(name)
+            print(f"  {name:<36} {reason}")
+
+    def run(self) -> bool:
+        if self.dry_run:
+            self.plan()
+            return True
+
+        pending = list(self.order)
+        done: Set[str] = set()
+        failed: Set[str] = set()
+        running: Dict[Future, Tuple[Stage, Optional[str]]] = {}
+        t_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                # Dispatch every stage whose dependencies are finished
+                for name in list(pending):
+                    if len(running) >= self.jobs:
+                        break
+                    if self.deps[name] & failed:
+                        pending.remove(name)
+                        failed.add(name)
+                        self.results[name] = ("blocked", 0.0)
+                        continue
+                    if not self.deps[name] <= done:
+                        continue
+
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    if self.is_fresh(stage):
+                        done.add(name)
+                        self.results[name] = ("skipped", 0.0)
+                        print(f"[INFO] {name}: unchanged, skipped")
+                        continue
+
+                    print(f"[INFO] {name}: started ({stage.module})")
+                    running[pool.submit(self._execute, stage)] = (stage, self.input_digest(stage))
+
+                if not running:
+                    continue
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    stage, inputs = running.pop(fut)
+                    code, seconds, log_path = fut.result()
+                    write_record({
+                        "ts": datetime.now(timezone.utc).isoformat(),
+                        "run_id": RUN_ID,
+                        "script": "src.run",
+                        "name": stage.name,
+                        "status": "ok" if code == 0 else "error",
+                        "wall_s": round(seconds, 4),
+                    })
+                    if code == 0:
+                        done.add(stage.name)
+                        self.results[stage.name] = ("ok", seconds)
+                        self._record(stage, inputs, seconds)
+                        print(f"[INFO] {stage.name}: done in {seconds:.1f}s")
+                    else:
+                        failed.add(stage.name)
+                        self.results[stage.name] = ("failed", seconds)
+                        self.state["stages"].pop(stage.name, None)
+                        save_state(self.state)
+                        tail = log_path.read_text(encoding="utf-8", errors="replace").splitlines()[-15:]
+                        print(f"[WARN] {stage.name}: exit code {code}, log: {log_path}")
+                        print("\n".join(f"    {line}" for line in tail))
+
+        self.print_timings(time.perf_counter() - t_start)
+        return not failed
+
+    def print_timings(self, wall: float) -> None:
+        print("\nStage timings:")
+        for name in self.order:
+            if name not in self.results:
+                continue
+            status, seconds = self.results[name]
+            print(f"  {name:<36} {status:<8} {seconds:8.1f}s")
+        busy = sum(sec for _, sec in self.results.values())
+        print(f"  {'total (wall / sum of stages)':<36} {'':<8} {wall:8.1f}s / {busy:.1f}s")
+
+
+def select_stages(names: Optional[List[str]]) -> List[Stage]:
+    if not names:
+        return list(STAGES)
+    known = {s.name for s in STAGES}
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise SystemExit(f"Unknown stages: {unknown}. Known: {sorted(known)}")
+    return [s for s in STAGES if s.name in names]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the bit_ai pipeline (stages with cached outputs).")
+    parser.add_argument("--force", action="store_true", help="Rerun stages even if their inputs are unchanged.")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="Run only these stages (no upstream stages).")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Maximum number of stages running in parallel (default: min(4, CPUs)).",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without running anything.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Dump cProfile stats of the measured steps of every stage to data/processed/profiles/.",
+    )
+    args = parser.parse_args()
+
+    runner = Runner(
+        select_stages(args.only),
+        force=args.force,
+        jobs=args.jobs,
+        dry_run=args.dry_run,
+        profile=args.profile,
+    )
+    if not runner.run():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
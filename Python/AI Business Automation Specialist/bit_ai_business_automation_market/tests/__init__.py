@@ -0,0 +1 @@
+# Tests: python -m unittest discover -s tests  (or python -m pytest tests)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_catalog_fetcher.py
+
+CatalogFetcher / fetch_nearest_official_berufe против локального HTTP-сервера
+(http.server в отдельном потоке, без сети):
+
+- 200                 -> HTML и meta.json (ETag / Last-Modified) сохранены;
+- 304                 -> повторный запуск шлёт If-None-Match, файл не переписывается;
+- 503 + Retry-After   -> запрос повторяется;
+- 4xx                 -> без повторов, страница считается failed.
+
+Запуск:
+    python -m unittest tests.test_catalog_fetcher
+"""
+
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+import src.fetching.catalog_fetcher as cf
+
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Oct 2025 10:00:00 GMT"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /ok     -> 200 с ETag (304 на совпадающий If-None-Match)
+    /flaky  -> первый запрос 503 + Retry-After: 0, дальше как /ok
+    /gone   -> 404
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            first_flaky = self.path == "/flaky" and self.path not in server.failed_once
+            if first_flaky:
+                server.failed_once.add(self.path)
+
+        if self.path == "/gone":
+            self._send(404)
+        elif first_flaky:
+            self._send(503, headers={"Retry-After": "0"})
+        elif self.headers.get("If-None-Match") == ETAG:
+            self._send(304, headers={"ETag": ETAG})
+        else:
+            self._send(
+                200,
+                f"<html>{self.path}</html>".encode("utf-8"),
+                {"ETag": ETAG, "Last-Modified": LAST_MODIFIED, "Content-Type": "text/html; charset=utf-8"},
+            )
+
+
+class CatalogFetcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        self.server.requests = []
+        self.server.failed_once = set()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(cf, "CATALOGS_DIR", Path(self.tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def requests_to(self, path: str) -> List[str]:
+        return [etag for p, etag in self.server.requests if p == path]
+
+    def fetch(self, *paths: str, **kwargs) -> List[Path]:
+        entries = [
+            {"country": "DE", "title_de": f"Beruf {p.strip('/')}", "url": self.base_url + p}
+            for p in paths
+        ]
+        profile = {"nearest_official_berufe_hypotheses": entries}
+        with mock.patch.object(cf, "load_role_profile", return_value=profile), \
+                mock.patch("builtins.print"):
+            return cf.fetch_nearest_official_berufe(max_workers=2, rate_per_host=0, **kwargs)
+
+    def test_200_saves_page_and_validators(self) -> None:
+        paths = self.fetch("/ok")
+
+        html_path, meta_path = cf.catalog_paths("DE", "Beruf ok")
+        self.assertEqual(paths, [html_path])
+        self.assertEqual(html_path.read_text(encoding="utf-8"), "<html>/ok</html>")
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        self.assertEqual(meta["etag"], ETAG)
+        self.assertEqual(meta["last_modified"], LAST_MODIFIED)
+        self.assertEqual(meta["url"], self.base_url + "/ok")
+
+    def test_304_leaves_file_untouched(self) -> None:
+        self.fetch("/ok")
+        html_path, _ = cf.catalog_paths("DE", "Beruf ok")
+        html_path.write_text("<html>local copy</html>", encoding="utf-8")
+        mtime = html_path.stat().st_mtime_ns
+
+        paths = self.fetch("/ok")
+
+        self.assertEqual(paths, [html_path])
+        self.assertEqual(self.requests_to("/ok"), [None, ETAG])
+        self.assertEqual(html_path.read_text(encoding="utf-8"), "<html>local copy</html>")
+        self.assertEqual(html_path.stat().st_mtime_ns, mtime)
+
+    def test_force_skips_conditional_get(self) -> None:
+        self.fetch("/ok")
+        self.fetch("/ok", conditional=False)
+        self.assertEqual(self.requests_to("/ok"), [None, None])
+
+    def test_503_with_retry_after_is_retried(self) -> None:
+        with mock.patch("builtins.print"):
+            status, text, headers = cf.CatalogFetcher(rate_per_host=0, max_retries=2).fetch(
+                self.base_url + "/flaky"
+            )
+
+        self.assertEqual(status, "ok")
+        self.assertEqual(text, "<html>/flaky</html>")
+        self.assertEqual(len(self.requests_to("/flaky")), 2)
+
+    def test_4xx_is_not_retried(self) -> None:
+        with self.assertRaises(RuntimeError):
+            cf.CatalogFetcher(rate_per_host=0, max_retries=3).fetch(self.base_url + "/gone")
+        self.assertEqual(len(self.requests_to("/gone")), 1)
+
+        # In the batch run the page is reported as failed, the others are still saved
+        paths = self.fetch("/gone", "/ok")
+        self.assertEqual(paths, [cf.catalog_paths("DE", "Beruf ok")[0]])
+        self.assertFalse(cf.catalog_paths("DE", "Beruf gone")[0].exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
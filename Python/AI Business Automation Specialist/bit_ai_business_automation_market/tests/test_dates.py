@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_dates.py
+
+resolve_dates: одно значение вне диапазона datetime64[ns] даёт NaT в своей строке,
+а не исключение на весь пакет (эпохи 1e14 / 1e20 / 2**63, годы 0001 и 3000).
+
+Запуск:
+    python -m unittest tests.test_dates
+"""
+
+import unittest
+
+import pandas as pd
+
+from src.parsing.dates import resolve_dates
+
+
+OUT_OF_RANGE = [
+    99999999999999,
+    10 ** 20,
+    1e20,
+    2 ** 63,
+    -10 ** 12,
+    float("inf"),
+    "99999999999999999999",
+    "3000-01-01",
+    "0001-01-01",
+    "Mar 3 3000",
+]
+
+
+class ResolveDatesTest(unittest.TestCase):
+    def test_out_of_range_values_become_nat(self) -> None:
+        for value in OUT_OF_RANGE:
+            with self.subTest(value=value):
+                out = resolve_dates([{"k": value}, {"k": "2024-01-01"}], ["k"])
+                self.assertTrue(pd.isna(out.iloc[0]))
+                self.assertEqual(out.iloc[1], pd.Timestamp("2024-01-01", tz="UTC"))
+
+    def test_out_of_range_falls_back_to_next_key(self) -> None:
+        out = resolve_dates([{"a": 10 ** 20, "b": 1700000000}], ["a", "b"])
+        self.assertEqual(out.iloc[0], pd.Timestamp(1700000000, unit="s", tz="UTC"))
+
+    def test_valid_epochs_and_iso(self) -> None:
+        out = resolve_dates(
+            [{"k": 1700000000}, {"k": 1700000000123}, {"k": "1700000000"}, {"k": "2025-03-01T10:00:00.123Z"}],
+            ["k"],
+        )
+        self.assertEqual(str(out.dtype), "datetime64[ns, UTC]")
+        self.assertEqual(
+            out.tolist(),
+            [
+                pd.Timestamp("2023-11-14 22:13:20", tz="UTC"),
+                pd.Timestamp("2023-11-14 22:13:20.123", tz="UTC"),
+                pd.Timestamp("2023-11-14 22:13:20", tz="UTC"),
+                pd.Timestamp("2025-03-01 10:00:00.123", tz="UTC"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_enrichment.py
+
+JobEnricher сканирует один текст title + "\n" + description; результат должен
+совпадать с отдельным сканом каждого разметчика с его joiner — в том числе
+для правил, которые видят разделитель ("power" + " " + "automate" у skills,
+"senior" + "\n" у entry).
+
+Запуск:
+    python -m unittest tests.test_enrichment
+"""
+
+import unittest
+
+import pandas as pd
+
+from src.classification.multi_pattern import MultiPatternMatcher, separator_sensitive
+from src.parsing.enrichment import JobEnricher
+
+
+TITLES = [
+    "Power",
+    "Senior",
+    "Rest",
+    "Junior Entry",
+    "Data Analyst (m/w/d)",
+    "Microsoft",
+    "",
+    None,
+]
+DESCRIPTIONS = [
+    "Automate workflows with Zapier and n8n.",
+    "Wir suchen dich und die Zukunft mit Python.",
+    "API design, SQL and the GDPR.",
+    "Level role, 0-2 years, we are hiring for our team",
+    "Mehrjährige Berufserfahrung mit BPMN und SQL",
+    "flow",
+    "senior lead",
+    "large language model",
+]
+
+
+def reference(enricher: JobEnricher, titles: pd.Series, descriptions: pd.Series) -> pd.DataFrame:
+    """Каждый текстовый разметчик отдельно: свой joiner, свой lower, свой скан."""
+    frames = []
+    for lab in enricher.labelers:
+        if lab.source != "text":
+            continue
+        matcher = MultiPatternMatcher(lab.rules)
+        texts = (titles.fillna("").astype(str) + lab.joiner + descriptions.fillna("").astype(str)).map(str.lower)
+        frame = lab.to_frame([lab.decode(sorted(matcher.match_indices(t))) for t in texts])
+        frame.index = titles.index
+        frames.append(frame)
+    return pd.concat(frames, axis=1)
+
+
+class SingleScanTest(unittest.TestCase):
+    def test_matches_per_joiner_scans(self):
+        titles, descriptions = pd.Series(TITLES), pd.Series(DESCRIPTIONS)
+        enricher = JobEnricher(["skills", "entry", "language"])
+        expected = reference(enricher, titles, descriptions)
+        got = enricher.enrich(titles, descriptions)
+        pd.testing.assert_frame_equal(got[expected.columns], expected, check_dtype=False)
+
+        # "power" / "automate" and "microsoft" / "flow" only meet across the separator
+        self.assertEqual(got.loc[0, "skill_power_automate"], 1)
+        self.assertEqual(got.loc[5, "skill_power_automate"], 1)
+
+    def test_separator_sensitive(self):
+        self.assertTrue(separator_sensitive("power automate", "\n", " "))
+        self.assertTrue(separator_sensitive(r"crm.*automation", "\n", " "))
+        self.assertFalse(separator_sensitive(r"\bpower\s*bi\b", "\n", " "))
+        self.assertFalse(separator_sensitive(r"\b0\W*[-–]?\W*2\s*(years|jahre)\b", "\n", " "))
+
+
+if __name__ == "__main__":
+    unittest.main()